@@ -0,0 +1,146 @@
+"""
+Drug-allergy cross-check.
+
+``assets/allergy_classes.csv`` is a precomputed class -> ingredient index:
+each row names a drug class, the words patients use for it ("sulfa",
+"penicillin", "NSAIDs") and the generic ingredients it contains. Together
+with the formulary (brand or generic name -> ingredients) it is loaded once
+per process into dicts, so checking a form costs one pass over the allergy
+text plus one dict lookup and one set lookup per ingredient of each
+medication.
+
+Every ingredient of a combination product counts: "Tylenol #3" conflicts
+with a codeine allergy as well as an acetaminophen one, an allergy named
+by an ingredient only sold in combinations ("clavulanate") still matches
+them, and an allergy to a single drug ("amoxicillin", "Tylenol #3") is
+widened to every class any of its ingredients belongs to.
+"""
+
+import csv
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+
+import streamlit as st
+
+from formulary import get_formulary, normalize_name, split_ingredients
+
+DEFAULT_ALLERGY_CLASSES_PATH = Path(__file__).parent / "assets" / "allergy_classes.csv"
+
+# Separators between allergy entries in free text
+_ALLERGY_SEPARATORS = re.compile(r"[,;/\n()]|\band\b|\bor\b|\bet\b")
+
+AllergyConflict = namedtuple('AllergyConflict', ['medication', 'ingredient', 'allergy', 'drug_class'])
+
+
+class AllergyIndex:
+    """Allergy terms and drug classes resolved to generic ingredients"""
+
+    def __init__(self, classes, formulary):
+        """``classes`` is an iterable of (class name, [aliases], [ingredients])"""
+        self.formulary = formulary
+        self._class_ingredients = {}
+        self._term_classes = {}
+        self._ingredient_classes = {}
+        for class_name, aliases, ingredients in classes:
+            self._class_ingredients[class_name] = frozenset(normalize_name(i) for i in ingredients)
+            for term in [class_name, *aliases]:
+                self._term_classes.setdefault(normalize_name(term), []).append(class_name)
+            for ingredient in ingredients:
+                self._ingredient_classes.setdefault(normalize_name(ingredient), []).append(class_name)
+        self._ingredients = frozenset(
+            normalize_name(ingredient)
+            for field in formulary.ingredients for ingredient in split_ingredients(field)
+        )
+
+    @classmethod
+    def from_csv(cls, path, formulary):
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = [
+                (row['class'], _split_list(row['aliases']), _split_list(row['ingredients']))
+                for row in csv.DictReader(f)
+            ]
+        return cls(rows, formulary)
+
+    def allergens(self, allergy_text):
+        """Map each ingredient the patient must avoid to (allergy term, class or None)"""
+        allergens = {}
+        for phrase in _ALLERGY_SEPARATORS.split(normalize_name(allergy_text)):
+            phrase = phrase.strip(" .-")
+            if not phrase:
+                continue
+            if not self._add_term(phrase, allergens):
+                # "allergic to penicillin", "sulfa (rash)": try the single words
+                for word in phrase.split():
+                    self._add_term(word, allergens)
+        return allergens
+
+    def _add_term(self, term, allergens):
+        classes = list(self._term_classes.get(term, ()))
+        entry = self.formulary.lookup(term)
+        if entry is not None:
+            ingredients = [normalize_name(ingredient) for ingredient in split_ingredients(entry[1])]
+        elif term in self._ingredients:
+            ingredients = [term]    # an ingredient with no product of its own name, e.g. "clavulanate"
+        else:
+            ingredients = []
+        for ingredient in ingredients:
+            allergens.setdefault(ingredient, (term, None))
+            classes.extend(self._ingredient_classes.get(ingredient, ()))
+        for class_name in classes:
+            for ingredient in self._class_ingredients[class_name]:
+                allergens.setdefault(ingredient, (term, class_name))
+        return bool(classes) or bool(ingredients)
+
+    def ingredients_of(self, medication_name):
+        """Normalized generic ingredients of a medication name ([] if unknown).
+
+        Tries the full name, then ever shorter leading words that are a
+        formulary name themselves ("Tylenol #3 30mg" -> "Tylenol #3",
+        "Metformin 500mg" -> "Metformin").
+        """
+        words = normalize_name(medication_name).split()
+        for end in range(len(words), 0, -1):
+            entry = self.formulary.lookup(' '.join(words[:end]))
+            if entry is not None:
+                return [normalize_name(ingredient) for ingredient in split_ingredients(entry[1])]
+        return []
+
+    def conflicts(self, allergy_text, medications_list):
+        """Return an AllergyConflict for every listed medication the patient is allergic to"""
+        allergens = self.allergens(allergy_text)
+        if not allergens:
+            return []
+        conflicts = []
+        for medication in medications_list:
+            for ingredient in self.ingredients_of(medication.get('name', '')):
+                if ingredient in allergens:
+                    allergy, drug_class = allergens[ingredient]
+                    conflicts.append(AllergyConflict(medication['name'], ingredient, allergy, drug_class))
+        return conflicts
+
+
+def _split_list(value):
+    return [item.strip() for item in (value or '').split(';') if item.strip()]
+
+
+@st.cache_resource(show_spinner=False)
+def get_allergy_index():
+    """Return the process-wide allergy index"""
+    path = os.environ.get('INTAKE_ALLERGY_CLASSES_PATH', DEFAULT_ALLERGY_CLASSES_PATH)
+    return AllergyIndex.from_csv(path, get_formulary())
+
+
+def find_allergy_conflicts(medications):
+    """Allergy conflicts in the medications section of form_data"""
+    if medications.get('has_allergies') != "Yes" or medications.get('taking_medications') != "Yes":
+        return []
+    return get_allergy_index().conflicts(medications.get('allergies_list', ''),
+                                         medications.get('medications_list', []))
+
+
+def describe_conflict(conflict):
+    """One-line description of a conflict, e.g. for the review page and PDF"""
+    text = f"{conflict.medication} ({conflict.ingredient}) - reported allergy: {conflict.allergy}"
+    return f"{text} [{conflict.drug_class}]" if conflict.drug_class else text
@@ -0,0 +1,310 @@
+"""
+Columnar analytics export of stored intakes.
+
+Each submission is flattened into one row of typed columns: the patient's
+age, sex and language, every choice, select and numeric answer of the form
+schema, the medication answers and names, the Katz / Lawton scores and the
+risk flags. Free-text answers and identifying fields are left out.
+
+Answers are stored as dictionary-encoded categories over the schema's own
+option values, so a column of 100k "Yes"/"No" answers is one byte per row.
+Answers outside the options (older form versions) export as missing.
+
+The export is a directory of part files. Every run streams the store in
+``chunk_size`` rows - one Parquet row group per chunk, so memory stays
+bounded - and writes a single new part holding only the submissions newer
+than the last part (``part-<first id>-<last id>``). Parquet needs pyarrow;
+without it the parts are gzip-compressed CSV with the same columns.
+
+Usage:
+    python analytics_export.py --output exports/intakes
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import re
+import time
+from collections import namedtuple
+from datetime import date, datetime
+from pathlib import Path
+
+from form_model import LANGUAGE_OPTIONS, SECTION_FIELDS, SEX_OPTIONS
+from form_schema import FORM_SCHEMA, iter_items
+from formulary import get_formulary, normalize_name
+from functional_scores import score_many
+from risk_flags import RISK_RULES
+from submission_store import DEFAULT_STORE_PATH, SQLiteSubmissionStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - CSV fallback
+    pa = pq = None
+
+DEFAULT_CHUNK_SIZE = 5000
+PART_NAME = re.compile(r"^part-(\d+)-(\d+)\.(parquet|csv\.gz)$")
+
+Column = namedtuple('Column', ['name', 'kind', 'section', 'key', 'categories'])
+
+# Choice answers of the custom medications section, from the form model
+_MEDICATION_CHOICES = {
+    f.name: tuple(answer.text for answer in f.type)
+    for f in SECTION_FIELDS['medications'] if f.kind == 'answer'
+}
+
+
+def _schema_columns():
+    columns = []
+    for section in FORM_SCHEMA.values():
+        for item in iter_items(section.items):
+            name = f"{section.id}_{item.key}"
+            if item.type == 'choice':
+                columns.append(Column(name, 'category', section.id, item.key, item.values))
+            elif item.type == 'select':
+                columns.append(Column(name, 'category', section.id, item.key, item.options))
+            elif item.type == 'multiselect':
+                columns.append(Column(name, 'list', section.id, item.key, item.options))
+            elif item.type in ('number', 'slider'):
+                columns.append(Column(name, 'int16', section.id, item.key, None))
+    return columns
+
+
+COLUMNS = (
+    [
+        Column('id', 'int64', None, None, None),
+        Column('submitted_at', 'timestamp', None, None, None),
+        Column('age', 'int16', None, None, None),
+        Column('sex', 'category', 'demographics', 'sex', SEX_OPTIONS),
+        Column('preferred_language', 'category', 'demographics', 'preferred_language', LANGUAGE_OPTIONS),
+    ]
+    + _schema_columns()
+    + [Column(f'medications_{key}', 'category', 'medications', key, values)
+       for key, values in _MEDICATION_CHOICES.items()]
+    + [
+        Column('medications_num_medications', 'int16', 'medications', 'num_medications', None),
+        Column('medications_names', 'list', None, None, None),
+        Column('katz', 'int16', None, None, None),
+        Column('lawton', 'int16', None, None, None),
+    ]
+    + [Column(f'flag_{rule.id}', 'bool', None, None, None) for rule in RISK_RULES]
+)
+
+
+def _age(date_of_birth, on):
+    if not isinstance(date_of_birth, date):
+        return None
+    return on.year - date_of_birth.year - ((on.month, on.day) < (date_of_birth.month, date_of_birth.day))
+
+
+def _number(value):
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _medication_names(medications, canonical):
+    """Canonical formulary names of the listed medications (normalized text otherwise).
+
+    ``canonical`` memoizes entered name -> canonical name across a chunk.
+    """
+    if medications.get('taking_medications') != "Yes":
+        return []
+    names = []
+    for row in medications.get('medications_list', []):
+        entered = row.get('name', '')
+        if entered not in canonical:
+            entry = get_formulary().lookup(entered)
+            canonical[entered] = entry[0] if entry else normalize_name(entered)
+        if canonical[entered]:
+            names.append(canonical[entered])
+    return names
+
+
+def flatten_chunk(submissions):
+    """Flatten (id, submitted_at, form_data) tuples into {column name: [values]}"""
+    submissions = list(submissions)
+    form_datas = [form_data for _, _, form_data in submissions]
+    submitted = [datetime.fromisoformat(submitted_at) for _, submitted_at, _ in submissions]
+    scores = score_many(form_datas)
+    canonical = {}
+
+    data = {
+        'id': [submission_id for submission_id, _, _ in submissions],
+        'submitted_at': submitted,
+        'age': [_age(f.get('demographics', {}).get('date_of_birth'), s.date())
+                for f, s in zip(form_datas, submitted)],
+        'medications_names': [_medication_names(f.get('medications', {}), canonical) for f in form_datas],
+        'katz': scores.katz.tolist(),
+        'lawton': scores.lawton.tolist(),
+    }
+    for rule in RISK_RULES:
+        data[f'flag_{rule.id}'] = [rule.predicate(f) for f in form_datas]
+    for column in COLUMNS:
+        if column.section is None:
+            continue
+        values = [f.get(column.section, {}).get(column.key) for f in form_datas]
+        if column.kind == 'category':
+            allowed = set(column.categories)
+            data[column.name] = [v if v in allowed else None for v in values]
+        elif column.kind == 'int16':
+            data[column.name] = [_number(v) for v in values]
+        else:
+            data[column.name] = [list(v) if isinstance(v, (list, tuple)) else [] for v in values]
+    return data
+
+
+def _arrow_type(column):
+    if column.kind == 'category':
+        return pa.dictionary(pa.int8(), pa.string())
+    return {
+        'int64': pa.int64(),
+        'int16': pa.int16(),
+        'timestamp': pa.timestamp('s'),
+        'bool': pa.bool_(),
+        'list': pa.list_(pa.string()),
+    }[column.kind]
+
+
+class ParquetPartWriter:
+    """Writes chunks as row groups of one zstd-compressed Parquet file"""
+    suffix = '.parquet'
+
+    def __init__(self, path):
+        self.schema = pa.schema([(column.name, _arrow_type(column)) for column in COLUMNS])
+        self._dictionaries = {column.name: pa.array(column.categories, pa.string())
+                              for column in COLUMNS if column.kind == 'category'}
+        self._codes = {column.name: {value: i for i, value in enumerate(column.categories)}
+                       for column in COLUMNS if column.kind == 'category'}
+        self._writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def _array(self, column, values):
+        if column.kind != 'category':
+            return pa.array(values, _arrow_type(column))
+        codes = self._codes[column.name]
+        indices = pa.array([codes.get(v) for v in values], pa.int8())
+        return pa.DictionaryArray.from_arrays(indices, self._dictionaries[column.name])
+
+    def write(self, data):
+        arrays = [self._array(column, data[column.name]) for column in COLUMNS]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class CsvPartWriter:
+    """Writes chunks as rows of one gzip-compressed CSV file (lists joined with ';')"""
+    suffix = '.csv.gz'
+
+    def __init__(self, path):
+        self._file = gzip.open(path, 'wt', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([column.name for column in COLUMNS])
+
+    def write(self, data):
+        columns = [data[column.name] for column in COLUMNS]
+        self._writer.writerows([_csv_value(v) for v in row] for row in zip(*columns))
+
+    def close(self):
+        self._file.close()
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ';'.join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+EXPORT_FORMATS = {'parquet': ParquetPartWriter, 'csv': CsvPartWriter}
+
+
+def default_format():
+    return 'parquet' if pa is not None else 'csv'
+
+
+def last_exported_id(output_dir):
+    """Highest submission id already exported to ``output_dir`` (0 if none)"""
+    last = 0
+    for path in Path(output_dir).glob('part-*'):
+        match = PART_NAME.match(path.name)
+        if match:
+            last = max(last, int(match.group(2)))
+    return last
+
+
+def export_submissions(store, output_dir, chunk_size=DEFAULT_CHUNK_SIZE, export_format=None):
+    """Append the submissions newer than the last export as one new part file.
+
+    Returns {'rows', 'path', 'seconds'}; 'path' is None when nothing was new.
+    """
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    writer_class = EXPORT_FORMATS[export_format or default_format()]
+    after_id = last_exported_id(output_dir)
+
+    pending = output_dir / f".part-{os.getpid()}{writer_class.suffix}"
+    writer = None
+    rows = first_id = last_id = 0
+    chunk = []
+
+    def flush():
+        nonlocal writer
+        if writer is None:
+            writer = writer_class(pending)
+        writer.write(flatten_chunk(chunk))
+        chunk.clear()
+
+    try:
+        for submission in store.iter_submissions(after_id=after_id, batch_size=chunk_size):
+            chunk.append(submission)
+            first_id = first_id or submission[0]
+            last_id = submission[0]
+            rows += 1
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            pending.unlink(missing_ok=True)
+        raise
+
+    path = None
+    if writer is not None:
+        writer.close()
+        path = output_dir / f"part-{first_id:09d}-{last_id:09d}{writer_class.suffix}"
+        pending.rename(path)
+    return {'rows': rows, 'path': path, 'seconds': time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export new stored intakes to a columnar analytics directory")
+    parser.add_argument("--store", default=os.environ.get('INTAKE_STORE_PATH', DEFAULT_STORE_PATH),
+                        help="submission database (default: %(default)s)")
+    parser.add_argument("--output", required=True, help="export directory")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default=None,
+                        help="part file format (default: parquet if pyarrow is installed, else csv)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.format == 'parquet' and pa is None:
+        parser.error("parquet export needs pyarrow")
+    store = SQLiteSubmissionStore(args.store)
+    stats = export_submissions(store, args.output, args.chunk_size, args.format)
+    store.close()
+    if stats['path'] is None:
+        print("No new intakes to export")
+    else:
+        print(f"{stats['rows']} intakes in {stats['seconds']:.2f} s -> {stats['path']}")
+
+
+if __name__ == "__main__":
+    main()
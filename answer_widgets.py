@@ -0,0 +1,79 @@
+"""
+Answer widgets for the intake form.
+
+Every answer button commits its choice through an ``on_click`` callback.
+Streamlit runs callbacks before the script, so the page is redrawn with the
+new answer in the same run that handled the tap - no ``st.rerun()`` needed.
+"""
+
+import streamlit as st
+
+# Option sets: (button label, stored value, widget key suffix)
+YES_NO = [
+    ("YES", "Yes", "yes"),
+    ("NO", "No", "no"),
+]
+
+YES_NO_UNSURE = YES_NO + [
+    ("NOT SURE", "Not Sure", "unsure"),
+]
+
+YES_NO_SOMETIMES = YES_NO + [
+    ("SOMETIMES", "Sometimes", "sometimes"),
+]
+
+ADL_LEVELS = [
+    ("I can do this\nBY MYSELF", "Independent", "independent"),
+    ("I need\nSOME HELP", "Needs Assistance", "assistance"),
+    ("I need\nFULL HELP", "Dependent", "dependent"),
+]
+
+IADL_LEVELS = [
+    ("I can do this\nBY MYSELF", "Independent", "independent"),
+    ("I need\nSOME HELP", "Needs Assistance", "assistance"),
+    ("I CANNOT\ndo this", "Unable", "unable"),
+]
+
+MISS_DOSES = [
+    ("NEVER", "Never", "never"),
+    ("SOMETIMES", "Sometimes", "sometimes"),
+    ("OFTEN", "Often", "often"),
+]
+
+TAKING_MEDICATIONS = [
+    ("YES, I take medications", "Yes", "yes"),
+    ("NO, I don't take any medications", "No", "no"),
+]
+
+
+def set_answer(section, key, value):
+    """Widget callback: store an answer in the form data"""
+    st.session_state.form_data[section][key] = value
+
+
+def create_choice_question(section, key, question_text, options, widget_prefix,
+                           help_text=None, heading="###", show_answer=True):
+    """Create a question with one large button per option.
+
+    The selected button is highlighted as primary. Returns the current answer
+    (already updated if one of the buttons was just tapped).
+    """
+    st.markdown(f"{heading} {question_text}")
+    if help_text:
+        st.markdown(f"*{help_text}*")
+
+    current_value = st.session_state.form_data[section].get(key, None)
+
+    columns = st.columns(len(options))
+
+    for col, (label, value, suffix) in zip(columns, options):
+        with col:
+            st.button(label, key=f"{widget_prefix}_{suffix}", use_container_width=True,
+                      type="primary" if current_value == value else "secondary",
+                      on_click=set_answer, args=(section, key, value))
+
+    if show_answer and current_value:
+        st.info(f"Your answer: **{current_value}**")
+
+    return current_value
+
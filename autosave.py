@@ -0,0 +1,414 @@
+"""
+Crash-safe autosave and resume of in-progress forms.
+
+Every form gets a short resume code, shown on screen and kept in the page
+URL (``?resume=K7P3QX``). Whenever a section of ``form_data`` changes, that
+section alone is appended to a journal shared by all sessions of all
+server processes, so a reload, a dropped websocket or a server restart
+loses at most the answer being typed:
+
+    <code>\\t<key>\\t<unix time>\\t<JSON>\\n
+
+``key`` is a form_data section id, ``_progress`` for the current page, or
+``-`` to discard the form once it is submitted. Writes are appends of one
+short line; a background thread fsyncs the journal at most once per
+``fsync_interval`` for all tablets together. Each process keeps an
+in-memory index of the newest record of each (code, key), so restoring a
+form is one positioned read per section.
+
+Processes take turns with an ``flock`` on ``<journal>.lock``. Holding it,
+a process first indexes the lines the others appended since its last
+turn, or reopens the journal if another process compacted it, so its
+offsets and its view of the live records are never stale. Superseded
+records, discarded forms and forms untouched for ``ttl`` seconds are
+dropped by compaction, which rewrites the live records to a new file once
+the journal is ``compact_ratio`` times larger than them. A line cut short
+by a crash is truncated, and a malformed line is skipped.
+
+Resume codes are short enough to guess, so every lookup of a code that
+matches no form counts against the client (``st.context.ip_address``): after
+``MAX_RESUME_FAILURES`` misses within ``RESUME_FAILURE_WINDOW`` seconds, its
+further codes are refused without being looked up until the oldest miss
+expires. Misses are counted per server process; behind a reverse proxy every
+tablet shares the proxy's address, so the limit then applies to the clinic.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+
+from submission_store import restore_dates, serialize_form_data
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = Path(__file__).parent / "data" / "autosave.journal"
+DEFAULT_TTL = 12 * 3600
+DEFAULT_FSYNC_INTERVAL = 1.0
+COMPACT_MIN_BYTES = 1 << 20
+COMPACT_RATIO = 3.0
+
+# Resume codes avoid look-alike characters (0/O, 1/I/L)
+CODE_ALPHABET = "23456789ABCDEFGHJKMNPQRSTUVWXYZ"
+CODE_LENGTH = 6
+
+PROGRESS_KEY = '_progress'
+DISCARD_KEY = '-'
+
+MAX_RESUME_FAILURES = 10
+RESUME_FAILURE_WINDOW = 10 * 60
+
+
+class AutosaveJournal:
+    """Append-only journal of form sections, indexed by resume code"""
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, ttl=DEFAULT_TTL, fsync_interval=DEFAULT_FSYNC_INTERVAL,
+                 compact_min_bytes=COMPACT_MIN_BYTES, compact_ratio=COMPACT_RATIO):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_ratio = compact_ratio
+        self._lock = threading.Lock()
+        self._index = {}        # code -> {key: (offset, length)}
+        self._touched = {}      # code -> unix time of the last write
+        self._live_bytes = 0
+        self._fd = None
+        self._size = 0
+        self._dirty = False
+        self._closed = threading.Event()
+        self._lock_fd = os.open(self.path.with_name(self.path.name + '.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            self._open()
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        if fsync_interval:
+            threading.Thread(target=self._sync_loop, args=(fsync_interval,), daemon=True,
+                             name="autosave-fsync").start()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the journal against the other threads and processes, caught up with their writes"""
+        with self._lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                self._catch_up()
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _open(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        self._index.clear()
+        self._touched.clear()
+        self._live_bytes = 0
+        self._size = 0
+        self._scan()
+
+    def _catch_up(self):
+        """Follow what other processes did to the journal since this one last held the lock"""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            current = None
+        if current is None or current.st_ino != os.fstat(self._fd).st_ino or current.st_size < self._size:
+            os.close(self._fd)      # compacted by another process
+            self._open()
+        elif current.st_size != self._size:
+            self._scan()
+
+    def _scan(self):
+        """Index the lines appended since ``self._size``, truncating a line torn by a crash"""
+        offset = self._size
+        with open(self._fd, 'rb', closefd=False) as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break   # torn by a crash; no other process is writing while we hold the lock
+                self._apply(line, offset)
+                offset += len(line)
+        if os.fstat(self._fd).st_size > offset:
+            os.truncate(self._fd, offset)
+        self._size = offset
+
+    def _apply(self, line, offset):
+        """Index one journal line found at ``offset``"""
+        try:
+            code, key, written_at, _ = line.split(b'\t', 3)
+            code, key, written_at = code.decode(), key.decode(), float(written_at)
+        except ValueError:
+            logger.warning("Skipping malformed autosave journal line at offset %d", offset)
+            return
+        if key == DISCARD_KEY:
+            self._drop(code)
+            return
+        entries = self._index.setdefault(code, {})
+        if key in entries:
+            self._live_bytes -= entries[key][1]
+        entries[key] = (offset, len(line))
+        self._live_bytes += len(line)
+        self._touched[code] = written_at
+
+    def _drop(self, code):
+        for _, length in self._index.pop(code, {}).values():
+            self._live_bytes -= length
+        self._touched.pop(code, None)
+
+    def write(self, code, key, payload):
+        """Append the JSON ``payload`` as the newest value of (code, key)"""
+        line = f"{code}\t{key}\t{time.time():.0f}\t{payload}\n".encode()
+        with self._locked():
+            os.write(self._fd, line)
+            self._apply(line, self._size)
+            self._size += len(line)
+            self._dirty = True
+            if self._size > self.compact_min_bytes and self._size > self._live_bytes * self.compact_ratio:
+                self._compact()
+
+    def discard(self, code):
+        """Forget a form (e.g. once it is submitted)"""
+        with self._locked():
+            if code not in self._index:
+                return
+            line = f"{code}\t{DISCARD_KEY}\t{time.time():.0f}\t\n".encode()
+            os.write(self._fd, line)
+            self._size += len(line)
+            self._drop(code)
+            self._dirty = True
+
+    def read(self, code):
+        """Return {key: JSON payload} of the newest records of a form ({} if unknown or expired)"""
+        with self._locked():
+            if time.time() - self._touched.get(code, 0) > self.ttl:
+                return {}
+            records = {key: os.pread(self._fd, length, offset)
+                       for key, (offset, length) in self._index.get(code, {}).items()}
+        return {key: line.split(b'\t', 3)[3].rstrip(b'\n').decode() for key, line in records.items()}
+
+    def __contains__(self, code):
+        with self._locked():
+            return code in self._index and time.time() - self._touched[code] <= self.ttl
+
+    def compact(self):
+        with self._locked():
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the live, unexpired records to a new journal and switch to it.
+
+        Called with the file lock held, so the index covers every process's records.
+        """
+        cutoff = time.time() - self.ttl
+        pending = self.path.with_suffix('.compacting')
+        with open(pending, 'wb') as out:
+            for code, entries in self._index.items():
+                if self._touched[code] < cutoff:
+                    continue
+                for offset, length in sorted(entries.values()):
+                    out.write(os.pread(self._fd, length, offset))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(pending, self.path)
+        os.close(self._fd)
+        self._open()
+        self._dirty = False
+
+    def stats(self):
+        with self._locked():
+            return {'bytes': self._size, 'live_bytes': self._live_bytes, 'forms': len(self._index)}
+
+    def _sync_loop(self, interval):
+        while not self._closed.wait(interval):
+            with self._lock:
+                dirty, self._dirty = self._dirty, False
+                fd = self._fd
+            if dirty:
+                try:
+                    os.fsync(fd)
+                except OSError:
+                    pass    # replaced by a compaction, which synced the new file
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            os.close(self._lock_fd)
+
+
+@st.cache_resource(show_spinner=False)
+def get_autosave_journal():
+    """Return the process-wide autosave journal (``INTAKE_AUTOSAVE_PATH`` overrides its location)"""
+    return AutosaveJournal(os.environ.get('INTAKE_AUTOSAVE_PATH', DEFAULT_JOURNAL_PATH))
+
+
+class ResumeThrottle:
+    """Recent failed resume-code lookups per client"""
+
+    def __init__(self, max_failures=MAX_RESUME_FAILURES, window=RESUME_FAILURE_WINDOW):
+        self.max_failures = max_failures
+        self.window = window
+        self._lock = threading.Lock()
+        self._failures = {}     # client -> deque of monotonic times, oldest first
+
+    def _recent(self, client):
+        failures = self._failures.get(client)
+        expired = time.monotonic() - self.window
+        while failures and failures[0] <= expired:
+            failures.popleft()
+        if failures is not None and not failures:
+            del self._failures[client]
+        return failures or ()
+
+    def blocked(self, client):
+        """True if the client may not try another code yet"""
+        with self._lock:
+            return len(self._recent(client)) >= self.max_failures
+
+    def failed(self, client):
+        """Record a lookup of a code that matched no form"""
+        with self._lock:
+            self._recent(client)
+            self._failures.setdefault(client, deque()).append(time.monotonic())
+
+
+@st.cache_resource(show_spinner=False)
+def get_resume_throttle():
+    """Return the process-wide resume throttle"""
+    return ResumeThrottle()
+
+
+def _client():
+    """Address of the client of this session, as the throttle counts it"""
+    return st.context.ip_address or ''
+
+
+def resume_blocked():
+    """True if this session's client failed too many resume codes recently"""
+    return get_resume_throttle().blocked(_client())
+
+
+def resume_failed():
+    """Count a resume code that matched no form against this session's client"""
+    get_resume_throttle().failed(_client())
+
+
+def new_resume_code():
+    return ''.join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+
+
+def normalize_resume_code(code):
+    return ''.join(ch for ch in (code or '') if ch.isalnum()).upper()
+
+
+def restore_form(code):
+    """Replace the session's form with an autosaved one; returns False if there is none.
+
+    A code matching no form counts as a failed attempt of the client, and
+    nothing is looked up while the client is blocked.
+    """
+    if resume_blocked():
+        return False
+    records = get_autosave_journal().read(code)
+    if not records:
+        resume_failed()
+        return False
+    progress = json.loads(records.pop(PROGRESS_KEY, '{}'))
+    # Sections the saved form never wrote are empty, not kept from the current form
+    form_data = {section_id: {} for section_id in st.session_state.form_data}
+    for section_id, payload in records.items():
+        form_data[section_id] = json.loads(payload)
+    restore_dates(form_data)
+    st.session_state.form_data = form_data
+    st.session_state.current_section = progress.get('current_section', 0)
+    st.session_state.autosaved = {key: hash(payload) for key, payload in records.items()}
+    return True
+
+
+def start_autosave():
+    """Give the session its resume code, restoring the form named in the URL if any"""
+    if 'resume_code' in st.session_state:
+        return
+    code = normalize_resume_code(st.query_params.get('resume'))
+    st.session_state.autosaved = {}
+    if not (code and restore_form(code)):
+        code = new_resume_code()
+        st.query_params['resume'] = code
+    st.session_state.resume_code = code
+
+
+def _save(key, payload):
+    """Append ``payload`` for ``key`` unless it is what was last saved for this form"""
+    fingerprint = hash(payload)
+    if st.session_state.autosaved.get(key) != fingerprint:
+        get_autosave_journal().write(st.session_state.resume_code, key, payload)
+        st.session_state.autosaved[key] = fingerprint
+
+
+def autosave_section(section_id):
+    """Save one section of form_data if it changed since it was last saved"""
+    section_data = st.session_state.form_data[section_id]
+    if 'resume_code' in st.session_state and (section_data or section_id in st.session_state.autosaved):
+        _save(section_id, serialize_form_data(section_data))
+
+
+def autosave_progress():
+    """Save the current page if it changed since it was last saved"""
+    if 'resume_code' in st.session_state:
+        _save(PROGRESS_KEY, json.dumps({'current_section': st.session_state.current_section}))
+
+
+def release_resume_code():
+    """Start the session's next form with a new code; returns the submitted form's code.
+
+    The journal keeps the submitted form until the submission queue has
+    stored it, so it can still be resumed if storing fails.
+    """
+    code = st.session_state.pop('resume_code', None)
+    st.query_params.pop('resume', None)
+    return code
+
+
+_SESSION_KEYS = ('form_data', 'current_section', 'form_completed', 'resume_code', 'autosaved')
+
+
+def _on_resume():
+    """RESUME callback"""
+    code = normalize_resume_code(st.session_state.resume_code_input)
+    if code and resume_blocked():
+        st.session_state.resume_message = "Too many codes were tried. Please wait a few minutes and try again."
+    elif code and restore_form(code):
+        # Drop widget state so every widget is recreated from the restored form
+        for key in list(st.session_state.keys()):
+            if key not in _SESSION_KEYS:
+                del st.session_state[key]
+        st.session_state.resume_code = code
+        st.query_params['resume'] = code
+        st.session_state.resume_message = None
+    else:
+        st.session_state.resume_message = "No unfinished form was found with this code."
+
+
+def render_resume_code():
+    """Show the session's resume code"""
+    code = st.session_state.get('resume_code')
+    if code:
+        st.caption(f"Your form is saved as you go. If the page closes, your resume code is **{code}**.")
+
+
+def render_resume_form():
+    """Offer to resume an unfinished form by its code"""
+    with st.expander("Do you have a resume code? Continue an unfinished form"):
+        st.text_input("Resume code", key="resume_code_input", max_chars=CODE_LENGTH + 2)
+        st.button("RESUME", key="resume_submit", use_container_width=True, on_click=_on_resume)
+        if st.session_state.get('resume_message'):
+            st.warning(st.session_state.resume_message)
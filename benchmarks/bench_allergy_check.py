@@ -0,0 +1,54 @@
+"""
+Benchmark: cost of the drug-allergy cross-check per review page.
+
+Times ``find_allergy_conflicts`` on synthetic completed forms (up to 25
+medications each, allergy text drawn from realistic free-text entries), and
+the one-off cost of building the index.
+
+Usage:
+    python benchmarks/bench_allergy_check.py [--forms N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from allergy_check import find_allergy_conflicts, get_allergy_index  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+ALLERGY_TEXTS = ["Penicillin", "Sulfa drugs", "ASA, codeine", "allergic to NSAIDs (rash)",
+                 "pénicilline et sulfamides", "morphine / opioids - nausea"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forms", type=int, default=2000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    get_allergy_index()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    medications = []
+    for seed in range(args.forms):
+        meds = make_form_data(seed)['medications']
+        meds['has_allergies'] = "Yes"
+        meds['allergies_list'] = ALLERGY_TEXTS[seed % len(ALLERGY_TEXTS)]
+        medications.append(meds)
+    checked = sum(len(meds.get('medications_list', [])) for meds in medications)
+
+    start = time.perf_counter()
+    flagged = sum(bool(find_allergy_conflicts(meds)) for meds in medications)
+    elapsed = time.perf_counter() - start
+
+    print(f"Index build (formulary + classes): {build_ms:>8.1f} ms, once per process")
+    print(f"Forms checked:                     {args.forms:>8} ({checked} medications, {flagged} flagged)")
+    print(f"Check time:                        {elapsed / args.forms * 1e3:>8.3f} ms/form, "
+          f"{elapsed / checked * 1e6:.2f} us/medication")
+
+
+if __name__ == "__main__":
+    main()
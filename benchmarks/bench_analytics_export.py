@@ -0,0 +1,75 @@
+"""
+Benchmark: columnar analytics export.
+
+Saves ``--forms`` synthetic intakes to a temporary SQLite store, exports
+them as Parquet and as gzip CSV, then appends ``--append`` more intakes
+incrementally. Reports time, file size and the peak traced memory of the
+export (which depends on the chunk size, not on the number of intakes).
+
+Usage:
+    python benchmarks/bench_analytics_export.py [--forms N] [--append N] [--chunk-size N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_export import DEFAULT_CHUNK_SIZE, export_submissions  # noqa: E402
+from submission_store import SQLiteSubmissionStore  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def fill(store, first, count, batch=5000):
+    for start in range(first, first + count, batch):
+        store.save_many([make_form_data(seed) for seed in range(start, min(start + batch, first + count))])
+
+
+def traced_export(store, output_dir, chunk_size, export_format):
+    """Export for timing, then re-export into a scratch directory under tracemalloc for the peak"""
+    stats = export_submissions(store, output_dir, chunk_size, export_format)
+    tracemalloc.start()
+    export_submissions(store, output_dir + ".traced", chunk_size, export_format)
+    stats['peak'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return stats
+
+
+def report(label, stats):
+    size = os.path.getsize(stats['path']) if stats['path'] else 0
+    print(f"{label:<22} {stats['rows']:>8} rows {stats['seconds']:>7.2f} s "
+          f"{stats['rows'] / stats['seconds']:>9.0f} rows/s {size / 2**20:>7.2f} MiB "
+          f"peak {stats['peak'] / 2**20:>6.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forms", type=int, default=50_000)
+    parser.add_argument("--append", type=int, default=1_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSubmissionStore(os.path.join(tmp, "submissions.db"))
+        fill(store, 0, args.forms)
+        print(f"Store: {os.path.getsize(os.path.join(tmp, 'submissions.db')) / 2**20:.1f} MiB")
+
+        # Warm the formulary and imports
+        export_submissions(store, os.path.join(tmp, "warmup"), args.chunk_size, 'parquet')
+        for export_format in ('parquet', 'csv'):
+            output = os.path.join(tmp, export_format)
+            report(f"{export_format} full export", traced_export(store, output, args.chunk_size, export_format))
+
+        fill(store, args.forms, args.append)
+        stats = export_submissions(store, os.path.join(tmp, 'parquet'), args.chunk_size, 'parquet')
+        stats['peak'] = 0
+        report("parquet append", stats)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: script executions per answered question.
+
+Drives streamlit_app.py headlessly with Streamlit's AppTest, taps one answer
+button in each button-grid section and counts how many times the script ran
+to handle the tap. Every run of the app calls ``st.set_page_config`` exactly
+once, so counting those calls counts script executions.
+
+Usage:
+    python benchmarks/bench_answer_reruns.py
+"""
+
+import time
+from pathlib import Path
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+
+# (section index, section name, answer button key)
+TAPS = [
+    (1, "Current Symptoms", "symptom_pain_yes"),
+    (2, "Memory and Thinking", "cog_forget_names_sometimes"),
+    (3, "Medications", "meds_yes"),
+    (4, "Daily Activities (Basic)", "adl_bathing_assistance"),
+    (5, "Daily Activities (Complex)", "iadl_shopping_unable"),
+    (6, "Medical History", "med_diabetes_yes"),
+]
+
+script_runs = 0
+_set_page_config = streamlit.set_page_config
+
+
+def _counting_set_page_config(*args, **kwargs):
+    global script_runs
+    script_runs += 1
+    return _set_page_config(*args, **kwargs)
+
+
+def main():
+    global script_runs
+    streamlit.set_page_config = _counting_set_page_config
+
+    print(f"{'Section':<28}{'Button':<30}{'Runs/tap':>10}{'ms/tap':>10}")
+    total_runs = 0
+    for index, name, button_key in TAPS:
+        at = AppTest.from_file(APP_PATH, default_timeout=30)
+        at.run()
+        at.session_state.current_section = index
+        at.run()
+
+        script_runs = 0
+        start = time.perf_counter()
+        at.button(key=button_key).click().run()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        total_runs += script_runs
+        print(f"{name:<28}{button_key:<30}{script_runs:>10}{elapsed_ms:>10.1f}")
+
+    print(f"\nMean script executions per answered question: {total_runs / len(TAPS):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: autosave journal under many tablets.
+
+``--tablets`` threads each fill in a synthetic form one answer at a time;
+after every answer the changed section is appended to one shared
+``AutosaveJournal`` (small journal limits force several compactions).
+Reports append latency, bytes written compared with saving the whole form
+on every answer, and the time to restore a form.
+
+Usage:
+    python benchmarks/bench_autosave.py [--tablets N] [--forms-per-tablet N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from autosave import AutosaveJournal, new_resume_code  # noqa: E402
+from submission_store import serialize_form_data  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def fill_form(journal, seed, timings, written):
+    """Replay one form answer by answer, saving the changed section each time"""
+    code = new_resume_code()
+    final = make_form_data(seed)
+    form_data = {section_id: {} for section_id in final}
+    delta_bytes = full_bytes = 0
+    for section_id, answers in final.items():
+        for key, value in answers.items():
+            form_data[section_id][key] = value
+            payload = serialize_form_data(form_data[section_id])
+            start = time.perf_counter()
+            journal.write(code, section_id, payload)
+            timings.append(time.perf_counter() - start)
+            delta_bytes += len(payload)
+            full_bytes += len(serialize_form_data(form_data))
+    written.append((code, delta_bytes, full_bytes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tablets", type=int, default=48)
+    parser.add_argument("--forms-per-tablet", type=int, default=5)
+    parser.add_argument("--compact-min-bytes", type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = AutosaveJournal(os.path.join(tmp, "autosave.journal"), compact_min_bytes=args.compact_min_bytes)
+        timings, written = [], []
+
+        def tablet(index):
+            for form in range(args.forms_per_tablet):
+                fill_form(journal, index * 1000 + form, timings, written)
+
+        threads = [threading.Thread(target=tablet, args=(i,)) for i in range(args.tablets)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        stats = journal.stats()
+        restore_times = []
+        for code, _, _ in written[:200]:
+            start = time.perf_counter()
+            journal.read(code)
+            restore_times.append(time.perf_counter() - start)
+        journal.close()
+
+        # A fresh process re-indexes the journal on startup
+        start = time.perf_counter()
+        AutosaveJournal(os.path.join(tmp, "autosave.journal"), fsync_interval=0)
+        reopen_seconds = time.perf_counter() - start
+
+    delta_bytes = sum(d for _, d, _ in written)
+    full_bytes = sum(f for _, _, f in written)
+    timings.sort()
+    print(f"Tablets: {args.tablets}, forms: {len(written)}, answers saved: {len(timings)} in {elapsed:.2f} s")
+    print(f"Append latency p50 {statistics.median(timings) * 1e6:.0f} us, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f} us (p99 includes compactions)")
+    print(f"Bytes written, changed section only: {delta_bytes / 2**20:8.1f} MiB")
+    print(f"Bytes written, whole form each time: {full_bytes / 2**20:8.1f} MiB "
+          f"({full_bytes / delta_bytes:.1f}x)")
+    print(f"Journal after run: {stats['bytes'] / 2**20:.2f} MiB ({stats['live_bytes'] / 2**20:.2f} MiB live, "
+          f"{stats['forms']} forms)")
+    print(f"Restore p50 {statistics.median(restore_times) * 1e6:.0f} us; re-index on startup {reopen_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: bytes sent to the browser per rerun.
+
+Drives streamlit_app.py headlessly with Streamlit's AppTest and records every
+ForwardMsg the script enqueues. The browser side of Streamlit's message
+cache is simulated: a cacheable message whose hash the "browser" already
+holds is replaced by a reference message, exactly as a live session would.
+
+Usage:
+    python benchmarks/bench_chrome_bytes.py [--reruns N]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from streamlit.runtime.forward_msg_cache import create_reference_msg, populate_hash_if_needed
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+
+browser_cache = set()
+sent_bytes = 0
+_enqueue = ScriptRunContext.enqueue
+
+
+def _measuring_enqueue(self, msg):
+    global sent_bytes
+    populate_hash_if_needed(msg)
+    if msg.metadata.cacheable and msg.hash in browser_cache:
+        sent_bytes += create_reference_msg(msg).ByteSize()
+    else:
+        sent_bytes += msg.ByteSize()
+        if msg.metadata.cacheable:
+            browser_cache.add(msg.hash)
+    return _enqueue(self, msg)
+
+
+def main():
+    global sent_bytes
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    ScriptRunContext.enqueue = _measuring_enqueue
+
+    at = AppTest.from_file(APP_PATH, default_timeout=30)
+    sent_bytes = 0
+    at.run()
+    first_run = sent_bytes
+
+    sent_bytes = 0
+    start = time.perf_counter()
+    for _ in range(args.reruns):
+        at.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"First run:        {first_run:>8} bytes")
+    print(f"Later reruns:     {sent_bytes / args.reruns:>8.0f} bytes/rerun")
+    print(f"Rerun wall time:  {elapsed / args.reruns * 1000:>8.1f} ms/rerun")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Load test: rerun latency and capacity with many concurrent patients.
+
+Drives streamlit_app.py headlessly with Streamlit's AppTest. Each simulated
+patient (one thread, one AppTest session) fills in a synthetic form the way
+a patient taps through it: personal information field by field, every
+answer button of the eight sections including follow-up questions, the
+medication rows, NEXT on each page (a callback plus ``st.rerun()``), the
+PDF download on the review page and SUBMIT.
+
+AppTest runs one script at a time per process, so the patients share one
+"server" lock: a tap waits for the lock, then runs. This is how one
+Streamlit process spends one core (the GIL serializes script runs), and
+the wait is the queueing delay a patient would see. Reported per
+patient count:
+
+- tap latency (queueing + rerun, as the patient sees it) p50/p95/p99,
+- script time of ``main()`` from the rerun profiler, and script runs per
+  tap (more than 1 where a callback is followed by ``st.rerun()``),
+- memory retained per open session (traced, AppTest element tree included),
+- sessions one core sustains at ``--utilization`` when a patient taps
+  every ``--patient-think`` seconds.
+
+Everything runs offline in a temporary directory.
+
+Usage:
+    python benchmarks/bench_concurrent_sessions.py [--patients 1 4 16] [--think-time S]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep the store, PDF archive and autosave journal out of the checkout
+_TMP = tempfile.TemporaryDirectory()
+os.environ['INTAKE_STORE_PATH'] = os.path.join(_TMP.name, "submissions.db")
+os.environ['INTAKE_ARCHIVE_DIR'] = os.path.join(_TMP.name, "reports")
+os.environ['INTAKE_AUTOSAVE_PATH'] = os.path.join(_TMP.name, "autosave.journal")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from answer_widgets import MISS_DOSES, TAKING_MEDICATIONS, YES_NO  # noqa: E402
+from form_schema import FORM_SCHEMA, iter_items  # noqa: E402
+from pdf_report import get_pdf_report  # noqa: E402
+from rerun_profiler import PROFILER  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+SCHEMA_SECTIONS = ('symptoms', 'cognitive', None, 'adl', 'iadl', 'medical_history')
+
+DEMOGRAPHICS_TEXT = ('first_name', 'last_name', 'phone', 'health_card', 'emergency_name', 'emergency_phone')
+DEMOGRAPHICS_CHOICE = (('sex', 'radio'), ('emergency_relation', 'selectbox'),
+                       ('preferred_language', 'selectbox'))
+
+
+def _find(at, kind, key):
+    """The element of ``kind`` with ``key`` on the current page, or None"""
+    try:
+        return getattr(at, kind)(key=key)
+    except KeyError:
+        return None
+
+
+def _tap_answer(at, rng, widget_prefix, options, value):
+    """Press the answer button for ``value`` (a random option if unset); False if not shown"""
+    suffixes = {option_value: suffix for _, option_value, suffix in options}
+    suffix = suffixes.get(value) or rng.choice(list(suffixes.values()))
+    button = _find(at, 'button', f"{widget_prefix}_{suffix}")
+    if button is None:
+        return False
+    button.click()
+    return True
+
+
+def patient_taps(at, form_data, rng):
+    """Set up each tap of one patient; yields the kind of tap to run next"""
+    demographics = form_data['demographics']
+    for key in DEMOGRAPHICS_TEXT:
+        at.text_input(key=key).input(demographics[key])
+        yield 'type'
+    at.date_input(key='dob').set_value(demographics['date_of_birth'])
+    yield 'type'
+    for key, kind in DEMOGRAPHICS_CHOICE:
+        getattr(at, kind)(key=key).set_value(demographics[key])
+        yield 'type'
+    at.button(key='nav_next').click()
+    yield 'next'
+
+    for section_id in SCHEMA_SECTIONS:
+        if section_id is None:
+            yield from medication_taps(at, form_data['medications'], rng)
+        else:
+            answers = form_data[section_id]
+            for item in iter_items(FORM_SCHEMA[section_id].items):
+                if item.type == 'choice' and _tap_answer(at, rng, item.widget, item.options, answers.get(item.key)):
+                    yield 'answer'
+                elif item.type in ('text', 'textarea') and answers.get(item.key):
+                    element = _find(at, 'text_area' if item.type == 'textarea' else 'text_input', item.widget)
+                    if element is not None:
+                        element.input(answers[item.key])
+                        yield 'type'
+        at.button(key='nav_next').click()
+        yield 'next'
+
+    at.checkbox(key='confirmation').check()
+    yield 'answer'
+    yield 'pdf'
+    at.button(key='submit_form').click()
+    yield 'submit'
+
+
+def medication_taps(at, medications, rng):
+    if _tap_answer(at, rng, 'meds', TAKING_MEDICATIONS, medications.get('taking_medications')):
+        yield 'answer'
+    rows = medications.get('medications_list', [])
+    if medications.get('taking_medications') == 'Yes' and rows:
+        at.number_input(key='num_medications').set_value(len(rows))
+        yield 'type'
+        for i, row in enumerate(rows):
+            name = _find(at, 'text_input', f"med_name_{i}")
+            if name is None:
+                more = _find(at, 'button', 'med_page_next')
+                if more is None:
+                    break
+                more.click()
+                yield 'answer'
+                name = at.text_input(key=f"med_name_{i}")
+            name.input(row['name'])
+            yield 'type'
+            at.text_input(key=f"med_dose_{i}").input(row['dose'])
+            yield 'type'
+        for prefix, key, options in (('help_meds', 'needs_help', YES_NO), ('miss', 'miss_doses', MISS_DOSES)):
+            if _tap_answer(at, rng, prefix, options, medications.get(key)):
+                yield 'answer'
+    if _tap_answer(at, rng, 'allergy', YES_NO, medications.get('has_allergies')):
+        yield 'answer'
+    if medications.get('allergies_list'):
+        allergies = _find(at, 'text_area', 'allergies_list')
+        if allergies is not None:
+            allergies.input(medications['allergies_list'])
+            yield 'type'
+
+
+class Server:
+    """The single script-running "core" the patients share"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.busy = 0.0
+
+    def run(self, at, kind):
+        """Run one tap; returns (waited + ran seconds, script runs)"""
+        queued = time.perf_counter()
+        with self.lock:
+            start = time.perf_counter()
+            runs = len(PROFILER.records)
+            if kind == 'pdf':
+                get_pdf_report(at.session_state.form_data)
+            else:
+                at.run()
+            if at.exception:
+                raise RuntimeError(f"app raised during a {kind} tap: {at.exception}")
+            end = time.perf_counter()
+            self.busy += end - start
+            return end - queued, len(PROFILER.records) - runs
+
+
+def fill_form(server, seed, think_time, results):
+    rng = random.Random(seed)
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    latency, runs = server.run(at, 'load')
+    results.append(('load', latency, runs))
+    for kind in patient_taps(at, make_form_data(seed), rng):
+        if think_time:
+            time.sleep(rng.uniform(0.5, 1.5) * think_time)
+        latency, runs = server.run(at, kind)
+        results.append((kind, latency, runs))
+    if not at.session_state.form_completed:
+        raise RuntimeError(f"patient {seed} did not reach the completion page")
+    return at
+
+
+def percentiles(values):
+    values = sorted(values)
+    return [values[min(len(values) - 1, int(len(values) * q))] for q in (0.50, 0.95, 0.99)]
+
+
+def run_load(patients, think_time, first_seed):
+    server = Server()
+    results = []
+    PROFILER.clear()
+    errors = []
+
+    def patient(seed):
+        try:
+            fill_form(server, seed, think_time, results)
+        except Exception as exc:    # reported after the run
+            errors.append(f"patient {seed}: {exc!r}")
+
+    threads = [threading.Thread(target=patient, args=(first_seed + i,)) for i in range(patients)]
+    start, cpu_start = time.perf_counter(), time.process_time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    if errors:
+        raise SystemExit("\n".join(errors))
+    scripts = [record['ms'] for record in PROFILER.records if record['name'] == 'main']
+    return results, scripts, server.busy, elapsed, cpu
+
+
+def session_memory(sessions):
+    """Traced bytes retained per open session, each filled in up to the review page"""
+    server = Server()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    open_sessions = []
+    for seed in range(sessions):
+        at = AppTest.from_file(APP_PATH, default_timeout=60)
+        server.run(at, 'load')
+        for kind in patient_taps(at, make_form_data(10_000 + seed), random.Random(seed)):
+            if kind == 'pdf':
+                break
+            server.run(at, kind)
+        open_sessions.append(at)
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return retained / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--think-time", type=float, default=0.2,
+                        help="mean seconds between a simulated patient's taps")
+    parser.add_argument("--patient-think", type=float, default=8.0,
+                        help="mean seconds between a real patient's taps, for the capacity estimate")
+    parser.add_argument("--utilization", type=float, default=0.7,
+                        help="target core utilization for the capacity estimate")
+    parser.add_argument("--memory-sessions", type=int, default=3)
+    args = parser.parse_args()
+
+    PROFILER.records = deque(maxlen=1_000_000)
+    PROFILER.enabled = True
+
+    print(f"{'Patients':>8}{'taps':>7}{'tap p50':>9}{'p95':>8}{'p99':>8}{'script p50':>12}{'p95':>8}{'p99':>8}"
+          f"{'runs/tap':>10}{'PDF ms':>8}{'busy %':>8}{'taps/s':>8}")
+    service_per_tap = []
+    for patients in args.patients:
+        results, scripts, busy, elapsed, cpu = run_load(patients, args.think_time, first_seed=patients * 1000)
+        taps = [latency * 1000 for kind, latency, _ in results if kind not in ('load', 'pdf')]
+        runs = [count for kind, _, count in results if kind not in ('load', 'pdf')]
+        pdf = [latency * 1000 for kind, latency, _ in results if kind == 'pdf']
+        service_per_tap.append(cpu / len(results))
+        tap_p50, tap_p95, tap_p99 = percentiles(taps)
+        script_p50, script_p95, script_p99 = percentiles(scripts)
+        print(f"{patients:>8}{len(taps):>7}{tap_p50:>9.1f}{tap_p95:>8.1f}{tap_p99:>8.1f}"
+              f"{script_p50:>12.1f}{script_p95:>8.1f}{script_p99:>8.1f}{statistics.mean(runs):>10.2f}"
+              f"{statistics.median(pdf):>8.0f}{busy / elapsed:>8.0%}{len(results) / elapsed:>8.1f}")
+    PROFILER.enabled = False
+
+    per_session = session_memory(args.memory_sessions)
+    cpu_per_tap = min(service_per_tap)
+    print(f"\nMemory retained per open session: {per_session / 1024:.0f} KiB (AppTest element tree included)")
+    print(f"CPU per tap: {cpu_per_tap * 1000:.1f} ms (process time, AppTest harness included)")
+    print(f"Sustainable sessions per core at {args.utilization:.0%} utilization, one tap every "
+          f"{args.patient_think:g} s: {args.utilization * args.patient_think / cpu_per_tap:.0f}")
+
+
+if __name__ == "__main__":
+    main()
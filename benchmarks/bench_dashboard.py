@@ -0,0 +1,83 @@
+"""
+Benchmark: clinician dashboard queries on rollup counters.
+
+Saves ``--forms`` synthetic intakes spread over ``--days`` days (one
+``save_many`` per day, which also updates the rollup counters), then times
+the dashboard's queries for a 30-day and a whole-period window against the
+full scan of stored intakes they replace.
+
+Usage:
+    python benchmarks/bench_dashboard.py [--forms N] [--days N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rollups import SUBMISSIONS_METRIC  # noqa: E402
+from submission_store import SQLiteSubmissionStore  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forms", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    per_day = max(1, args.forms // args.days)
+    end = datetime(2026, 1, 1)
+    first_day = end - timedelta(days=args.days)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSubmissionStore(os.path.join(tmp, "submissions.db"))
+        save_seconds = 0.0
+        for day in range(args.days):
+            forms = [make_form_data(day * per_day + i) for i in range(per_day)]
+            start = time.perf_counter()
+            store.save_many(forms, submitted_at=first_day + timedelta(days=day))
+            save_seconds += time.perf_counter() - start
+        forms_saved = per_day * args.days
+        rollup_rows = store._conn.execute("SELECT COUNT(*) FROM rollup_counts").fetchone()[0]
+
+        month = (end - timedelta(days=30)).date(), end.date()
+        _, version_seconds = timed(store.data_version)
+        _, month_seconds = timed(lambda: store.rollup_totals(*month))
+        totals, year_seconds = timed(lambda: store.rollup_totals(first_day.date(), end.date()))
+        _, daily_seconds = timed(lambda: store.rollup_daily(SUBMISSIONS_METRIC, '', first_day.date(), end.date()))
+
+        def scan():
+            counts = Counter()
+            for _, _, form_data in store.iter_submissions():
+                counts.update((f"symptoms.{k}", v) for k, v in form_data['symptoms'].items())
+            return counts
+        _, scan_seconds = timed(scan, repeat=1)
+        store.close()
+
+    assert totals[SUBMISSIONS_METRIC, ''] == forms_saved
+    print(f"Intakes: {forms_saved} over {args.days} days, {rollup_rows} rollup rows")
+    print(f"save_many incl. rollups:   {save_seconds / forms_saved * 1000:>8.2f} ms/intake")
+    print(f"data_version:              {version_seconds * 1000:>8.2f} ms")
+    print(f"Totals, last 30 days:      {month_seconds * 1000:>8.2f} ms")
+    print(f"Totals, whole period:      {year_seconds * 1000:>8.2f} ms")
+    print(f"Daily volume, whole period:{daily_seconds * 1000:>8.2f} ms")
+    print(f"Full scan (symptoms only): {scan_seconds * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
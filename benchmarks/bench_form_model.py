@@ -0,0 +1,82 @@
+"""
+Benchmark: memory of 10,000 forms as dicts, typed IntakeForms and binary records.
+
+Builds ``--sessions`` synthetic forms and measures with tracemalloc the
+memory they retain as form_data dicts - as the widgets build them, sharing
+the schema's option strings, and as loaded back from JSON, where every
+answer is a string of its own - as ``IntakeForm`` objects and as
+``intake_codec`` records, then times the conversions.
+
+Usage:
+    python benchmarks/bench_form_model.py [--sessions N]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from form_model import IntakeForm  # noqa: E402
+from intake_codec import decode_record, encode_record  # noqa: E402
+from submission_store import deserialize_form_data, serialize_form_data  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def retained(build):
+    """Traced bytes held by the result of build()"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=10_000)
+    args = parser.parse_args()
+
+    payloads = [serialize_form_data(make_form_data(seed)) for seed in range(args.sessions)]
+    dicts = [deserialize_form_data(payload) for payload in payloads]
+    forms = [IntakeForm.from_form_data(form_data) for form_data in dicts]
+    records = [encode_record(form_data) for form_data in dicts]
+
+    session_bytes = retained(lambda: [make_form_data(seed) for seed in range(args.sessions)])
+    json_bytes = retained(lambda: [deserialize_form_data(payload) for payload in payloads])
+    form_bytes = retained(lambda: [IntakeForm.from_form_data(deserialize_form_data(payload))
+                                   for payload in payloads])
+    record_bytes = retained(lambda: [encode_record(form_data) for form_data in dicts])
+
+    print(f"{args.sessions} forms{'total MiB':>14}{'per form':>12}")
+    for label, size in (("session dicts", session_bytes), ("JSON-loaded dicts", json_bytes),
+                        ("IntakeForm", form_bytes), ("records", record_bytes)):
+        print(f"{label:<18}{size / 2**20:>11.1f}{size / args.sessions:>10.0f} B"
+              f"{session_bytes / size:>8.1f}x")
+
+    sample = range(min(args.sessions, 2000))
+    print(f"\n{'Conversion':<32}{'us/form':>8}")
+    for label, fn, items in (
+        ("from_form_data (validates)", IntakeForm.from_form_data, [dicts[i] for i in sample]),
+        ("to_form_data", IntakeForm.to_form_data, [forms[i] for i in sample]),
+        ("encode_record", encode_record, [dicts[i] for i in sample]),
+        ("decode_record", decode_record, [records[i] for i in sample]),
+        ("JSON serialize (reference)", serialize_form_data, [dicts[i] for i in sample]),
+        ("JSON deserialize (reference)", deserialize_form_data, [payloads[i] for i in sample]),
+    ):
+        print(f"{label:<32}{timed(fn, items):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: formulary suggestion latency and index memory.
+
+Builds a synthetic formulary of ``--entries`` names (the bundled formulary
+plus generated brand-like names and strength/form variants), then times
+``Formulary.suggest`` for keystroke-by-keystroke prefixes of real drug names
+and for misspellings that need the fuzzy fallback.
+
+Usage:
+    python benchmarks/bench_formulary.py [--entries 50000]
+"""
+
+import argparse
+import csv
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from formulary import DEFAULT_FORMULARY_PATH, Formulary  # noqa: E402
+
+SYLLABLES = ["ba", "cor", "da", "fen", "ga", "lix", "mo", "nex", "pra", "quin", "ro", "sal",
+             "ta", "val", "zo", "tri", "mel", "dol", "pine", "tan", "pril", "lol", "mab", "zide"]
+FORMS = ["tablet", "capsule", "oral solution", "injection", "XR tablet", "patch"]
+STRENGTHS = ["1 mg", "2.5 mg", "5 mg", "10 mg", "20 mg", "40 mg", "100 mg", "250 mg", "500 mg"]
+MISSPELLINGS = ["metfromin", "warfrin", "amlodapine", "atorvastatine", "acetaminophine",
+                "eliquiss", "levothyroxin", "furosamide", "pantoprazol", "donezepil"]
+
+
+def synthetic_entries(count, seed=0):
+    rng = random.Random(seed)
+    with open(DEFAULT_FORMULARY_PATH, newline='', encoding='utf-8') as f:
+        entries = [(row['name'], row['ingredient']) for row in csv.DictReader(f)]
+    generics = sorted({ingredient for _, ingredient in entries})
+    seen = {name.casefold() for name, _ in entries}
+    while len(seen) < count:
+        if rng.random() < 0.5:
+            ingredient = rng.choice(generics)
+            name = f"{ingredient} {rng.choice(STRENGTHS)} {rng.choice(FORMS)}"
+        else:
+            name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+            ingredient = name
+        if name.casefold() not in seen:
+            seen.add(name.casefold())
+            entries.append((name, ingredient))
+    return entries
+
+
+def time_queries(formulary, queries, repeat=20):
+    for query in queries:
+        formulary.suggest(query)
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            formulary.suggest(query)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1e3, timings[int(len(timings) * 0.99)] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    entries = synthetic_entries(args.entries)
+    tracemalloc.start()
+    start = time.perf_counter()
+    formulary = Formulary(entries)
+    build_seconds = time.perf_counter() - start
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    keystrokes = [name.lower()[:n] for name in ["metformin", "atorvastatin", "warfarin", "tylenol",
+                                                "pantoprazole", "zopiclone", "salbutamol"]
+                  for n in range(1, len(name) + 1)]
+    prefix_p50, prefix_p99 = time_queries(formulary, keystrokes)
+    fuzzy_p50, fuzzy_p99 = time_queries(formulary, MISSPELLINGS)
+
+    print(f"Entries:            {len(formulary):>10}")
+    print(f"Build time:         {build_seconds * 1000:>10.0f} ms")
+    print(f"Index memory:       {formulary.memory_bytes() / 2**20:>10.1f} MiB (traced {traced / 2**20:.1f} MiB)")
+    print(f"Prefix suggest:     {prefix_p50:>10.3f} ms p50 {prefix_p99:>8.3f} ms p99")
+    print(f"Fuzzy suggest:      {fuzzy_p50:>10.3f} ms p50 {fuzzy_p99:>8.3f} ms p99")
+    for query in MISSPELLINGS[:3]:
+        print(f"  {query!r:>18} -> {[name for name, _ in formulary.suggest(query, limit=3)]}")
+
+
+if __name__ == "__main__":
+    main()
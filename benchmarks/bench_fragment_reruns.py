@@ -0,0 +1,107 @@
+"""
+Benchmark: full-page rerun versus fragment rerun per answered question.
+
+Drives streamlit_app.py headlessly with Streamlit's AppTest. For one answer
+button per schema-driven section it times two ways of handling the tap:
+
+- full rerun: the whole script runs (logo, progress bar, every question of
+  the section, navigation), as it did before question blocks were fragments;
+- fragment rerun: only the fragment holding the question runs, which is what
+  a live session does now.
+
+Wall time includes AppTest's fixed per-run setup (~15 ms here), so the
+number of deltas (elements redrawn and sent to the tablet) is reported too.
+
+AppTest always requests full reruns, so the fragment id of the tapped
+question is recorded from the enqueued deltas and injected into the rerun
+request, exactly as the browser would send it.
+
+Usage:
+    python benchmarks/bench_fragment_reruns.py [--taps N]
+"""
+
+import argparse
+import time
+from functools import partial
+from pathlib import Path
+
+import streamlit.testing.v1.local_script_runner as local_script_runner
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+
+# (section index, section name, the two answer buttons tapped alternately)
+TAPS = [
+    (1, "Current Symptoms", "symptom_dizziness_yes", "symptom_dizziness_no"),
+    (2, "Memory and Thinking", "cog_forget_names_sometimes", "cog_forget_names_no"),
+    (4, "Daily Activities (Basic)", "adl_bathing_assistance", "adl_bathing_independent"),
+    (5, "Daily Activities (Complex)", "iadl_shopping_unable", "iadl_shopping_independent"),
+    (6, "Medical History", "med_diabetes_yes", "med_diabetes_no"),
+]
+
+widget_fragments = {}   # widget id -> fragment id of the block that drew it
+deltas_sent = 0
+_enqueue = ScriptRunContext.enqueue
+
+
+def _recording_enqueue(self, msg):
+    global deltas_sent
+    if msg.HasField("delta"):
+        deltas_sent += 1
+    if msg.HasField("delta") and msg.delta.fragment_id:
+        element = msg.delta.new_element
+        kind = element.WhichOneof("type")
+        if kind:
+            widget_id = getattr(getattr(element, kind), "id", "")
+            if widget_id:
+                widget_fragments[widget_id] = msg.delta.fragment_id
+    return _enqueue(self, msg)
+
+
+def _tap(at, button_key, fragment_id=None):
+    """Click a button; rerun only its fragment if ``fragment_id`` is given"""
+    if fragment_id:
+        local_script_runner.RerunData = partial(RerunData, fragment_id_queue=[fragment_id])
+    try:
+        start = time.perf_counter()
+        at.button(key=button_key).click().run()
+        return time.perf_counter() - start
+    finally:
+        local_script_runner.RerunData = RerunData
+
+
+def main():
+    global deltas_sent
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--taps", type=int, default=20)
+    args = parser.parse_args()
+
+    ScriptRunContext.enqueue = _recording_enqueue
+
+    print(f"{'Section':<28}{'Full ms':>9}{'Fragment ms':>13}{'Full deltas':>13}{'Fragment deltas':>17}")
+    for index, name, first_key, second_key in TAPS:
+        at = AppTest.from_file(APP_PATH, default_timeout=30)
+        at.run()
+        at.session_state.current_section = index
+        at.run()
+        fragment_id = widget_fragments[at.button(key=first_key).id]
+
+        timings, deltas = {}, {}
+        for mode in ("full", "fragment"):
+            elapsed = 0.0
+            deltas_sent = 0
+            for tap in range(args.taps):
+                key = first_key if tap % 2 == 0 else second_key
+                elapsed += _tap(at, key, fragment_id if mode == "fragment" else None)
+                assert not at.exception, at.exception
+            timings[mode] = elapsed / args.taps * 1000
+            deltas[mode] = deltas_sent / args.taps
+
+        print(f"{name:<28}{timings['full']:>9.1f}{timings['fragment']:>13.1f}"
+              f"{deltas['full']:>13.0f}{deltas['fragment']:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
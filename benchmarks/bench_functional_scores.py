@@ -0,0 +1,54 @@
+"""
+Benchmark: Katz / Lawton scoring of many submissions.
+
+Scores ``--forms`` synthetic completed forms three ways: one form at a time
+with ``functional_scores``, all at once with ``score_many`` (encode + score),
+and the NumPy scoring step alone on already-encoded answer arrays.
+
+Usage:
+    python benchmarks/bench_functional_scores.py [--forms N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from functional_scores import (  # noqa: E402
+    ADL_CODES, ADL_ITEMS, KATZ_POINTS, encode_many, functional_scores, score_codes, score_many,
+)
+from sample_data import make_form_data  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forms", type=int, default=10_000)
+    args = parser.parse_args()
+
+    form_datas = [make_form_data(seed) for seed in range(args.forms)]
+
+    singles, single_seconds = timed(lambda: [functional_scores(f) for f in form_datas])
+    bulk, bulk_seconds = timed(lambda: score_many(form_datas))
+    assert [s.katz for s in singles] == bulk.katz.tolist()
+    assert [s.lawton for s in singles] == bulk.lawton.tolist()
+
+    codes = encode_many([f['adl'] for f in form_datas], ADL_ITEMS, ADL_CODES)
+    _, kernel_seconds = timed(lambda: score_codes(codes, KATZ_POINTS))
+
+    print(f"Forms:                        {args.forms:>8}")
+    print(f"One at a time:                {single_seconds * 1000:>8.1f} ms")
+    print(f"score_many (encode + score):  {bulk_seconds * 1000:>8.1f} ms")
+    print(f"Katz scoring of encoded array:{kernel_seconds * 1000:>8.2f} ms")
+    print(f"Mean Katz {bulk.katz.mean():.2f}/6, mean Lawton {bulk.lawton.mean():.2f}/8")
+
+
+if __name__ == "__main__":
+    main()
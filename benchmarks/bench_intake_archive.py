@@ -0,0 +1,102 @@
+"""
+Benchmark: bitmap queries over a memory-mapped archive of N intakes.
+
+Builds an ``IntakeArchive`` of ``--records`` synthetic submissions spread
+over ``--years`` years (the forms cycle through ``--distinct`` generated
+ones), reopens it and times boolean queries on the bitmaps, then reading
+the hits' records, against the reference of parsing every stored JSON
+payload (measured on a sample and scaled to N).
+
+Usage:
+    python benchmarks/bench_intake_archive.py [--records N] [--years Y]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from intake_archive import IntakeArchive  # noqa: E402
+from submission_store import serialize_form_data  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def timed(fn, repeat=20):
+    """Median milliseconds of fn() and its last result"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=300_000)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--distinct", type=int, default=10_000, help="distinct generated forms")
+    args = parser.parse_args()
+
+    forms = [make_form_data(seed) for seed in range(args.distinct)]
+    first_day = datetime(2026 - args.years, 1, 1, 8)
+    step = timedelta(days=365.25 * args.years) / args.records
+    submissions = (
+        (i + 1, first_day + step * i, forms[i % args.distinct]) for i in range(args.records)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        IntakeArchive(tmp).append(submissions)
+        build_s = time.perf_counter() - start
+        sizes = {name: os.path.getsize(os.path.join(tmp, name)) for name in sorted(os.listdir(tmp))}
+
+        start = time.perf_counter()
+        archive = IntakeArchive(tmp)
+        open_ms = (time.perf_counter() - start) * 1000
+        rebuild_ms, _ = timed(archive._build_bitmaps, repeat=3)
+
+        print(f"{len(archive)} intakes archived in {build_s:.1f} s, opened in {open_ms:.2f} ms, "
+              f"bitmaps rebuilt in {rebuild_ms:.0f} ms")
+        for name, size in sizes.items():
+            print(f"  {name:<18}{size / 2**20:>8.1f} MiB{size / len(archive):>8.1f} B/intake")
+
+        queries = (
+            ("falls & dementia in 2025", lambda: archive.count(
+                archive.bitmap('falls') & archive.bitmap('dementia')
+                & archive.submitted_between('2025-01-01', '2026-01-01'))),
+            ("(falls | balance) & ~depression", lambda: archive.count(
+                (archive.bitmap('falls') | archive.bitmap('balance')) & ~archive.bitmap('depression'))),
+            ("dementia = Not Sure, ids", lambda: len(archive.submission_ids(
+                archive.bitmap('dementia', "Not Sure")))),
+        )
+        print(f"\n{'Query':<34}{'ms':>8}{'matches':>10}")
+        for label, query in queries:
+            ms, matches = timed(query)
+            print(f"{label:<34}{ms:>8.2f}{matches:>10}")
+
+        hits = archive.rows(archive.bitmap('falls') & archive.bitmap('dementia')
+                            & archive.submitted_between('2025-01-01', '2026-01-01'))
+        read_ms, _ = timed(lambda: [archive.reader(row).answers('adl') for row in hits], repeat=3)
+        decode_ms, _ = timed(lambda: [archive.form_data(row) for row in hits], repeat=3)
+        print(f"{'read ADL answers of the hits':<34}{read_ms:>8.2f}{len(hits):>10}")
+        print(f"{'decode the hits':<34}{decode_ms:>8.2f}{len(hits):>10}")
+
+    payloads = [serialize_form_data(form_data) for form_data in forms[:2000]]
+    start = time.perf_counter()
+    for payload in payloads:
+        form_data = json.loads(payload)
+        form_data['symptoms'].get('falls') == "Yes" and form_data['medical_history'].get('dementia') == "Yes"
+    scan_s = (time.perf_counter() - start) / len(payloads) * args.records
+    print(f"\nReference: parsing {args.records} JSON payloads for one query takes about {scan_s:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: intake_codec binary records vs. JSON for size, encode and decode time.
+
+Encodes ``--forms`` synthetic forms both as ``intake_codec`` records and as
+the JSON ``submission_store`` writes, and reports the bytes per form, the
+encode and full decode time, and the time to read one section's answers
+(the ADL answers, as the functional scores do) from each stored form:
+``RecordReader`` slices them out of the record, JSON has to be parsed
+whole.
+
+Usage:
+    python benchmarks/bench_intake_codec.py [--forms N]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from intake_codec import RecordReader, decode_record, encode_record  # noqa: E402
+from submission_store import deserialize_form_data, serialize_form_data  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def timed(fn, items, repeat=5):
+    """Best of ``repeat`` runs over the items, in microseconds per item"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forms", type=int, default=5000)
+    args = parser.parse_args()
+
+    forms = [make_form_data(seed) for seed in range(args.forms)]
+    records = [encode_record(form_data) for form_data in forms]
+    payloads = [serialize_form_data(form_data) for form_data in forms]
+    if any(decode_record(record) != form_data for record, form_data in zip(records, forms)):
+        raise SystemExit("records do not round-trip")
+
+    record_size = statistics.mean(len(record) for record in records)
+    json_size = statistics.mean(len(payload.encode()) for payload in payloads)
+    print(f"{args.forms} forms{'record':>12}{'JSON':>10}{'ratio':>8}")
+    print(f"{'bytes/form':<16}{record_size:>10.0f}{json_size:>10.0f}{json_size / record_size:>7.1f}x")
+
+    print(f"\n{'us/form':<16}{'record':>10}{'JSON':>10}{'speedup':>9}")
+    for label, record_fn, record_items, json_fn, json_items in (
+        ("encode", encode_record, forms, serialize_form_data, forms),
+        ("decode", decode_record, records, deserialize_form_data, payloads),
+        ("ADL answers", lambda record: RecordReader(record).answers('adl'), records,
+         lambda payload: json.loads(payload)['adl'], payloads),
+    ):
+        record_us, json_us = timed(record_fn, record_items), timed(json_fn, json_items)
+        print(f"{label:<16}{record_us:>10.1f}{json_us:>10.1f}{json_us / record_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: medication section cost versus the number of medications.
+
+Drives streamlit_app.py headlessly with Streamlit's AppTest. For each list
+length it loads a completed form with that many medications, opens the
+Medications section, and measures the widgets drawn and the time taken to
+handle an edit of the first medication's name. AppTest always reruns the
+whole script, so the timings do not include the editor's fragment savings.
+
+Usage:
+    python benchmarks/bench_medication_editor.py [--edits N]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from sample_data import FREQUENCIES, MEDICATIONS, make_form_data
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+MEDICATIONS_SECTION = 3
+LIST_LENGTHS = [1, 5, 15, 25, 30]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--edits", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'Medications':>12}{'Widgets':>10}{'ms/edit':>10}")
+    for length in LIST_LENGTHS:
+        form_data = make_form_data(seed=length)
+        medications = form_data['medications']
+        medications['taking_medications'] = "Yes"
+        medications['num_medications'] = length
+        medications['medications_list'] = [
+            {'name': MEDICATIONS[i % len(MEDICATIONS)], 'dose': "10mg", 'frequency': FREQUENCIES[i % len(FREQUENCIES)]}
+            for i in range(length)
+        ]
+
+        at = AppTest.from_file(APP_PATH, default_timeout=30)
+        at.run()
+        at.session_state.form_data = form_data
+        at.session_state.current_section = MEDICATIONS_SECTION
+        at.run()
+        widgets = len(at.text_input) + len(at.selectbox) + len(at.number_input)
+
+        start = time.perf_counter()
+        for edit in range(args.edits):
+            at.text_input(key="med_name_0").input(f"Medication {edit}").run()
+            assert not at.exception, at.exception
+        elapsed_ms = (time.perf_counter() - start) / args.edits * 1000
+
+        print(f"{length:>12}{widgets:>10}{elapsed_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: orientation scoring of stored submissions.
+
+Saves ``--forms`` synthetic intakes to a temporary SQLite store, then
+re-scores them one at a time with ``OrientationScorer.score`` and in
+batches with ``rescore_submissions`` straight from the store.
+
+Usage:
+    python benchmarks/bench_orientation.py [--forms N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from orientation import DEFAULT_CLINIC_FACTS, OrientationScorer, rescore_submissions  # noqa: E402
+from submission_store import SQLiteSubmissionStore  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forms", type=int, default=10_000)
+    args = parser.parse_args()
+
+    scorer = OrientationScorer(DEFAULT_CLINIC_FACTS['hospital_names'], DEFAULT_CLINIC_FACTS['city_names'])
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSubmissionStore(os.path.join(tmp, "submissions.db"))
+        store.save_many([make_form_data(seed) for seed in range(args.forms)], submitted_at=datetime.now())
+
+        submissions, load_seconds = timed(lambda: list(store.iter_submissions()))
+        singles, single_seconds = timed(lambda: [
+            scorer.score(form_data['cognitive'], datetime.fromisoformat(submitted_at).date())
+            for _, submitted_at, form_data in submissions
+        ])
+        rescored, bulk_seconds = timed(lambda: list(rescore_submissions(submissions, scorer=scorer)))
+        assert [s.score for s in singles] == [score for _, _, score, _ in rescored]
+        _, store_seconds = timed(lambda: list(rescore_submissions(store.iter_submissions(), scorer=scorer)))
+        store.close()
+
+    scores = [score for _, _, score, _ in rescored]
+    print(f"Forms:                          {args.forms:>8}")
+    print(f"Load from store:                {load_seconds * 1000:>8.1f} ms")
+    print(f"One at a time:                  {single_seconds * 1000:>8.1f} ms")
+    print(f"rescore_submissions (batches):  {bulk_seconds * 1000:>8.1f} ms")
+    print(f"Store -> rescore, streamed:     {store_seconds * 1000:>8.1f} ms")
+    print(f"Mean orientation {sum(scores) / len(scores):.2f}/6")
+
+
+if __name__ == "__main__":
+    main()
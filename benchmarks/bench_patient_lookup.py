@@ -0,0 +1,71 @@
+"""
+Benchmark: returning-patient lookup.
+
+Saves ``--forms`` synthetic intakes for ``--patients`` distinct patients (so
+each patient has several visits) to a temporary SQLite store, then times
+``latest_for_patient`` for random patients and prints SQLite's query plan.
+
+Usage:
+    python benchmarks/bench_patient_lookup.py [--forms N] [--patients N] [--lookups N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from submission_store import SQLiteSubmissionStore  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forms", type=int, default=100_000)
+    parser.add_argument("--patients", type=int, default=25_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    # Visit v of patient p reuses the demographics of the patient's first form
+    patients = [make_form_data(seed)['demographics'] for seed in range(args.patients)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSubmissionStore(os.path.join(tmp, "submissions.db"))
+        for start in range(0, args.forms, 5000):
+            batch = []
+            for seed in range(start, min(start + 5000, args.forms)):
+                form_data = make_form_data(seed)
+                form_data['demographics'] = patients[seed % args.patients]
+                batch.append(form_data)
+            store.save_many(batch)
+
+        plan = store._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id, submitted_at, form_data FROM submissions"
+            " WHERE health_card = ? AND date_of_birth = ? ORDER BY id DESC LIMIT 1", ('', '')
+        ).fetchall()
+
+        rng = random.Random(0)
+        timings = []
+        for _ in range(args.lookups):
+            patient = rng.randrange(args.patients)
+            demo = patients[patient]
+            start = time.perf_counter()
+            found = store.latest_for_patient(demo['health_card'], demo['date_of_birth'])
+            timings.append(time.perf_counter() - start)
+            latest = patient + (args.forms - 1 - patient) // args.patients * args.patients
+            assert found is not None and found[0] == latest + 1
+        store.close()
+
+    timings.sort()
+    print(f"Intakes: {args.forms}, patients: {args.patients}")
+    print("Plan: " + "; ".join(row[-1] for row in plan))
+    print(f"Lookup p50 {statistics.median(timings) * 1000:.3f} ms, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms (including JSON decoding of the record)")
+
+
+if __name__ == "__main__":
+    main()
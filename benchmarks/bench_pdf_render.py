@@ -0,0 +1,68 @@
+"""
+Microbenchmark: generate_pdf_report latency and allocations.
+
+Renders N synthetic reports back to back and reports per-report wall time,
+then renders a sample under tracemalloc to report per-report allocations.
+
+Usage:
+    python benchmarks/bench_pdf_render.py [--reports 1000] [--traced 100]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_report import generate_pdf_report  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, default=1000)
+    parser.add_argument("--traced", type=int, default=100,
+                        help="number of reports rendered under tracemalloc")
+    args = parser.parse_args()
+
+    forms = [make_form_data(seed) for seed in range(args.reports)]
+    generate_pdf_report(forms[0])  # warm-up: fonts, imports
+
+    latencies = []
+    total_bytes = 0
+    start = time.perf_counter()
+    for form_data in forms:
+        t0 = time.perf_counter()
+        total_bytes += len(generate_pdf_report(form_data).getvalue())
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    peaks = []
+    tracemalloc.start()
+    start_memory, _ = tracemalloc.get_traced_memory()
+    for form_data in forms[:args.traced]:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        generate_pdf_report(form_data)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    print(f"Reports rendered:        {args.reports}")
+    print(f"Total time:              {elapsed:.2f} s ({args.reports / elapsed:.0f} reports/s)")
+    print(f"Latency mean / p50:      {statistics.mean(latencies) * 1000:.2f} / "
+          f"{latencies[len(latencies) // 2] * 1000:.2f} ms")
+    print(f"Latency p95 / p99:       {latencies[int(len(latencies) * 0.95)] * 1000:.2f} / "
+          f"{latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"Mean PDF size:           {total_bytes / args.reports / 1024:.1f} KiB")
+    print(f"Allocated (peak):        {statistics.mean(peaks) / 1024:.1f} KiB per report")
+    print(f"Retained after render:   {(retained - start_memory) / args.traced / 1024:.2f} KiB per report")
+
+
+if __name__ == "__main__":
+    main()
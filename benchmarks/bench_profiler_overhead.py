@@ -0,0 +1,92 @@
+"""
+Benchmark: cost of the rerun profiler, disabled and enabled.
+
+Times a ``@profiled`` no-op against the bare function with the profiler
+disabled, then drives streamlit_app.py with Streamlit's AppTest through
+every section with the profiler off and on. The disabled overhead per
+rerun is the wrapper cost times the number of profiled calls of a rerun,
+relative to the rerun's own script time.
+
+Usage:
+    python benchmarks/bench_profiler_overhead.py [--reruns N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from rerun_profiler import PROFILER, profiled  # noqa: E402
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+SECTIONS = 8
+
+
+def wrapper_cost_ns(number=1_000_000):
+    """Extra nanoseconds per call of a disabled @profiled function"""
+    def bare():
+        return None
+    wrapped = profiled(bare)
+    PROFILER.enabled = False
+    base = min(timeit.repeat(bare, number=number, repeat=5))
+    cost = min(timeit.repeat(wrapped, number=number, repeat=5))
+    return (cost - base) / number * 1e9
+
+
+def run_sections(reruns, enabled):
+    """Median at.run() wall time (ms) per section"""
+    PROFILER.enabled = enabled
+    at = AppTest.from_file(APP_PATH, default_timeout=30)
+    at.run()
+    medians = []
+    for section in range(SECTIONS):
+        at.session_state.current_section = section
+        at.run()
+        timings = []
+        for _ in range(reruns):
+            start = time.perf_counter()
+            at.run()
+            timings.append((time.perf_counter() - start) * 1000)
+        medians.append(statistics.median(timings))
+    return medians
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reruns", type=int, default=30)
+    args = parser.parse_args()
+
+    per_call = wrapper_cost_ns()
+    print(f"Disabled @profiled wrapper: {per_call:.0f} ns per call\n")
+
+    off = run_sections(args.reruns, enabled=False)
+    PROFILER.clear()
+    on = run_sections(args.reruns, enabled=True)
+    records = [record for record in PROFILER.records if record['name'] == 'main']
+    PROFILER.enabled = False
+
+    by_section = {}
+    for record in records:
+        # The span after the page chrome is the section renderer
+        section_span = record['spans'][-1]['name'] if record['spans'] else ''
+        by_section.setdefault(section_span, []).append(record)
+
+    print(f"{'Section':<26}{'off ms':>9}{'on ms':>9}{'script ms':>11}{'spans':>7}{'widgets':>9}"
+          f"{'KiB':>8}{'disabled':>11}")
+    for index, (name, section_records) in enumerate(by_section.items()):
+        record = section_records[-1]
+        script_ms = statistics.median(r['ms'] for r in section_records)
+        spans = len(record['spans']) + 1
+        disabled = spans * per_call / 1e6 / script_ms
+        print(f"{name:<26}{off[index]:>9.1f}{on[index]:>9.1f}{script_ms:>11.1f}{spans:>7}"
+              f"{record['widgets']:>9}{record['bytes'] / 1024:>8.1f}{disabled:>10.4%}")
+
+
+if __name__ == "__main__":
+    main()
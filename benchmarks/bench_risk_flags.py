@@ -0,0 +1,58 @@
+"""
+Benchmark: risk-flag evaluation over the submission store.
+
+Saves ``--forms`` synthetic intakes to a temporary SQLite store, then times
+the compiled rules alone on in-memory forms and a full ``scan_submissions``
+pass streamed from the store.
+
+Usage:
+    python benchmarks/bench_risk_flags.py [--forms N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from risk_flags import RISK_RULES, evaluate_rules, scan_submissions  # noqa: E402
+from submission_store import SQLiteSubmissionStore  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forms", type=int, default=50_000)
+    args = parser.parse_args()
+
+    form_datas = [make_form_data(seed) for seed in range(args.forms)]
+    _, rules_seconds = timed(lambda: [evaluate_rules(f) for f in form_datas])
+    _, section_seconds = timed(lambda: [evaluate_rules(f, sections=['symptoms']) for f in form_datas])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSubmissionStore(os.path.join(tmp, "submissions.db"))
+        store.save_many(form_datas)
+        flagged, scan_seconds = timed(lambda: list(scan_submissions(store.iter_submissions())))
+        store.close()
+
+    counts = Counter(rule.id for *_, rules in flagged for rule in rules)
+    print(f"Forms:                         {args.forms:>8}")
+    print(f"All {len(RISK_RULES)} rules, in memory:       {rules_seconds * 1000:>8.1f} ms "
+          f"({rules_seconds / args.forms * 1e6:.2f} us/form)")
+    print(f"Rules reading one section:     {section_seconds * 1000:>8.1f} ms")
+    print(f"Store scan (load + rules):     {scan_seconds * 1000:>8.1f} ms")
+    print(f"Flagged intakes: {len(flagged)} - " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: shared session store throughput vs. number of worker processes.
+
+``--workers`` processes open one ``SQLiteSessionStore`` and serve requests
+for a shared pool of sessions with no routing affinity: every request picks
+a random session, so consecutive requests of a session land on different
+workers. A request does what a script run does with a shared store: check
+the stored version, adopt the stored state if another worker wrote it,
+change one answer, burn ``--script-ms`` of CPU standing in for the script
+itself, and write the state back (compare-and-set, retried on a conflict).
+
+Usage:
+    python benchmarks/bench_session_workers.py [--workers 1 2 4 8] [--seconds S]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sample_data import make_form_data  # noqa: E402
+from session_store import SQLiteSessionStore, decode_session, encode_session  # noqa: E402
+
+ANSWERS = ("Yes", "No", "Not Sure")
+
+
+def new_session(seed):
+    return {'form_data': make_form_data(seed), 'current_section': 0, 'form_completed': False}
+
+
+def burn(seconds):
+    """Spend ``seconds`` of this process's CPU time (wall time would shrink when workers share a core)"""
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def worker(path, sessions, seconds, script_ms, start, results, seed):
+    """Serve random sessions until the deadline; report (requests, conflicts, adoptions, store latencies)"""
+    rng = random.Random(seed)
+    store = SQLiteSessionStore(path)
+    local = {}      # code -> (version, session state), this worker's copy
+    requests = conflicts = adoptions = 0
+    latencies = []
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        code = f"S{rng.randrange(sessions):05d}"
+        begin = time.perf_counter()
+        version, state = local.get(code, (0, None))
+        stored = store.version(code)
+        if stored is not None and stored != version:
+            version, payload = store.load(code)
+            state = decode_session(payload)
+            adoptions += 1
+        if state is None:
+            state = new_session(rng.randrange(1 << 30))
+        store_time = time.perf_counter() - begin
+
+        state['form_data']['symptoms']['pain'] = rng.choice(ANSWERS)
+        state['current_section'] = rng.randrange(8)
+        burn(script_ms / 1000)
+
+        begin = time.perf_counter()
+        new_version = store.save(code, encode_session(state), version)
+        if new_version is None:
+            conflicts += 1
+            local.pop(code, None)
+        else:
+            local[code] = (new_version, state)
+        latencies.append((store_time + time.perf_counter() - begin) * 1000)
+        requests += 1
+    store.close()
+    results.put((requests, conflicts, adoptions, statistics.median(latencies) if latencies else 0.0))
+
+
+def run(workers, sessions, seconds, script_ms):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        SQLiteSessionStore(path).close()
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker, args=(path, sessions, seconds, script_ms, start, results, i))
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        time.sleep(0.5)
+        start.set()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    requests = sum(o[0] for o in outcomes)
+    return (requests / seconds, sum(o[1] for o in outcomes), sum(o[2] for o in outcomes),
+            statistics.median(o[3] for o in outcomes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--script-ms", type=float, default=5.0, help="CPU per request besides the store")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s), {args.sessions} sessions, {args.script_ms:g} ms of script CPU per request\n")
+    print(f"{'Workers':>8}{'req/s':>10}{'speedup':>9}{'store ms':>10}{'adopted':>9}{'conflicts':>11}")
+    baseline = None
+    for workers in args.workers:
+        throughput, conflicts, adoptions, store_ms = run(workers, args.sessions, args.seconds, args.script_ms)
+        baseline = baseline or throughput
+        print(f"{workers:>8}{throughput:>10.0f}{throughput / baseline:>8.2f}x{store_ms:>10.3f}"
+              f"{adoptions:>9}{conflicts:>11}")
+
+
+if __name__ == "__main__":
+    main()
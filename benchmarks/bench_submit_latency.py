@@ -0,0 +1,99 @@
+"""
+Load test: SUBMIT latency as the number of concurrent tablets grows.
+
+Each simulated tablet is a thread that submits forms back to back. For every
+tablet count the benchmark measures how long the submit call holds the
+patient's screen, first for the synchronous path (store + render PDF +
+archive inline) and then for the background SubmissionQueue.
+
+Usage:
+    python benchmarks/bench_submit_latency.py [--tablets 1 4 16 64] [--forms 8]
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_report import generate_pdf_report  # noqa: E402
+from sample_data import make_form_data  # noqa: E402
+from submission_queue import SubmissionQueue  # noqa: E402
+from submission_store import SQLiteSubmissionStore  # noqa: E402
+
+
+def synchronous_submit(store, archive_dir):
+    def submit(form_data):
+        submission_id = store.save(form_data)
+        pdf = generate_pdf_report(form_data).getvalue()
+        (archive_dir / f"intake_{submission_id:08d}.pdf").write_bytes(pdf)
+    return submit
+
+
+def run_tablets(submit, tablets, forms_per_tablet):
+    """Run the tablets concurrently; return per-submit latencies in ms"""
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(tablets)
+
+    def tablet(index):
+        forms = [make_form_data(index * forms_per_tablet + i) for i in range(forms_per_tablet)]
+        barrier.wait()
+        for form_data in forms:
+            start = time.perf_counter()
+            submit(form_data)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=tablet, args=(i,)) for i in range(tablets)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies)
+
+
+def report(label, tablets, latencies):
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[int(len(latencies) * 0.95)]
+    print(f"{label:<14}{tablets:>8}{p50:>12.2f}{p95:>12.2f}{max(latencies):>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tablets", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--forms", type=int, default=8, help="submissions per tablet")
+    args = parser.parse_args()
+
+    print(f"{'Mode':<14}{'Tablets':>8}{'p50 ms':>12}{'p95 ms':>12}{'max ms':>12}")
+    for tablets in args.tablets:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            store = SQLiteSubmissionStore(tmp / "submissions.db")
+            latencies = run_tablets(synchronous_submit(store, tmp), tablets, args.forms)
+            report("synchronous", tablets, latencies)
+            store.close()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            store = SQLiteSubmissionStore(tmp / "submissions.db")
+            submissions = SubmissionQueue(store, archive_dir=tmp / "reports",
+                                          maxsize=tablets * args.forms)
+            tickets = []
+            latencies = run_tablets(lambda form_data: tickets.append(submissions.submit(form_data)),
+                                    tablets, args.forms)
+            report("queued", tablets, latencies)
+            drain_start = time.perf_counter()
+            submissions.shutdown(wait=True)
+            drained = time.perf_counter() - drain_start
+            archived = sum(ticket.status == "archived" for ticket in tickets)
+            print(f"{'':<14}{'':>8}  background drain {drained:.2f} s, {archived}/{len(tickets)} archived")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Synthetic intake forms for the benchmarks.
+
+``make_form_data`` returns a dict shaped exactly like
+``st.session_state.form_data`` after a patient has completed every section,
+with answers drawn from the same option sets the form offers.
+"""
+
+import random
+from datetime import date, timedelta
+
+FIRST_NAMES = ["Marie", "Jean", "Rachel", "Pierre", "Sarah", "Louis", "Esther", "Michel", "Ruth", "Andre"]
+LAST_NAMES = ["Tremblay", "Cohen", "Gagnon", "Levy", "Roy", "Katz", "Cote", "Friedman", "Bouchard", "Stein"]
+MEDICATIONS = ["Metformin", "Atorvastatin", "Ramipril", "Amlodipine", "Levothyroxine", "Furosemide",
+               "Warfarin", "Apixaban", "Donepezil", "Acetaminophen", "Pantoprazole", "Metoprolol",
+               "Amoxicillin", "Ibuprofen", "Aspirin", "Vitamin D", "Calcium carbonate", "Sertraline"]
+FREQUENCIES = ["Once daily", "Twice daily", "Three times daily", "As needed", "Weekly", "Other"]
+
+SYMPTOM_KEYS = ["pain", "dizziness", "fatigue", "breathing", "sleep", "appetite",
+                "vision", "hearing", "balance", "falls"]
+MEMORY_KEYS = ["forget_names", "forget_appointments", "lose_items", "repeat_questions",
+               "difficulty_decisions", "get_lost"]
+ADL_KEYS = ["bathing", "dressing", "toileting", "transferring", "continence", "feeding"]
+IADL_KEYS = ["telephone", "shopping", "food_prep", "housekeeping", "laundry",
+             "transportation", "medications", "finances"]
+CONDITION_KEYS = ["heart_disease", "high_blood_pressure", "diabetes", "stroke", "cancer",
+                  "arthritis", "osteoporosis", "lung_disease", "kidney_disease",
+                  "depression", "dementia", "parkinsons"]
+LIVING_SITUATIONS = ["Own home - alone", "Own home - with spouse/partner", "Own home - with family",
+                     "Apartment/Condo - alone", "Apartment/Condo - with others",
+                     "Retirement residence", "Assisted living facility",
+                     "Long-term care facility", "Other"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday", "I'm not sure"]
+SEASONS = ["Spring", "Summer", "Fall", "Winter", "I'm not sure"]
+
+
+def make_form_data(seed=0):
+    """Build one completed, realistic form_data dict (deterministic per seed)"""
+    rng = random.Random(seed)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+    symptoms = {key: rng.choice(["Yes", "No", "No", "Not Sure"]) for key in SYMPTOM_KEYS}
+    if symptoms["pain"] == "Yes":
+        symptoms["pain_location"] = rng.choice(["Lower back", "Both knees", "Left hip", "Shoulders"])
+        symptoms["pain_level"] = rng.randint(1, 10)
+    if symptoms["falls"] == "Yes":
+        symptoms["falls_count"] = rng.randint(1, 6)
+    symptoms["other_symptoms"] = rng.choice(["", "", "Occasional swelling in ankles"])
+
+    today = date.today()
+    cognitive = {
+        "today_date": today - timedelta(days=rng.choice([0, 0, 0, 1, 7])),
+        "day_of_week": rng.choice(DAYS),
+        "season": rng.choice(SEASONS),
+        "current_year": rng.choice([today.year, today.year, today.year - 1]),
+        "hospital_name": rng.choice(["Jewish General", "Hopital general juif", "JGH", "I don't know"]),
+        "city": rng.choice(["Montreal", "Montréal", "Laval", ""]),
+    }
+    cognitive.update({key: rng.choice(["Yes", "No", "No", "Sometimes"]) for key in MEMORY_KEYS})
+    cognitive["other_concerns"] = ""
+
+    num_meds = rng.randint(0, 25)
+    medications = {"taking_medications": "Yes" if num_meds else "No"}
+    if num_meds:
+        medications["num_medications"] = num_meds
+        medications["medications_list"] = [
+            {"name": rng.choice(MEDICATIONS), "dose": f"{rng.choice([5, 10, 20, 40, 500])}mg",
+             "frequency": rng.choice(FREQUENCIES)}
+            for _ in range(num_meds)
+        ]
+        medications["needs_help"] = rng.choice(["Yes", "No"])
+        medications["miss_doses"] = rng.choice(["Never", "Sometimes", "Often"])
+    medications["has_allergies"] = rng.choice(["Yes", "No", "No"])
+    if medications["has_allergies"] == "Yes":
+        medications["allergies_list"] = rng.choice(["Penicillin", "Sulfa drugs", "ASA, codeine"])
+
+    adl = {key: rng.choice(["Independent", "Independent", "Needs Assistance", "Dependent"]) for key in ADL_KEYS}
+    adl["uses_mobility_aids"] = rng.choice(["Yes", "No"])
+    if adl["uses_mobility_aids"] == "Yes":
+        adl["mobility_aids_list"] = rng.sample(["Cane", "Walker", "Wheelchair", "Grab bars"], 2)
+
+    iadl = {key: rng.choice(["Independent", "Needs Assistance", "Unable"]) for key in IADL_KEYS}
+    iadl["living_situation"] = rng.choice(LIVING_SITUATIONS)
+    iadl["has_caregiver"] = rng.choice(["Yes", "No"])
+    if iadl["has_caregiver"] == "Yes":
+        iadl["caregiver_relation"] = rng.choice(["Daughter", "Son", "Spouse", "Neighbour"])
+
+    medical_history = {key: rng.choice(["Yes", "No", "No", "Not Sure"]) for key in CONDITION_KEYS}
+    medical_history["had_surgeries"] = rng.choice(["Yes", "No"])
+    if medical_history["had_surgeries"] == "Yes":
+        medical_history["surgeries_list"] = "Hip replacement 2015, cataract 2019"
+    medical_history["hospitalized_past_year"] = rng.choice(["Yes", "No", "No"])
+    if medical_history["hospitalized_past_year"] == "Yes":
+        medical_history["hospitalization_reason"] = "Pneumonia"
+    medical_history["other_conditions"] = ""
+
+    return {
+        "demographics": {
+            "first_name": first,
+            "last_name": last,
+            "date_of_birth": date(1930, 1, 1) + timedelta(days=rng.randint(0, 365 * 30)),
+            "sex": rng.choice(["Male", "Female"]),
+            "phone": f"514-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+            "health_card": f"{last[:3].upper()}{first[0].upper()}{rng.randint(10000000, 99999999)}",
+            "emergency_name": f"{rng.choice(FIRST_NAMES)} {last}",
+            "emergency_relation": rng.choice(["Spouse", "Child", "Sibling", "Friend", "Other"]),
+            "emergency_phone": f"514-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+            "preferred_language": rng.choice(["English", "French"]),
+        },
+        "symptoms": symptoms,
+        "cognitive": cognitive,
+        "medications": medications,
+        "adl": adl,
+        "iadl": iadl,
+        "medical_history": medical_history,
+    }
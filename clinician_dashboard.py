@@ -0,0 +1,132 @@
+"""
+Clinician Dashboard
+Jewish General Hospital - Geriatric Clinic
+Intake statistics for clinic staff
+
+Run on a staff workstation, separately from the patient tablets:
+
+    streamlit run clinician_dashboard.py
+
+Every number comes from the rollup counters the submission store updates on
+each submit (see ``rollups``), never from a scan of the stored intakes.
+Query results are cached on the store's data version, so a reload only
+queries SQLite again after a new intake arrives.
+"""
+
+import time
+from datetime import date, timedelta
+
+import streamlit as st
+
+from form_schema import FORM_SCHEMA
+from functional_scores import ADL_ITEMS, IADL_ITEMS
+from rollups import SUBMISSIONS_METRIC
+from submission_store import get_submission_store
+
+DEFAULT_PERIOD_DAYS = 30
+
+st.set_page_config(
+    page_title="Geriatric Clinic - Intake Statistics",
+    page_icon="",
+    layout="wide",
+)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_totals(version, since, until):
+    """{(metric, value): count} for the period (cached per data version)"""
+    return get_submission_store().rollup_totals(since, until)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_daily_volume(version, since, until):
+    """Intakes per day for the period, zero-filled (cached per data version)"""
+    counts = dict(get_submission_store().rollup_daily(SUBMISSIONS_METRIC, '', since, until))
+    days = [(since + timedelta(days=i)).isoformat() for i in range((until - since).days)]
+    return {'Day': days, 'Intakes': [counts.get(day, 0) for day in days]}
+
+
+def prevalence_table(totals, section_id):
+    """One row per summary question: patients answering, and the share with a flagged answer"""
+    section = FORM_SCHEMA[section_id]
+    flagged = section.review['flag']
+    rows = []
+    for item in section.summary_items:
+        metric = f"{section_id}.{item.key}"
+        answered = sum(totals.get((metric, value), 0) for value in item.values)
+        positive = sum(totals.get((metric, value), 0) for value in flagged)
+        rows.append({
+            'Question': item.label,
+            ' / '.join(flagged): positive,
+            'Answered': answered,
+            'Rate': positive / answered if answered else 0.0,
+        })
+    return sorted(rows, key=lambda row: row['Rate'], reverse=True)
+
+
+def score_distribution(totals, metric, maximum):
+    """Number of intakes per score, 0..maximum"""
+    return {'Score': list(range(maximum + 1)),
+            'Intakes': [totals.get((metric, str(score)), 0) for score in range(maximum + 1)]}
+
+
+def render_prevalence(totals, section_id, title):
+    st.subheader(title)
+    st.dataframe(
+        prevalence_table(totals, section_id),
+        hide_index=True,
+        width='stretch',
+        column_config={'Rate': st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1)},
+    )
+
+
+def main():
+    st.title("Geriatric Clinic - Intake Statistics")
+
+    today = date.today()
+    period = st.date_input("Period", value=(today - timedelta(days=DEFAULT_PERIOD_DAYS - 1), today),
+                           max_value=today)
+    if len(period) != 2:
+        st.info("Select the last day of the period.")
+        return
+    since, until = period[0], period[1] + timedelta(days=1)
+
+    start = time.perf_counter()
+    version = get_submission_store().data_version()
+    totals = load_totals(version, since, until)
+    volume = load_daily_volume(version, since, until)
+
+    intakes = totals.get((SUBMISSIONS_METRIC, ''), 0)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Intakes", intakes)
+    days = len(volume['Day'])
+    col2.metric("Per day", f"{intakes / days:.1f}" if days else "0")
+    col3.metric("Reported falls", totals.get(('symptoms.falls', "Yes"), 0))
+    col4.metric("Full Katz ADL score", totals.get(('katz', str(len(ADL_ITEMS))), 0))
+
+    st.subheader("Submission volume")
+    st.bar_chart(volume, x='Day', y='Intakes')
+
+    col1, col2 = st.columns(2)
+    with col1:
+        render_prevalence(totals, 'symptoms', "Symptom prevalence")
+        render_prevalence(totals, 'cognitive', "Memory concerns")
+    with col2:
+        render_prevalence(totals, 'medical_history', "Condition prevalence")
+
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Katz ADL scores")
+        st.bar_chart(score_distribution(totals, 'katz', len(ADL_ITEMS)), x='Score', y='Intakes')
+        render_prevalence(totals, 'adl', "ADL dependence")
+    with col2:
+        st.subheader("Lawton IADL scores")
+        st.bar_chart(score_distribution(totals, 'lawton', len(IADL_ITEMS)), x='Score', y='Intakes')
+        render_prevalence(totals, 'iadl', "IADL dependence")
+
+    st.caption(f"Data version {version} - loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Typed model of an intake form.
+
+``st.session_state.form_data`` stays a dict of dicts because the widgets and
+their callbacks write into it answer by answer. ``IntakeForm`` is its typed
+counterpart: one slotted dataclass per section, choice answers as small
+``Answer`` enum codes instead of strings, select and multiselect answers as
+the schema's own option strings, and ``None`` for a question that was not
+answered (a key missing from form_data). ``IntakeForm.from_form_data``
+validates a form - unknown keys, answers that are not options, wrong types
+all raise ``FormDataError`` - and ``to_form_data`` gives the dict back
+unchanged; the submission queue snapshots every submitted form this way.
+``intake_codec`` stores forms as compact binary records with the same
+answer codes.
+
+Sessions do not hold ``IntakeForm`` objects, so their memory is that of
+the form_data dicts: about 6.4 KB per form, against 3.9 KB as an
+``IntakeForm`` (``benchmarks/bench_form_model.py``).
+
+The field tables below (``SECTION_FIELDS`` and the option tuples) are the
+single list of every form_data key and its allowed answers; the analytics
+export and the risk rules read them rather than keeping their own copies.
+
+The schema-driven sections get their fields from ``FORM_SCHEMA``;
+personal information and medications, which have their own pages, are
+declared here.
+"""
+
+from dataclasses import dataclass, field, fields, make_dataclass
+from datetime import date
+from enum import IntEnum
+
+from answer_widgets import (
+    YES_NO,
+    YES_NO_UNSURE,
+    YES_NO_SOMETIMES,
+    ADL_LEVELS,
+    IADL_LEVELS,
+    MISS_DOSES,
+    TAKING_MEDICATIONS,
+)
+from form_schema import FORM_SCHEMA, SchemaError, iter_items
+
+SEX_OPTIONS = ("Male", "Female", "Other", "Prefer not to say")
+RELATION_OPTIONS = ("Spouse", "Child", "Sibling", "Friend", "Other")
+LANGUAGE_OPTIONS = ("English", "French", "Other")
+FREQUENCIES = ("Once daily", "Twice daily", "Three times daily", "As needed", "Weekly", "Other")
+
+
+class FormDataError(ValueError):
+    """Raised when form data does not fit the form model"""
+
+
+class Answer(IntEnum):
+    """Base of the answer enums: the member value is the stored code, ``text`` the form_data value"""
+
+    def __new__(cls, code, text):
+        member = int.__new__(cls, code)
+        member._value_ = code
+        member.text = text
+        return member
+
+    @classmethod
+    def from_text(cls, text):
+        try:
+            return _ANSWERS_BY_TEXT[cls][text]
+        except KeyError:
+            raise FormDataError(f"{text!r} is not a valid {cls.__name__} answer") from None
+
+
+class YesNo(Answer):
+    YES = 1, "Yes"
+    NO = 2, "No"
+
+
+class YesNoUnsure(Answer):
+    YES = 1, "Yes"
+    NO = 2, "No"
+    NOT_SURE = 3, "Not Sure"
+
+
+class YesNoSometimes(Answer):
+    YES = 1, "Yes"
+    NO = 2, "No"
+    SOMETIMES = 3, "Sometimes"
+
+
+class AdlLevel(Answer):
+    INDEPENDENT = 1, "Independent"
+    NEEDS_ASSISTANCE = 2, "Needs Assistance"
+    DEPENDENT = 3, "Dependent"
+
+
+class IadlLevel(Answer):
+    INDEPENDENT = 1, "Independent"
+    NEEDS_ASSISTANCE = 2, "Needs Assistance"
+    UNABLE = 3, "Unable"
+
+
+class MissDoses(Answer):
+    NEVER = 1, "Never"
+    SOMETIMES = 2, "Sometimes"
+    OFTEN = 3, "Often"
+
+
+# Answer enum of each answer_widgets option set
+ANSWER_TYPES = {
+    tuple(YES_NO): YesNo,
+    tuple(TAKING_MEDICATIONS): YesNo,
+    tuple(YES_NO_UNSURE): YesNoUnsure,
+    tuple(YES_NO_SOMETIMES): YesNoSometimes,
+    tuple(ADL_LEVELS): AdlLevel,
+    tuple(IADL_LEVELS): IadlLevel,
+    tuple(MISS_DOSES): MissDoses,
+}
+
+for _options, _answer_type in ANSWER_TYPES.items():
+    if [value for _, value, _ in _options] != [member.text for member in _answer_type]:
+        raise SchemaError(f"{_answer_type.__name__} does not match its answer option set")
+
+_ANSWERS_BY_TEXT = {answer_type: {member.text: member for member in answer_type}
+                    for answer_type in set(ANSWER_TYPES.values())}
+
+
+@dataclass(slots=True)
+class Medication:
+    name: str = ''
+    dose: str = ''
+    frequency: str = FREQUENCIES[0]
+
+
+@dataclass(frozen=True)
+class Field:
+    """One form_data key: ``kind`` is answer, text, int, date, option, options or medications"""
+    name: str
+    kind: str
+    type: object = None     # Answer subclass, or the options of an option / options field
+
+
+def _schema_field(item):
+    if item.type == 'choice':
+        return Field(item.key, 'answer', ANSWER_TYPES[item.options])
+    if item.type in ('text', 'textarea'):
+        return Field(item.key, 'text')
+    if item.type in ('number', 'slider'):
+        return Field(item.key, 'int')
+    if item.type == 'date':
+        return Field(item.key, 'date')
+    if item.type == 'select':
+        return Field(item.key, 'option', item.options)
+    if item.type == 'multiselect':
+        return Field(item.key, 'options', item.options)
+    raise SchemaError(f"No form model field for {item.type!r} items")
+
+
+SECTION_FIELDS = {
+    'demographics': (
+        Field('first_name', 'text'),
+        Field('last_name', 'text'),
+        Field('date_of_birth', 'date'),
+        Field('sex', 'option', SEX_OPTIONS),
+        Field('phone', 'text'),
+        Field('health_card', 'text'),
+        Field('emergency_name', 'text'),
+        Field('emergency_relation', 'option', RELATION_OPTIONS),
+        Field('emergency_phone', 'text'),
+        Field('preferred_language', 'option', LANGUAGE_OPTIONS),
+    ),
+    **{section_id: tuple(_schema_field(item) for item in iter_items(FORM_SCHEMA[section_id].items) if item.key)
+       for section_id in ('symptoms', 'cognitive')},
+    'medications': (
+        Field('taking_medications', 'answer', YesNo),
+        Field('num_medications', 'int'),
+        Field('medications_list', 'medications'),
+        Field('needs_help', 'answer', YesNo),
+        Field('miss_doses', 'answer', MissDoses),
+        Field('has_allergies', 'answer', YesNo),
+        Field('allergies_list', 'text'),
+    ),
+    **{section_id: tuple(_schema_field(item) for item in iter_items(FORM_SCHEMA[section_id].items) if item.key)
+       for section_id in ('adl', 'iadl', 'medical_history')},
+}
+
+_ANNOTATIONS = {'text': str, 'int': int, 'date': date, 'option': str, 'options': tuple, 'medications': tuple}
+
+
+def _section_class(section_id, section_fields):
+    name = ''.join(part.title() for part in section_id.split('_'))
+    return make_dataclass(name, [
+        (f.name, f.type if f.kind == 'answer' else _ANNOTATIONS[f.kind], field(default=None))
+        for f in section_fields
+    ], slots=True)
+
+
+SECTION_CLASSES = {section_id: _section_class(section_id, section_fields)
+                   for section_id, section_fields in SECTION_FIELDS.items()}
+
+
+def _typed(f, value):
+    """form_data value -> model value"""
+    if f.kind == 'answer':
+        return f.type.from_text(value)
+    if f.kind == 'text':
+        if not isinstance(value, str):
+            raise FormDataError(f"expected text, got {type(value).__name__}")
+        return value
+    if f.kind == 'int':
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise FormDataError(f"expected a whole number, got {value!r}")
+        return value
+    if f.kind == 'date':
+        if not isinstance(value, date):
+            raise FormDataError(f"expected a date, got {value!r}")
+        return value
+    if f.kind == 'option':
+        return _option(f.type, value)
+    if f.kind == 'options':
+        if not isinstance(value, (list, tuple)):
+            raise FormDataError(f"expected a list of options, got {value!r}")
+        return tuple(_option(f.type, v) for v in value)
+    if not isinstance(value, (list, tuple)):
+        raise FormDataError(f"expected a list of medications, got {value!r}")
+    return tuple(_medication(row) for row in value)
+
+
+def _option(options, value):
+    """The schema's own copy of an option string (shared by every form)"""
+    try:
+        return options[options.index(value)]
+    except ValueError:
+        raise FormDataError(f"{value!r} is not one of the options") from None
+
+
+def _medication(row):
+    if not isinstance(row, dict) or set(row) - {'name', 'dose', 'frequency'}:
+        raise FormDataError(f"not a medication row: {row!r}")
+    name, dose = row.get('name', ''), row.get('dose', '')
+    if not isinstance(name, str) or not isinstance(dose, str):
+        raise FormDataError(f"not a medication row: {row!r}")
+    return Medication(name, dose, _option(FREQUENCIES, row.get('frequency', FREQUENCIES[0])))
+
+
+def _untyped(f, value):
+    """model value -> form_data value"""
+    if f.kind == 'answer':
+        return value.text
+    if f.kind == 'options':
+        return list(value)
+    if f.kind == 'medications':
+        return [{'name': m.name, 'dose': m.dose, 'frequency': m.frequency} for m in value]
+    return value
+
+
+@dataclass(slots=True)
+class IntakeForm:
+    """A whole intake form, one typed section object per form_data section"""
+    demographics: SECTION_CLASSES['demographics'] = field(default_factory=SECTION_CLASSES['demographics'])
+    symptoms: SECTION_CLASSES['symptoms'] = field(default_factory=SECTION_CLASSES['symptoms'])
+    cognitive: SECTION_CLASSES['cognitive'] = field(default_factory=SECTION_CLASSES['cognitive'])
+    medications: SECTION_CLASSES['medications'] = field(default_factory=SECTION_CLASSES['medications'])
+    adl: SECTION_CLASSES['adl'] = field(default_factory=SECTION_CLASSES['adl'])
+    iadl: SECTION_CLASSES['iadl'] = field(default_factory=SECTION_CLASSES['iadl'])
+    medical_history: SECTION_CLASSES['medical_history'] = field(default_factory=SECTION_CLASSES['medical_history'])
+
+    @classmethod
+    def from_form_data(cls, form_data):
+        """Validate a form_data dict and build its typed form"""
+        unknown = set(form_data) - set(SECTION_FIELDS)
+        if unknown:
+            raise FormDataError(f"Unknown form sections: {sorted(unknown)}")
+        form = cls()
+        for section_id, section_fields in SECTION_FIELDS.items():
+            answers = form_data.get(section_id, {})
+            section = getattr(form, section_id)
+            for f in section_fields:
+                value = answers.get(f.name)
+                if value is not None:
+                    try:
+                        setattr(section, f.name, _typed(f, value))
+                    except FormDataError as exc:
+                        raise FormDataError(f"{section_id}.{f.name}: {exc}") from None
+            if len(answers) > sum(1 for f in section_fields if f.name in answers):
+                known = {f.name for f in section_fields}
+                raise FormDataError(f"{section_id}: unknown keys {sorted(set(answers) - known)}")
+        return form
+
+    def to_form_data(self):
+        """The form_data dict of this form (unanswered questions have no key)"""
+        form_data = {}
+        for section_id, section_fields in SECTION_FIELDS.items():
+            section = getattr(self, section_id)
+            answers = form_data[section_id] = {}
+            for f in section_fields:
+                value = getattr(section, f.name)
+                if value is not None:
+                    answers[f.name] = _untyped(f, value)
+        return form_data
+
+    def __iter__(self):
+        """(section id, section object) pairs, in form order"""
+        return ((f.name, getattr(self, f.name)) for f in fields(self))
@@ -0,0 +1,122 @@
+"""
+Streamlit rendering of the schema-driven form sections.
+
+``render_section`` draws one compiled section of ``form_schema.FORM_SCHEMA``
+and keeps ``st.session_state.form_data`` in sync with its widgets;
+``render_review_summary`` writes the section's review-page summary.
+
+Each top-level question block runs as an ``st.fragment``: answering a
+question reruns that block (and its follow-ups) only, not the logo,
+progress bar, the rest of the section or the navigation. Because such a
+rerun skips the end of ``main``, the block autosaves its section and
+writes the shared session itself.
+"""
+
+import streamlit as st
+
+from answer_widgets import create_choice_question
+from autosave import autosave_section
+from form_schema import FORM_SCHEMA, flagged_answers
+from rerun_profiler import profiled
+from session_store import persist_session
+
+
+def _render_input(item, section_data):
+    stored = section_data.get(item.key, item.default)
+
+    if item.type == 'text':
+        return st.text_input(item.label, value=stored or '', key=item.widget)
+    if item.type == 'textarea':
+        return st.text_area(item.label, value=stored or '', key=item.widget, height=item.height)
+    if item.type == 'slider':
+        return st.slider(item.label, min_value=item.min, max_value=item.max, value=stored, key=item.widget)
+    if item.type == 'number':
+        return st.number_input(item.label, min_value=item.min, max_value=item.max, value=stored, key=item.widget)
+    if item.type == 'date':
+        return st.date_input(item.label, value=stored, key=item.widget)
+    if item.type == 'select':
+        index = item.options.index(stored) if stored in item.options else 0
+        return st.selectbox(item.label, options=list(item.options), index=index, key=item.widget)
+    if item.type == 'multiselect':
+        return st.multiselect(item.label, options=list(item.options), default=stored or [], key=item.widget)
+    raise ValueError(f"Cannot render item type {item.type!r}")
+
+
+def _render_item(section, item):
+    section_data = st.session_state.form_data[section.id]
+
+    if item.type == 'markdown':
+        st.markdown(item.text)
+        return
+
+    if item.type == 'columns':
+        for column, children in zip(st.columns(len(item.columns)), item.columns):
+            with column:
+                _render_items(section, children)
+        return
+
+    if item.type == 'choice':
+        value = create_choice_question(
+            section.id, item.key, item.question, item.options, item.widget,
+            help_text=item.help, heading=item.heading, show_answer=item.show_answer
+        )
+    else:
+        value = _render_input(item, section_data)
+        # A date or number left empty is unanswered: no key, like an untapped choice
+        if value is None:
+            section_data.pop(item.key, None)
+        else:
+            section_data[item.key] = value
+
+    for trigger, children in item.followups:
+        if value == trigger:
+            _render_items(section, children)
+
+
+def _render_items(section, items):
+    for item in items:
+        if item.separator:
+            st.markdown("---")
+        _render_item(section, item)
+
+
+@st.fragment
+@profiled(name='question_block')
+def _question_block(section_id, item):
+    """One question with its follow-ups; answering it reruns only this block"""
+    _render_item(FORM_SCHEMA[section_id], item)
+    autosave_section(section_id)
+    persist_session()
+
+
+def render_section(section_id):
+    """Render one schema-driven section, one fragment per question block"""
+    section = FORM_SCHEMA[section_id]
+    st.header(section.title)
+    st.markdown(section.intro)
+    for item in section.items:
+        if item.separator:
+            st.markdown("---")
+        if item.type == 'markdown':
+            st.markdown(item.text)
+        else:
+            _question_block(section.id, item)
+
+
+def render_review_summary(section_id, notes=()):
+    """Render the review-page expander for one schema-driven section.
+
+    ``notes`` are extra markdown lines (e.g. scores) shown above the answers.
+    """
+    section = FORM_SCHEMA[section_id]
+    review = section.review
+    with st.expander(section.title):
+        for note in notes:
+            st.markdown(note)
+        flagged = flagged_answers(section, st.session_state.form_data[section_id])
+        if flagged:
+            st.markdown(review['heading'])
+            for item, value in flagged:
+                st.markdown(f"- {item.label}: {value}" if review.get('show_value') else f"- {item.label}")
+        elif review.get('empty'):
+            st.markdown(review['empty'])
@@ -0,0 +1,512 @@
+"""
+Declarative schema for the question-driven sections of the intake form.
+
+Each section lists its items once - questions, answer options, follow-ups,
+summary labels and PDF lines. ``compile_schema`` validates the raw data and
+turns it into frozen objects at import time; the renderer, the review page
+and the PDF export all walk the compiled schema instead of keeping their own
+key lists.
+
+Item types:
+    markdown     static markdown (headings, separators)
+    choice       large answer buttons (see answer_widgets option sets)
+    text, textarea, slider, number, select, multiselect, date
+                 single Streamlit input widgets
+    columns      side-by-side groups of items
+
+Choice items with a ``label`` are the section's summary items: they are
+listed on the review page and in the PDF. Any item may carry a ``pdf`` line
+template (``{value}`` is the stored answer) printed when it is answered, or
+always when ``pdf_when`` is ``"always"``. Follow-up items are only shown,
+stored and exported when their parent has the trigger answer.
+"""
+
+from dataclasses import dataclass, field
+
+from answer_widgets import (
+    YES_NO,
+    YES_NO_UNSURE,
+    YES_NO_SOMETIMES,
+    ADL_LEVELS,
+    IADL_LEVELS,
+)
+
+OPTION_SETS = {
+    'yes_no': YES_NO,
+    'yes_no_unsure': YES_NO_UNSURE,
+    'yes_no_sometimes': YES_NO_SOMETIMES,
+    'adl_levels': ADL_LEVELS,
+    'iadl_levels': IADL_LEVELS,
+}
+
+INPUT_TYPES = {'text', 'textarea', 'slider', 'number', 'select', 'multiselect', 'date'}
+ITEM_TYPES = INPUT_TYPES | {'markdown', 'choice', 'columns'}
+
+
+class SchemaError(ValueError):
+    """Raised when the form schema is inconsistent"""
+
+
+def _choices(options, widget_prefix, rows, separator=True):
+    """Raw choice items for a run of (key, label, question, help) rows"""
+    return [
+        {'type': 'choice', 'key': key, 'label': label, 'question': question, 'help': help_text,
+         'options': options, 'widget': f"{widget_prefix}_{key}", 'separator': separator}
+        for key, label, question, help_text in rows
+    ]
+
+
+RAW_SCHEMA = [
+    {
+        'id': 'symptoms',
+        'title': "Current Symptoms",
+        'intro': "Please tell us about any symptoms you are experiencing. Select YES or NO for each question.",
+        'review': {'heading': "**Reported symptoms:**", 'flag': ["Yes"],
+                   'empty': "No significant symptoms reported"},
+        'pdf': {'title': "CURRENT SYMPTOMS", 'style': 'answers'},
+        'items': _choices('yes_no_unsure', 'symptom', [
+            ("pain", "Pain", "Are you currently experiencing any PAIN?",
+             "This includes headaches, joint pain, muscle pain, or any other discomfort"),
+            ("dizziness", "Dizziness", "Do you feel DIZZY or lightheaded?",
+             "Feeling unsteady or like the room is spinning"),
+            ("fatigue", "Fatigue", "Do you feel unusually TIRED or weak?",
+             "More tired than usual, lack of energy"),
+            ("breathing", "Breathing difficulty", "Do you have difficulty BREATHING?",
+             "Shortness of breath, wheezing, or chest tightness"),
+            ("sleep", "Sleep problems", "Do you have trouble SLEEPING?",
+             "Difficulty falling asleep, staying asleep, or sleeping too much"),
+            ("appetite", "Appetite changes", "Have you noticed changes in your APPETITE?",
+             "Eating more or less than usual"),
+            ("vision", "Vision problems", "Do you have problems with your VISION?",
+             "Blurry vision, difficulty reading, or seeing things"),
+            ("hearing", "Hearing problems", "Do you have problems with your HEARING?",
+             "Difficulty hearing conversations or sounds"),
+            ("balance", "Balance problems", "Do you have problems with BALANCE or walking?",
+             "Feeling unsteady, using a cane or walker"),
+            ("falls", "Falls", "Have you had any FALLS in the past 6 months?",
+             "Falling down, tripping, or losing balance"),
+        ]) + [
+            {'type': 'markdown', 'text': "### Any other symptoms or concerns?", 'separator': True},
+            {'type': 'textarea', 'key': 'other_symptoms',
+             'label': "Please describe any other symptoms not mentioned above:", 'height': 150,
+             'pdf': "<b>Other symptoms:</b> {value}"},
+        ],
+        'followups': {
+            ('pain', "Yes"): [
+                {'type': 'markdown', 'text': "#### Where is your pain?"},
+                {'type': 'textarea', 'key': 'pain_location', 'label': "Please describe where you feel pain:",
+                 'height': 100, 'pdf': "  - Location: {value}"},
+                {'type': 'slider', 'key': 'pain_level',
+                 'label': "How severe is your pain? (0 = No pain, 10 = Worst pain)",
+                 'min': 0, 'max': 10, 'default': 5, 'pdf': "  - Severity: {value}/10"},
+            ],
+            ('falls', "Yes"): [
+                {'type': 'number', 'key': 'falls_count', 'label': "How many times have you fallen?",
+                 'min': 1, 'max': 50, 'default': 1},
+            ],
+        },
+    },
+    {
+        'id': 'cognitive',
+        'title': "Memory and Thinking",
+        'intro': "These questions help us understand your memory and thinking. Please answer as best as "
+                 "you can. It is okay if you are not sure.",
+        'review': {'heading': "**Areas of concern:**",
+                   'flag': ["Yes", "Sometimes"]},
+        'pdf': {'title': "COGNITIVE ASSESSMENT", 'style': 'answers'},
+        'items': [
+            {'type': 'markdown', 'text': "### About Today"},
+            {'type': 'columns', 'columns': [
+                [
+                    {'type': 'date', 'key': 'today_date', 'label': "What is today's date?"},
+                    {'type': 'select', 'key': 'day_of_week', 'label': "What day of the week is it?",
+                     'options': ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday",
+                                 "Sunday", "I'm not sure"],
+                     'default': "I'm not sure"},
+                ],
+                [
+                    {'type': 'select', 'key': 'season', 'label': "What season is it?",
+                     'options': ["Spring", "Summer", "Fall", "Winter", "I'm not sure"],
+                     'default': "I'm not sure"},
+                    {'type': 'number', 'key': 'current_year', 'label': "What year is it?",
+                     'min': 2000, 'max': 2030},
+                ],
+            ]},
+            {'type': 'markdown', 'text': "### About This Place"},
+            {'type': 'text', 'key': 'hospital_name', 'label': "What is the name of this hospital?"},
+            {'type': 'text', 'key': 'city', 'label': "What city are we in?"},
+            {'type': 'markdown', 'text': "### Memory Concerns", 'separator': True},
+        ] + _choices('yes_no_sometimes', 'cog', [
+            ("forget_names", "Forgets names", "Do you often forget names of people you know?", None),
+            ("forget_appointments", "Forgets appointments", "Do you forget appointments or important dates?", None),
+            ("lose_items", "Misplaces items", "Do you frequently misplace items (keys, glasses, etc.)?", None),
+            ("repeat_questions", "Repeats questions",
+             "Has anyone told you that you repeat questions or stories?", None),
+            ("difficulty_decisions", "Difficulty with decisions",
+             "Do you find it harder to make decisions than before?", None),
+            ("get_lost", "Gets lost in familiar places", "Do you ever get lost in familiar places?", None),
+        ]) + [
+            {'type': 'textarea', 'key': 'other_concerns', 'widget': 'memory_other_concerns',
+             'label': "Do you have any other concerns about your memory or thinking?", 'height': 150,
+             'separator': True, 'pdf': "<b>Other concerns:</b> {value}"},
+        ],
+    },
+    {
+        'id': 'adl',
+        'title': "Daily Activities - Basic",
+        'intro': "These questions ask about your ability to perform basic daily activities. Please select "
+                 "the answer that best describes your current ability.",
+        'review': {'heading': "**Activities requiring assistance:**",
+                   'flag': ["Needs Assistance", "Dependent"], 'show_value': True,
+                   'empty': "Independent in all basic activities"},
+        'pdf': {'title': "BASIC ACTIVITIES OF DAILY LIVING (ADL)", 'style': 'answers'},
+        'items': _choices('adl_levels', 'adl', [
+            ("bathing", "Bathing", "BATHING", "Taking a bath or shower"),
+            ("dressing", "Dressing", "DRESSING", "Getting dressed and undressed"),
+            ("toileting", "Toileting", "USING THE TOILET", "Getting to and using the toilet"),
+            ("transferring", "Transferring", "MOVING AROUND", "Getting in and out of bed or chair"),
+            ("continence", "Continence", "BLADDER AND BOWEL CONTROL", "Controlling bladder and bowel"),
+            ("feeding", "Feeding", "EATING", "Feeding yourself"),
+        ]) + [
+            {'type': 'markdown', 'text': "### Mobility Aids", 'separator': True},
+            {'type': 'choice', 'key': 'uses_mobility_aids', 'question': "Do you use any mobility aids?",
+             'options': 'yes_no', 'widget': 'aids', 'heading': "####", 'show_answer': False},
+        ],
+        'followups': {
+            ('uses_mobility_aids', "Yes"): [
+                {'type': 'multiselect', 'key': 'mobility_aids_list',
+                 'label': "Which mobility aids do you use? (Select all that apply)",
+                 'options': ["Cane", "Walker", "Wheelchair", "Scooter", "Grab bars", "Other"], 'default': [],
+                 'pdf': "<b>Mobility aids:</b> {value}", 'pdf_when': 'always', 'pdf_default': []},
+            ],
+        },
+    },
+    {
+        'id': 'iadl',
+        'title': "Daily Activities - Complex",
+        'intro': "These questions ask about more complex daily activities. Please select the answer that "
+                 "best describes your current ability.",
+        'review': {'heading': "**Activities requiring assistance:**",
+                   'flag': ["Needs Assistance", "Unable"], 'show_value': True},
+        'pdf': {'title': "INSTRUMENTAL ACTIVITIES OF DAILY LIVING (IADL)", 'style': 'answers'},
+        'items': _choices('iadl_levels', 'iadl', [
+            ("telephone", "Telephone", "USING THE TELEPHONE", "Making and receiving phone calls"),
+            ("shopping", "Shopping", "SHOPPING", "Getting groceries and other items"),
+            ("food_prep", "Food Prep", "PREPARING FOOD", "Planning and cooking meals"),
+            ("housekeeping", "Housekeeping", "HOUSEWORK", "Cleaning, laundry, and home maintenance"),
+            ("laundry", "Laundry", "DOING LAUNDRY", "Washing and drying clothes"),
+            ("transportation", "Transportation", "TRANSPORTATION", "Getting to places outside walking distance"),
+            ("medications", "Medications", "TAKING MEDICATIONS", "Taking the right medication at the right time"),
+            ("finances", "Finances", "MANAGING MONEY", "Paying bills and managing finances"),
+        ]) + [
+            {'type': 'markdown', 'text': "### Living Situation", 'separator': True},
+            {'type': 'select', 'key': 'living_situation', 'label': "Where do you currently live?",
+             'options': [
+                 "Own home - alone",
+                 "Own home - with spouse/partner",
+                 "Own home - with family",
+                 "Apartment/Condo - alone",
+                 "Apartment/Condo - with others",
+                 "Retirement residence",
+                 "Assisted living facility",
+                 "Long-term care facility",
+                 "Other",
+             ],
+             'pdf': "<b>Living situation:</b> {value}"},
+            {'type': 'markdown', 'text': "### Support System", 'separator': True},
+            {'type': 'choice', 'key': 'has_caregiver', 'question': "Do you have someone who helps you regularly?",
+             'options': 'yes_no', 'widget': 'caregiver', 'heading': "####", 'show_answer': False},
+        ],
+        'followups': {
+            ('has_caregiver', "Yes"): [
+                {'type': 'text', 'key': 'caregiver_relation', 'label': "Who helps you? (relationship)",
+                 'pdf': "<b>Caregiver:</b> {value}", 'pdf_when': 'always', 'pdf_default': "Yes"},
+            ],
+        },
+    },
+    {
+        'id': 'medical_history',
+        'title': "Medical History",
+        'intro': "Please tell us about your past and current medical conditions.",
+        'review': {'heading': "**Reported conditions:**", 'flag': ["Yes"]},
+        'pdf': {'title': "MEDICAL HISTORY", 'style': 'positives', 'positive': "Yes",
+                'empty': "No significant medical conditions reported"},
+        'items': [
+            {'type': 'markdown', 'text': "### Do you have or have you had any of these conditions?"},
+        ] + _choices('yes_no_unsure', 'med', [
+            ("heart_disease", "Heart Disease", "Heart Disease", "Heart attack, heart failure, irregular heartbeat"),
+            ("high_blood_pressure", "High Blood Pressure", "High Blood Pressure", "Hypertension"),
+            ("diabetes", "Diabetes", "Diabetes", "Type 1 or Type 2 diabetes"),
+            ("stroke", "Stroke/TIA", "Stroke or TIA", "Mini-stroke or transient ischemic attack"),
+            ("cancer", "Cancer", "Cancer", "Any type of cancer, past or present"),
+            ("arthritis", "Arthritis", "Arthritis", "Joint pain, osteoarthritis, rheumatoid arthritis"),
+            ("osteoporosis", "Osteoporosis", "Osteoporosis", "Weak or brittle bones"),
+            ("lung_disease", "Lung Disease", "Lung Disease", "COPD, emphysema, asthma"),
+            ("kidney_disease", "Kidney Disease", "Kidney Disease", "Chronic kidney disease"),
+            ("depression", "Depression/Anxiety", "Depression or Anxiety", "Mental health conditions"),
+            ("dementia", "Memory Problems", "Memory Problems", "Dementia, Alzheimer's, or cognitive impairment"),
+            ("parkinsons", "Parkinson's Disease", "Parkinson's Disease", "Movement disorder"),
+        ]) + [
+            {'type': 'markdown', 'text': "### Past Surgeries", 'separator': True},
+            {'type': 'choice', 'key': 'had_surgeries', 'question': "Have you had any surgeries?",
+             'options': 'yes_no', 'widget': 'surgery', 'heading': "####", 'show_answer': False},
+            {'type': 'markdown', 'text': "### Recent Hospitalizations", 'separator': True},
+            {'type': 'choice', 'key': 'hospitalized_past_year', 'question': "Have you been hospitalized in the past year?",
+             'options': 'yes_no', 'widget': 'hosp', 'heading': "####", 'show_answer': False},
+            {'type': 'textarea', 'key': 'other_conditions', 'label': "Any other medical conditions not mentioned above?",
+             'height': 150, 'separator': True, 'pdf': "<b>Other conditions:</b> {value}"},
+        ],
+        'followups': {
+            ('had_surgeries', "Yes"): [
+                {'type': 'textarea', 'key': 'surgeries_list',
+                 'label': "Please list your surgeries and approximate dates:", 'height': 150,
+                 'pdf': "<b>Past surgeries:</b> {value}", 'pdf_when': 'always', 'pdf_default': "Not specified"},
+            ],
+            ('hospitalized_past_year', "Yes"): [
+                {'type': 'textarea', 'key': 'hospitalization_reason',
+                 'label': "Please describe the reason for hospitalization:", 'height': 100,
+                 'pdf': "<b>Recent hospitalization:</b> {value}", 'pdf_when': 'always',
+                 'pdf_default': "Not specified"},
+            ],
+        },
+    },
+]
+
+
+@dataclass(frozen=True)
+class Item:
+    """One compiled schema item"""
+    type: str
+    key: str = None
+    widget: str = None
+    label: str = None
+    question: str = None
+    help: str = None
+    heading: str = "###"
+    text: str = None
+    options: tuple = ()
+    show_answer: bool = True
+    separator: bool = False
+    default: object = None
+    min: object = None
+    max: object = None
+    height: int = None
+    pdf: str = None
+    pdf_when: str = 'answered'
+    pdf_default: object = None
+    followups: tuple = ()      # ((trigger value, (Item, ...)), ...)
+    columns: tuple = ()        # ((Item, ...), ...)
+
+    @property
+    def values(self):
+        """Stored values of a choice item's options"""
+        return tuple(value for _, value, _ in self.options)
+
+
+@dataclass(frozen=True)
+class Section:
+    """One compiled form section"""
+    id: str
+    title: str
+    intro: str
+    items: tuple
+    review: dict = field(default_factory=dict)
+    pdf: dict = field(default_factory=dict)
+    summary_items: tuple = ()   # labelled choice items, in form order
+    data_keys: frozenset = frozenset()
+
+
+def _compile_item(raw, section_id, followups, seen_keys, seen_widgets):
+    item_type = raw.get('type')
+    if item_type not in ITEM_TYPES:
+        raise SchemaError(f"{section_id}: unknown item type {item_type!r}")
+
+    if item_type == 'markdown':
+        if not raw.get('text'):
+            raise SchemaError(f"{section_id}: markdown item without text")
+        return Item(type='markdown', text=raw['text'], separator=raw.get('separator', False))
+
+    if item_type == 'columns':
+        columns = tuple(
+            tuple(_compile_item(child, section_id, followups, seen_keys, seen_widgets) for child in column)
+            for column in raw.get('columns', [])
+        )
+        if not columns:
+            raise SchemaError(f"{section_id}: columns item without columns")
+        return Item(type='columns', columns=columns, separator=raw.get('separator', False))
+
+    key = raw.get('key')
+    if not key:
+        raise SchemaError(f"{section_id}: {item_type} item without key")
+    if key in seen_keys:
+        raise SchemaError(f"{section_id}: duplicate key {key!r}")
+    seen_keys.add(key)
+
+    widget = raw.get('widget', key)
+    if item_type == 'choice':
+        if raw.get('options') not in OPTION_SETS:
+            raise SchemaError(f"{section_id}.{key}: unknown option set {raw.get('options')!r}")
+        options = tuple(OPTION_SETS[raw['options']])
+        widget_keys = [f"{widget}_{suffix}" for _, _, suffix in options]
+        if not raw.get('question'):
+            raise SchemaError(f"{section_id}.{key}: choice item without question")
+    else:
+        options = tuple(raw.get('options', ()))
+        widget_keys = [widget]
+        if not raw.get('label'):
+            raise SchemaError(f"{section_id}.{key}: {item_type} item without label")
+        if item_type in ('select', 'multiselect') and not options:
+            raise SchemaError(f"{section_id}.{key}: {item_type} item without options")
+
+    for widget_key in widget_keys:
+        if widget_key in seen_widgets:
+            raise SchemaError(f"{section_id}.{key}: duplicate widget key {widget_key!r}")
+        seen_widgets.add(widget_key)
+
+    if raw.get('pdf_when', 'answered') not in ('answered', 'always'):
+        raise SchemaError(f"{section_id}.{key}: pdf_when must be 'answered' or 'always'")
+
+    compiled_followups = []
+    for (parent, trigger), children in followups.items():
+        if parent != key:
+            continue
+        if item_type != 'choice' or trigger not in [value for _, value, _ in options]:
+            raise SchemaError(f"{section_id}.{key}: follow-up trigger {trigger!r} is not an answer option")
+        compiled_followups.append((trigger, tuple(
+            _compile_item(child, section_id, {}, seen_keys, seen_widgets) for child in children
+        )))
+
+    return Item(
+        type=item_type,
+        key=key,
+        widget=widget,
+        label=raw.get('label'),
+        question=raw.get('question'),
+        help=raw.get('help'),
+        heading=raw.get('heading', "###"),
+        options=options,
+        show_answer=raw.get('show_answer', True),
+        separator=raw.get('separator', False),
+        default=raw.get('default'),
+        min=raw.get('min'),
+        max=raw.get('max'),
+        height=raw.get('height'),
+        pdf=raw.get('pdf'),
+        pdf_when=raw.get('pdf_when', 'answered'),
+        pdf_default=raw.get('pdf_default'),
+        followups=tuple(compiled_followups),
+    )
+
+
+def iter_items(items):
+    """Yield every item, descending into columns and follow-ups"""
+    for item in items:
+        yield item
+        for column in item.columns:
+            yield from iter_items(column)
+        for _, children in item.followups:
+            yield from iter_items(children)
+
+
+def compile_schema(raw_schema):
+    """Validate the raw schema and return {section id: Section} in form order"""
+    sections = {}
+    seen_widgets = set()
+    for raw in raw_schema:
+        section_id = raw.get('id')
+        if not section_id or section_id in sections:
+            raise SchemaError(f"Missing or duplicate section id {section_id!r}")
+
+        followups = raw.get('followups', {})
+        seen_keys = set()
+        items = tuple(_compile_item(item, section_id, followups, seen_keys, seen_widgets)
+                      for item in raw['items'])
+
+        parents = {parent for parent, _ in followups}
+        if not parents <= seen_keys:
+            raise SchemaError(f"{section_id}: follow-ups for unknown questions {sorted(parents - seen_keys)}")
+
+        summary_items = tuple(item for item in iter_items(items) if item.type == 'choice' and item.label)
+        review = dict(raw.get('review', {}))
+        for value in review.get('flag', []):
+            if any(value not in item.values for item in summary_items):
+                raise SchemaError(f"{section_id}: review flag {value!r} is not an option of every summary item")
+
+        pdf = dict(raw.get('pdf', {}))
+        if pdf.get('style', 'answers') not in ('answers', 'positives'):
+            raise SchemaError(f"{section_id}: unknown pdf style {pdf.get('style')!r}")
+        if pdf.get('style') == 'positives' and any(pdf.get('positive') not in item.values
+                                                   for item in summary_items):
+            raise SchemaError(f"{section_id}: pdf positive value {pdf.get('positive')!r} is not an answer option")
+
+        sections[section_id] = Section(
+            id=section_id,
+            title=raw['title'],
+            intro=raw['intro'],
+            items=items,
+            review=review,
+            pdf=pdf,
+            summary_items=summary_items,
+            data_keys=frozenset(seen_keys),
+        )
+    return sections
+
+
+FORM_SCHEMA = compile_schema(RAW_SCHEMA)
+
+
+def flagged_answers(section, section_data):
+    """Summary items whose answer is one of the section's review flags: [(item, value)]"""
+    flags = section.review.get('flag', ())
+    return [
+        (item, section_data[item.key])
+        for item in section.summary_items
+        if section_data.get(item.key) in flags
+    ]
+
+
+def pdf_lines(section, section_data):
+    """Yield the section's PDF lines (ReportLab paragraph markup) in form order"""
+    positives = section.pdf.get('style') == 'positives'
+    last_summary = section.summary_items[-1] if section.summary_items else None
+    reported = False
+
+    def walk(items):
+        nonlocal reported
+        for item in items:
+            for column in item.columns:
+                yield from walk(column)
+
+            value = section_data.get(item.key) if item.key else None
+            if item.type == 'choice' and item.label:
+                if positives:
+                    if value == section.pdf['positive']:
+                        reported = True
+                        yield f"- {item.label}"
+                elif value:
+                    yield f"<b>{item.label}:</b> {value}"
+                if item is last_summary and not reported and section.pdf.get('empty'):
+                    yield section.pdf['empty']
+            elif item.pdf:
+                value = pdf_value(item, section_data)
+                if value is not None:
+                    yield item.pdf.format(value=value)
+
+            for trigger, children in item.followups:
+                if value == trigger:
+                    yield from walk(children)
+
+    yield from walk(section.items)
+
+
+def pdf_value(item, section_data):
+    """The value an item prints in the PDF, or None if it prints nothing"""
+    if item.pdf_when == 'always':
+        value = section_data.get(item.key, item.pdf_default)
+    else:
+        value = section_data.get(item.key)
+        if not value:
+            return None
+    if isinstance(value, (list, tuple)):
+        value = ', '.join(value)
+    return value
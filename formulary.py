@@ -0,0 +1,148 @@
+"""
+Local formulary index for medication-name suggestions.
+
+The formulary is a CSV of ``name,ingredient`` rows: every generic name maps
+to itself and every brand name or synonym to its generic ingredient, or to
+its ingredients separated by ``;`` for a combination product
+("Tylenol No. 3" -> "Acetaminophen;Codeine"). It is
+loaded once per process into:
+
+- a sorted array of normalized names (accents and case folded), searched
+  with ``bisect`` for prefix matches, plus a dict for exact lookups;
+- a character-bigram index (bigram -> NumPy array of entry ids) used as a
+  fuzzy fallback when no name starts with the typed text: candidates are
+  ranked by bigram overlap with one ``bincount`` and the best few re-scored
+  with difflib.
+
+The bundled file is ``assets/formulary.csv``; ``INTAKE_FORMULARY_PATH``
+points the app at a larger one.
+"""
+
+import csv
+import difflib
+import os
+import sys
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+
+DEFAULT_FORMULARY_PATH = Path(__file__).parent / "assets" / "formulary.csv"
+
+FUZZY_CANDIDATES = 8
+FUZZY_MIN_RATIO = 0.75
+
+
+def normalize_name(text):
+    """Lower-case, accent-free, single-spaced form of a drug name"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+def split_ingredients(ingredient):
+    """The generic ingredients of a formulary entry's ingredient field"""
+    return [part.strip() for part in ingredient.split(';') if part.strip()]
+
+
+def _bigrams(key):
+    padded = f" {key} "
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class Formulary:
+    """Drug names and synonyms with prefix and fuzzy lookup"""
+
+    def __init__(self, entries):
+        # One entry per distinct normalized name; the first spelling wins
+        by_key = {}
+        for name, ingredient in entries:
+            key = normalize_name(name)
+            if key and key not in by_key:
+                by_key[key] = (name.strip(), sys.intern(ingredient.strip()))
+
+        self._keys = sorted(by_key)
+        self._ids = {key: entry_id for entry_id, key in enumerate(self._keys)}
+        self.names = [by_key[key][0] for key in self._keys]
+        self.ingredients = [by_key[key][1] for key in self._keys]
+
+        postings = defaultdict(list)
+        bigram_counts = np.empty(len(self._keys), dtype=np.int32)
+        for entry_id, key in enumerate(self._keys):
+            bigrams = _bigrams(key)
+            bigram_counts[entry_id] = len(bigrams)
+            for bigram in bigrams:
+                postings[bigram].append(entry_id)
+        self._bigram_index = {bigram: np.array(ids, dtype=np.int32) for bigram, ids in postings.items()}
+        self._bigram_counts = bigram_counts
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls((row['name'], row['ingredient']) for row in csv.DictReader(f))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def lookup(self, name):
+        """Return (name, ingredient) for an exact (normalized) match, or None"""
+        entry_id = self._ids.get(normalize_name(name))
+        if entry_id is None:
+            return None
+        return self.names[entry_id], self.ingredients[entry_id]
+
+    def suggest(self, text, limit=5):
+        """Return up to ``limit`` (name, ingredient) suggestions for typed text.
+
+        Names starting with the text are returned in alphabetical order; if
+        there are none, the text is treated as a misspelling and the closest
+        names are returned instead.
+        """
+        key = normalize_name(text)
+        if not key:
+            return []
+
+        ids = []
+        i = bisect_left(self._keys, key)
+        while i < len(self._keys) and len(ids) < limit and self._keys[i].startswith(key):
+            ids.append(i)
+            i += 1
+        if not ids:
+            ids = self._fuzzy(key)[:limit]
+        return [(self.names[i], self.ingredients[i]) for i in ids]
+
+    def _fuzzy(self, key):
+        bigrams = _bigrams(key)
+        postings = [self._bigram_index[bigram] for bigram in bigrams if bigram in self._bigram_index]
+        if not postings:
+            return []
+        # Jaccard similarity of bigram sets, so long names do not win on size
+        shared = np.bincount(np.concatenate(postings), minlength=len(self._keys))
+        similarity = shared / (len(bigrams) + self._bigram_counts - shared)
+        count = min(FUZZY_CANDIDATES, len(self._keys))
+        candidates = np.argpartition(similarity, -count)[-count:]
+
+        scored = []
+        for entry_id in candidates[shared[candidates] > 0].tolist():
+            ratio = difflib.SequenceMatcher(None, key, self._keys[entry_id]).ratio()
+            if ratio >= FUZZY_MIN_RATIO:
+                scored.append((-ratio, entry_id))
+        return [entry_id for _, entry_id in sorted(scored)]
+
+    def memory_bytes(self):
+        """Approximate memory held by the index (names, keys and bigram postings)"""
+        strings = {id(s): s for s in self._keys + self.names + self.ingredients}
+        total = sum(sys.getsizeof(s) for s in strings.values())
+        total += sys.getsizeof(self._keys) + sys.getsizeof(self.names) + sys.getsizeof(self.ingredients)
+        total += sys.getsizeof(self._ids) + sys.getsizeof(self._bigram_index) + self._bigram_counts.nbytes
+        total += sum(sys.getsizeof(bigram) + array.nbytes for bigram, array in self._bigram_index.items())
+        return total
+
+
+@st.cache_resource(show_spinner=False)
+def get_formulary():
+    """Return the process-wide formulary index"""
+    return Formulary.from_csv(os.environ.get('INTAKE_FORMULARY_PATH', DEFAULT_FORMULARY_PATH))
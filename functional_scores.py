@@ -0,0 +1,113 @@
+"""
+Katz ADL and Lawton IADL scores.
+
+Answers are encoded as fixed-order integer arrays - one column per item in
+form order, one code per answer level (-1 when unanswered) - and scored with
+a per-item points table, so scoring one session and scoring thousands of
+stored submissions is the same NumPy expression.
+
+- Katz ADL (0-6): one point per basic activity done independently.
+- Lawton IADL (0-8): one point per activity the patient can still do at the
+  level Lawton counts as independent. Needing some help still earns the
+  point for the telephone, housework, laundry, transportation and money,
+  but not for shopping, preparing food or taking medications.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from form_schema import FORM_SCHEMA
+
+# Item order is the form order of the schema's summary questions
+ADL_ITEMS = tuple(item.key for item in FORM_SCHEMA['adl'].summary_items)
+IADL_ITEMS = tuple(item.key for item in FORM_SCHEMA['iadl'].summary_items)
+
+# Answer codes by level; -1 means unanswered
+ADL_CODES = {"Independent": 0, "Needs Assistance": 1, "Dependent": 2}
+IADL_CODES = {"Independent": 0, "Needs Assistance": 1, "Unable": 2}
+UNANSWERED = -1
+
+# Points per (item, code). The extra last column holds the points for
+# UNANSWERED, so a code of -1 indexes it directly.
+KATZ_POINTS = np.array([[1, 0, 0, 0]] * len(ADL_ITEMS), dtype=np.int8)
+
+_LAWTON_POINTS_WITH_HELP = {'telephone', 'housekeeping', 'laundry', 'transportation', 'finances'}
+LAWTON_POINTS = np.array(
+    [[1, int(item in _LAWTON_POINTS_WITH_HELP), 0, 0] for item in IADL_ITEMS],
+    dtype=np.int8,
+)
+
+FunctionalScores = namedtuple('FunctionalScores', ['katz', 'katz_answered', 'lawton', 'lawton_answered'])
+
+
+def encode_answers(section_data, items, codes):
+    """Fixed-order answer codes for one section dict"""
+    return np.array([codes.get(section_data.get(item), UNANSWERED) for item in items], dtype=np.int8)
+
+
+def encode_many(section_datas, items, codes):
+    """Answer codes for many section dicts: an (n, len(items)) int8 array"""
+    return np.array(
+        [[codes.get(data.get(item), UNANSWERED) for item in items] for data in section_datas],
+        dtype=np.int8,
+    ).reshape(-1, len(items))
+
+
+def score_codes(codes, points):
+    """Total points and number of answered items per row of an answer-code array"""
+    codes = np.atleast_2d(codes)
+    item_points = points[np.arange(points.shape[0]), codes]
+    return item_points.sum(axis=1, dtype=np.int16), (codes != UNANSWERED).sum(axis=1)
+
+
+def functional_scores(form_data):
+    """Katz and Lawton scores of one form"""
+    katz, katz_answered = score_codes(
+        encode_answers(form_data.get('adl', {}), ADL_ITEMS, ADL_CODES), KATZ_POINTS
+    )
+    lawton, lawton_answered = score_codes(
+        encode_answers(form_data.get('iadl', {}), IADL_ITEMS, IADL_CODES), LAWTON_POINTS
+    )
+    return FunctionalScores(int(katz[0]), int(katz_answered[0]), int(lawton[0]), int(lawton_answered[0]))
+
+
+def score_many(form_datas):
+    """Katz and Lawton scores of many forms, as a FunctionalScores of NumPy arrays"""
+    form_datas = list(form_datas)
+    katz, katz_answered = score_codes(
+        encode_many([f.get('adl', {}) for f in form_datas], ADL_ITEMS, ADL_CODES), KATZ_POINTS
+    )
+    lawton, lawton_answered = score_codes(
+        encode_many([f.get('iadl', {}) for f in form_datas], IADL_ITEMS, IADL_CODES), LAWTON_POINTS
+    )
+    return FunctionalScores(katz, katz_answered, lawton, lawton_answered)
+
+
+def describe_katz(score, answered):
+    """e.g. 'Katz ADL score: 4/6 (moderate impairment)'"""
+    if score == len(ADL_ITEMS):
+        level = "full function"
+    elif score >= 3:
+        level = "moderate impairment"
+    else:
+        level = "severe functional impairment"
+    return _describe("Katz ADL score", score, len(ADL_ITEMS), answered, level)
+
+
+def describe_lawton(score, answered):
+    """e.g. 'Lawton IADL score: 5/8 (some dependence)'"""
+    if score == len(IADL_ITEMS):
+        level = "independent"
+    elif score >= 5:
+        level = "some dependence"
+    else:
+        level = "dependent in several activities"
+    return _describe("Lawton IADL score", score, len(IADL_ITEMS), answered, level)
+
+
+def _describe(name, score, maximum, answered, level):
+    text = f"{name}: {score}/{maximum} ({level})"
+    if answered < maximum:
+        text += f" - {maximum - answered} of {maximum} not answered"
+    return text
@@ -0,0 +1,383 @@
+"""
+Memory-mapped archive of historical intakes for research queries.
+
+The archive is a directory of three files, all opened with ``np.memmap`` so
+a query never reads a submission into Python objects:
+
+- ``intakes.rec``: the submissions as ``intake_codec`` records, back to
+  back, append-only;
+- ``intakes.idx``: the offset index, one fixed-size entry per record
+  (submission id, offset and length in ``intakes.rec``, submission time in
+  seconds since 1970-01-01 clinic time), in append order. The index is
+  the commit point of an append: bytes of ``intakes.rec`` past the last
+  indexed record are left over from an interrupted append and are
+  overwritten by the next one;
+- ``intakes.bitmaps``: one packed bitmap per answer of every Yes/No
+  question of ``BITMAP_SECTIONS`` (bit ``i`` of the ``falls = Yes`` bitmap
+  is set when record ``i`` answered Yes to falls). It is rebuilt after each
+  append by gathering the answer codes of every record straight from their
+  fixed offsets in the mapped records - no record is decoded - and
+  replaced atomically.
+
+A query combines bitmaps with NumPy's ``&``, ``|`` and ``~``::
+
+    archive = IntakeArchive('data/intake_archive')
+    hits = (archive.bitmap('falls', 'Yes') & archive.bitmap('dementia', 'Yes')
+            & archive.submitted_between('2025-01-01', '2026-01-01'))
+    archive.count(hits), archive.submission_ids(hits)
+
+and only the records of the hits are read, with ``archive.reader(row)``
+(single fields in place) or ``archive.form_data(row)``.
+
+``archive_submissions`` appends the submissions stored since the last
+append; there is one writer at a time (a nightly job), readers reopen the
+archive to see new records. A submission whose form does not fit the
+record layout is logged and listed in ``intakes.skipped`` (id and
+submission time) instead of being archived; every run retries the listed
+ones first, so once the layout or the stored form is fixed it is archived
+- after newer submissions, which is why the index is in append order.
+
+Usage:
+    python intake_archive.py [--archive DIR]                      # append new submissions
+    python intake_archive.py falls=Yes dementia=Yes --since 2025-01-01 --until 2026-01-01
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import struct
+import time
+from datetime import date, datetime, timedelta
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+
+from form_model import FormDataError
+from intake_codec import CURRENT_LAYOUT, HEADER_SIZE, LAYOUTS, RecordReader, decode_record, encode_record
+from submission_store import DEFAULT_STORE_PATH, SQLiteSubmissionStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_PATH = Path(__file__).parent / "data" / "intake_archive"
+
+RECORDS_FILE = "intakes.rec"
+INDEX_FILE = "intakes.idx"
+BITMAPS_FILE = "intakes.bitmaps"
+SKIPPED_FILE = "intakes.skipped"
+
+INDEX_DTYPE = np.dtype([('id', '<i8'), ('offset', '<i8'), ('length', '<u4'), ('submitted', '<i8')])
+SKIPPED_DTYPE = np.dtype([('id', '<i8'), ('submitted', '<i8')])
+
+# Sections whose Yes/No questions get bitmaps
+BITMAP_SECTIONS = ('symptoms', 'medical_history')
+
+# (section id, key, answer) of each bitmap, in file order
+BITMAP_KEYS = tuple(
+    (section_id, key, answer)
+    for section_id, key, _, options in CURRENT_LAYOUT.answers
+    if section_id in BITMAP_SECTIONS and {"Yes", "No"} <= set(options)
+    for answer in options
+)
+
+# magic, number of records, digest of BITMAP_KEYS
+BITMAPS_HEADER = struct.Struct('<4sQ8s')
+BITMAPS_MAGIC = b'GIBM'
+_KEYS_DIGEST = hashlib.sha256(repr(BITMAP_KEYS).encode()).digest()[:8]
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class ArchiveError(Exception):
+    """Raised when the archive cannot be read, written or queried"""
+
+
+def _seconds(value):
+    """Seconds since 1970-01-01 of a datetime, date or ISO string (clinic time)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return int((value - _EPOCH).total_seconds())
+
+
+def _map(path, dtype, offset=0):
+    """Read-only mapping of a file (an empty array for a missing or empty one)"""
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        size = 0
+    if size <= offset:
+        return np.empty(0, dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset,
+                     shape=((size - offset) // np.dtype(dtype).itemsize,))
+
+
+class IntakeArchive:
+    """An archive directory: records, offset index and bitmaps, memory-mapped"""
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._fields = {}
+        for row, (section_id, key, answer) in enumerate(BITMAP_KEYS):
+            self._fields[(f"{section_id}.{key}", answer)] = row
+            bare = (key, answer)
+            # Bare keys only where they name one question
+            self._fields[bare] = None if bare in self._fields else row
+        self.reload()
+
+    def reload(self):
+        """Map the files again, to see records appended since the archive was opened"""
+        self.records = _map(self.path / RECORDS_FILE, np.uint8)
+        self.index = _map(self.path / INDEX_FILE, INDEX_DTYPE)
+        self.bitmaps = np.zeros((len(BITMAP_KEYS), 0), np.uint8)
+        header = self._bitmaps_header()
+        if header is not None and header[1] == len(self.index) and header[2] == _KEYS_DIGEST:
+            self.bitmaps = _map(self.path / BITMAPS_FILE, np.uint8, BITMAPS_HEADER.size).reshape(
+                len(BITMAP_KEYS), -1)
+        elif len(self.index):
+            self.bitmaps = self._build_bitmaps()    # stale bitmaps file; rebuilt by the next append
+
+    def _bitmaps_header(self):
+        try:
+            with open(self.path / BITMAPS_FILE, 'rb') as f:
+                header = BITMAPS_HEADER.unpack(f.read(BITMAPS_HEADER.size))
+        except (FileNotFoundError, struct.error):
+            return None
+        return header if header[0] == BITMAPS_MAGIC else None
+
+    def __len__(self):
+        return len(self.index)
+
+    def last_id(self):
+        """Highest archived submission id (0 if none)"""
+        return int(self.index['id'].max()) if len(self.index) else 0
+
+    def skipped(self):
+        """(id, submitted) entries of the skipped submissions still waiting for a retry"""
+        skipped = _map(self.path / SKIPPED_FILE, SKIPPED_DTYPE)
+        return np.array(skipped[~np.isin(skipped['id'], self.index['id'])])
+
+    # --- queries
+
+    def bitmap(self, field, answer="Yes"):
+        """Packed bitmap of the records that gave ``answer`` to ``field`` ('falls' or 'symptoms.falls')"""
+        row = self._fields.get((field, answer))
+        if row is None:
+            if (field, answer) in self._fields:
+                raise ArchiveError(f"{field!r} names several questions; use section.{field}")
+            raise ArchiveError(f"No bitmap for {field} = {answer!r}")
+        return self.bitmaps[row]
+
+    def submitted_between(self, since=None, until=None):
+        """Packed bitmap of the records submitted in [since, until) (dates, datetimes or ISO strings)"""
+        submitted = self.index['submitted']
+        selected = np.ones(len(submitted), bool)
+        if since is not None:
+            selected &= submitted >= _seconds(since)
+        if until is not None:
+            selected &= submitted < _seconds(until)
+        return np.packbits(selected)
+
+    def rows(self, bits):
+        """Row numbers of the set bits of a query bitmap"""
+        return np.flatnonzero(np.unpackbits(bits, count=len(self.index)))
+
+    def count(self, bits):
+        """Number of records matching a query bitmap"""
+        return int(np.count_nonzero(np.unpackbits(bits, count=len(self.index))))
+
+    def submission_ids(self, bits):
+        return self.index['id'][self.rows(bits)]
+
+    # --- records
+
+    def record(self, row):
+        """The raw record of a row, a view of the mapped file"""
+        entry = self.index[row]
+        return self.records[entry['offset']:entry['offset'] + entry['length']]
+
+    def reader(self, row):
+        """RecordReader over a row's record, for reading single fields in place"""
+        return RecordReader(self.record(row))
+
+    def form_data(self, row):
+        return decode_record(self.record(row))
+
+    def submitted_at(self, row):
+        return _EPOCH + timedelta(seconds=int(self.index['submitted'][row]))
+
+    # --- writing
+
+    def append(self, submissions):
+        """Append (id, submitted_at, form_data) submissions and rebuild the bitmaps.
+
+        Forms that do not fit the record layout are logged and listed in
+        ``intakes.skipped`` for a retry; a listed submission is taken off
+        the list once it is appended, or passed with no form_data (no
+        longer stored). Returns (appended, skipped).
+        """
+        gaps = {int(gap['id']): int(gap['submitted']) for gap in self.skipped()}
+        records, entries, skipped = [], [], 0
+        offset = int(self.index['offset'][-1] + self.index['length'][-1]) if len(self.index) else 0
+        for submission_id, submitted_at, form_data in submissions:
+            if form_data is None:
+                gaps.pop(submission_id, None)
+                continue
+            try:
+                record = encode_record(form_data)
+            except FormDataError as exc:
+                logger.warning("Submission %s does not fit the record layout, left for a retry: %s",
+                               submission_id, exc)
+                gaps[submission_id] = _seconds(submitted_at)
+                skipped += 1
+                continue
+            gaps.pop(submission_id, None)
+            records.append(record)
+            entries.append((submission_id, offset, len(record), _seconds(submitted_at)))
+            offset += len(record)
+        if records:
+            self._append_records(records, entries)
+        self._write_skipped(gaps)
+        return len(records), skipped
+
+    def _append_records(self, records, entries):
+        """Write encoded records and their index entries, then rebuild the bitmaps"""
+        indexed = len(self.index)
+        self.records = self.index = self.bitmaps = None    # drop the mappings before writing
+        try:
+            with open(self.path / RECORDS_FILE, 'ab') as f:
+                f.truncate(entries[0][1])
+                f.write(b''.join(records))
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.path / INDEX_FILE, 'ab') as f:
+                f.truncate(indexed * INDEX_DTYPE.itemsize)
+                f.write(np.array(entries, INDEX_DTYPE).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as exc:
+            raise ArchiveError(f"Cannot append to archive {self.path}: {exc}") from exc
+        finally:
+            self.records = _map(self.path / RECORDS_FILE, np.uint8)
+            self.index = _map(self.path / INDEX_FILE, INDEX_DTYPE)
+        self._write_bitmaps(self._build_bitmaps())
+        self.reload()
+
+    def _answer_codes(self):
+        """(records, bitmap questions) array of current-layout answer codes, gathered in place"""
+        questions = list(dict.fromkeys((section_id, key) for section_id, key, _ in BITMAP_KEYS))
+        codes = np.zeros((len(self.index), len(questions)), np.uint8)
+        offsets = self.index['offset']
+        versions = self.records[offsets + 2]
+        for version in np.unique(versions):
+            layout = LAYOUTS.get(int(version))
+            if layout is None:
+                raise ArchiveError(f"Unknown intake record version {version}")
+            selected = np.flatnonzero(versions == version)
+            for column, (section_id, key) in enumerate(questions):
+                index = layout.answer_index.get((section_id, key))
+                if index is None:
+                    continue
+                # Old layouts may order a question's answers differently: recode by answer text
+                current = CURRENT_LAYOUT.answer_codes[CURRENT_LAYOUT.answer_index[(section_id, key)]]
+                recode = np.zeros(256, np.uint8)
+                for code, answer in enumerate(layout.answers[index][3], 1):
+                    recode[code] = current.get(answer, 0)
+                codes[selected, column] = recode[self.records[offsets[selected] + HEADER_SIZE + index]]
+        return questions, codes
+
+    def _build_bitmaps(self):
+        questions, codes = self._answer_codes()
+        columns = {question: column for column, question in enumerate(questions)}
+        bitmaps = np.empty((len(BITMAP_KEYS), (len(self.index) + 7) // 8), np.uint8)
+        for row, (section_id, key, answer) in enumerate(BITMAP_KEYS):
+            code = CURRENT_LAYOUT.answer_codes[CURRENT_LAYOUT.answer_index[(section_id, key)]][answer]
+            bitmaps[row] = np.packbits(codes[:, columns[(section_id, key)]] == code)
+        return bitmaps
+
+    def _write_bitmaps(self, bitmaps):
+        pending = self.path / f".{BITMAPS_FILE}-{os.getpid()}"
+        try:
+            with open(pending, 'wb') as f:
+                f.write(BITMAPS_HEADER.pack(BITMAPS_MAGIC, len(self.index), _KEYS_DIGEST))
+                f.write(bitmaps.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(pending, self.path / BITMAPS_FILE)
+        except OSError as exc:
+            pending.unlink(missing_ok=True)
+            raise ArchiveError(f"Cannot write archive bitmaps {self.path}: {exc}") from exc
+
+    def _write_skipped(self, gaps):
+        """Replace the list of skipped submissions (written after the index, so a listed one may be archived)"""
+        path = self.path / SKIPPED_FILE
+        if not gaps and not path.exists():
+            return
+        pending = self.path / f".{SKIPPED_FILE}-{os.getpid()}"
+        try:
+            with open(pending, 'wb') as f:
+                f.write(np.array(sorted(gaps.items()), SKIPPED_DTYPE).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(pending, path)
+        except OSError as exc:
+            pending.unlink(missing_ok=True)
+            raise ArchiveError(f"Cannot write archive skip list {self.path}: {exc}") from exc
+
+
+def archive_submissions(store, archive, batch_size=5000):
+    """Append the submissions skipped by earlier runs, then those stored since the archive's last one.
+
+    Returns {'rows', 'skipped', 'retried', 'seconds'}.
+    """
+    start = time.perf_counter()
+    retries = archive.skipped()
+    # Start after the skipped ones too: the newest submission may be one of them
+    after_id = max(archive.last_id(), int(retries['id'].max()) if len(retries) else 0)
+    submissions = chain(
+        ((int(gap['id']), _EPOCH + timedelta(seconds=int(gap['submitted'])), store.get(int(gap['id'])))
+         for gap in retries),
+        store.iter_submissions(after_id=after_id, batch_size=batch_size),
+    )
+    # One append, and one bitmap rebuild, per run: only the encoded records are held meanwhile
+    rows, skipped = archive.append(submissions)
+    return {'rows': rows, 'skipped': skipped, 'retried': len(retries), 'seconds': time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new intakes to the research archive, or count matches")
+    parser.add_argument("conditions", nargs="*", metavar="FIELD=ANSWER",
+                        help="count the archived intakes with all these answers instead of appending")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_PATH, help="archive directory (default: %(default)s)")
+    parser.add_argument("--store", default=os.environ.get('INTAKE_STORE_PATH', DEFAULT_STORE_PATH),
+                        help="submission database (default: %(default)s)")
+    parser.add_argument("--since", type=date.fromisoformat, help="first submission day of a query")
+    parser.add_argument("--until", type=date.fromisoformat, help="day after the last submission day of a query")
+    args = parser.parse_args()
+
+    archive = IntakeArchive(args.archive)
+    if not args.conditions:
+        store = SQLiteSubmissionStore(args.store)
+        stats = archive_submissions(store, archive)
+        store.close()
+        print(f"{stats['rows']} intakes archived in {stats['seconds']:.2f} s"
+              f" ({stats['retried']} retried, {stats['skipped']} skipped), {len(archive)} in total")
+        return
+
+    start = time.perf_counter()
+    try:
+        hits = archive.submitted_between(args.since, args.until)
+        for condition in args.conditions:
+            field, _, answer = condition.partition('=')
+            hits = hits & archive.bitmap(field, answer or "Yes")
+    except ArchiveError as exc:
+        parser.error(str(exc))
+    matches = archive.count(hits)
+    print(f"{matches} of {len(archive)} intakes in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
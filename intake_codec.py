@@ -0,0 +1,333 @@
+"""
+Compact, versioned binary records of intake forms.
+
+A record is a whole form_data dict in a few hundred bytes instead of the
+2-3 KB of its JSON:
+
+    b'GI'  version  n  [n answer codes]  [value fields]
+
+- ``version`` (one byte) names the layout the record was written with;
+- the ``n`` answer codes of every choice question follow at fixed
+  offsets, one byte each (0 for unanswered, else the 1-based index of the
+  answer among the question's options, as ``form_model.Answer`` codes);
+- then every other field in layout order: text as length + 1 varint
+  (0 for no answer) and UTF-8, whole numbers as zigzag varints, dates as
+  ordinal varints, select answers as option index bytes, multiselect and
+  medication lists as a count varint and their items.
+
+``RecordReader`` reads single fields straight from the buffer: the answers
+of a section are a slice of the answer block, and a value field is found by
+skipping the fields before it by their length prefixes, so nothing else is
+decoded.
+
+The layout is derived from ``form_model.SECTION_FIELDS``; its digest is
+checked against ``LAYOUT_DIGESTS`` at import so a schema change cannot
+silently change the meaning of stored records. When it changes:
+
+1. copy ``describe_layout()`` of the old version into ``FROZEN_LAYOUTS``,
+2. bump ``CURRENT_VERSION`` and record the new digest,
+3. if keys were renamed or answers recoded, add a ``MIGRATIONS`` function
+   upgrading a decoded form_data dict from the old version.
+
+Older records are then decoded with their own layout and migrated step by
+step to the current version.
+"""
+
+import hashlib
+from datetime import date
+
+from form_model import SECTION_FIELDS, FREQUENCIES, FormDataError
+from form_schema import SchemaError
+
+MAGIC = b'GI'
+HEADER_SIZE = 4
+CURRENT_VERSION = 1
+
+LAYOUT_DIGESTS = {
+    1: '7f54c35af9e63610',
+}
+
+# version -> layout, for versions older than CURRENT_VERSION
+FROZEN_LAYOUTS = {}
+
+# version -> function(form_data) upgrading a decoded form from that version to the next
+MIGRATIONS = {}
+
+
+def describe_layout():
+    """(section id, key, kind, options) of every field of the current layout, answers first"""
+    answers, values = [], []
+    for section_id, section_fields in SECTION_FIELDS.items():
+        for f in section_fields:
+            if f.kind == 'answer':
+                answers.append((section_id, f.name, 'answer', tuple(member.text for member in f.type)))
+            else:
+                options = FREQUENCIES if f.kind == 'medications' else tuple(f.type or ())
+                values.append((section_id, f.name, f.kind, options))
+    return tuple(answers + values)
+
+
+def layout_digest(layout):
+    return hashlib.sha256(repr(layout).encode()).hexdigest()[:16]
+
+
+class Layout:
+    """Field positions of one record version"""
+
+    def __init__(self, version, fields):
+        self.version = version
+        self.fields = fields
+        self.answers = tuple(f for f in fields if f[2] == 'answer')
+        self.values = tuple(f for f in fields if f[2] != 'answer')
+        self.answer_codes = tuple({text: code for code, text in enumerate(f[3], 1)} for f in self.answers)
+        self.option_codes = tuple({text: code for code, text in enumerate(f[3], 1)} for f in self.values)
+        self.sections = tuple(dict.fromkeys(f[0] for f in fields))
+        # section -> (first, last + 1) in the answer block; answers are grouped by section
+        self.answer_slices = {}
+        for index, (section_id, *_) in enumerate(self.answers):
+            first, _ = self.answer_slices.get(section_id, (index, index))
+            self.answer_slices[section_id] = (first, index + 1)
+        self.answer_index = {(f[0], f[1]): index for index, f in enumerate(self.answers)}
+        self.value_index = {(f[0], f[1]): index for index, f in enumerate(self.values)}
+        self.known_keys = {section_id: {f[1] for f in fields if f[0] == section_id} for section_id in self.sections}
+
+
+_current_fields = describe_layout()
+if layout_digest(_current_fields) != LAYOUT_DIGESTS[CURRENT_VERSION]:
+    raise SchemaError(
+        f"The form fields no longer match record layout version {CURRENT_VERSION}: "
+        "freeze the old layout and add a new version (see intake_codec)"
+    )
+for _version, _fields in FROZEN_LAYOUTS.items():
+    if layout_digest(_fields) != LAYOUT_DIGESTS[_version]:
+        raise SchemaError(f"Frozen record layout version {_version} was edited")
+
+LAYOUTS = {version: Layout(version, fields) for version, fields in FROZEN_LAYOUTS.items()}
+LAYOUTS[CURRENT_VERSION] = CURRENT_LAYOUT = Layout(CURRENT_VERSION, _current_fields)
+
+
+def _put_varint(out, n):
+    while n > 0x7F:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(buf, pos):
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    n, shift = byte & 0x7F, 7
+    while True:
+        pos += 1
+        byte = buf[pos]
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos + 1
+        shift += 7
+
+
+def _put_text(out, text):
+    data = text.encode()
+    _put_varint(out, len(data) + 1)
+    out += data
+
+
+def _put_option(out, codes, value):
+    try:
+        out.append(codes[value])
+    except KeyError:
+        raise FormDataError(f"{value!r} is not one of the options") from None
+
+
+def _put_value(out, kind, codes, value):
+    if value is None:
+        out.append(0)
+    elif kind == 'text':
+        if not isinstance(value, str):
+            raise FormDataError(f"expected text, got {type(value).__name__}")
+        _put_text(out, value)
+    elif kind == 'int':
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise FormDataError(f"expected a whole number, got {value!r}")
+        _put_varint(out, (value << 1 ^ value >> 63) + 1)     # zigzag
+    elif kind == 'date':
+        if not isinstance(value, date):
+            raise FormDataError(f"expected a date, got {value!r}")
+        _put_varint(out, value.toordinal())
+    elif kind == 'option':
+        _put_option(out, codes, value)
+    elif kind == 'options':
+        _put_varint(out, len(value) + 1)
+        for option in value:
+            _put_option(out, codes, option)
+    else:
+        _put_varint(out, len(value) + 1)
+        for row in value:
+            name, dose = row.get('name', ''), row.get('dose', '')
+            if not isinstance(name, str) or not isinstance(dose, str):
+                raise FormDataError(f"not a medication row: {row!r}")
+            _put_text(out, name)
+            _put_text(out, dose)
+            _put_option(out, codes, row.get('frequency', FREQUENCIES[0]))
+
+
+def encode_record(form_data, layout=CURRENT_LAYOUT):
+    """Encode a form_data dict as a record, of the current layout unless another is given.
+
+    Raises FormDataError if the form does not fit the layout.
+    """
+    for section_id, answers in form_data.items():
+        known = layout.known_keys.get(section_id)
+        if known is None or not known.issuperset(answers):
+            raise FormDataError(f"{section_id}: unknown keys {sorted(set(answers) - (known or set()))}")
+
+    out = bytearray(MAGIC)
+    out.append(layout.version)
+    out.append(len(layout.answers))
+    empty = {}
+    for (section_id, key, _, _), codes in zip(layout.answers, layout.answer_codes):
+        value = form_data.get(section_id, empty).get(key)
+        if value is None:
+            out.append(0)
+        elif value in codes:
+            out.append(codes[value])
+        else:
+            raise FormDataError(f"{section_id}.{key}: {value!r} is not one of the options")
+    for (section_id, key, kind, _), codes in zip(layout.values, layout.option_codes):
+        try:
+            _put_value(out, kind, codes, form_data.get(section_id, empty).get(key))
+        except FormDataError as exc:
+            raise FormDataError(f"{section_id}.{key}: {exc}") from None
+    return bytes(out)
+
+
+def _get_text(buf, pos):
+    n = buf[pos]
+    if n < 0x80:
+        pos += 1
+    else:
+        n, pos = _get_varint(buf, pos)
+    if n == 0:
+        return None, pos
+    end = pos + n - 1
+    return str(buf[pos:end], 'utf-8'), end
+
+
+def _get_value(buf, pos, kind, options):
+    if kind == 'text':
+        return _get_text(buf, pos)
+    n, pos = _get_varint(buf, pos)
+    if n == 0:
+        return None, pos
+    if kind == 'int':
+        n -= 1
+        return n >> 1 ^ -(n & 1), pos
+    if kind == 'date':
+        return date.fromordinal(n), pos
+    if kind == 'option':
+        return options[n - 1], pos
+    if kind == 'options':
+        end = pos + n - 1
+        return [options[i - 1] for i in buf[pos:end]], end
+    rows = []
+    for _ in range(n - 1):
+        name, pos = _get_text(buf, pos)
+        dose, pos = _get_text(buf, pos)
+        rows.append({'name': name, 'dose': dose, 'frequency': options[buf[pos] - 1]})
+        pos += 1
+    return rows, pos
+
+
+def _skip_value(buf, pos, kind):
+    """Position after a value field, without decoding it"""
+    n, pos = _get_varint(buf, pos)
+    if n == 0 or kind in ('int', 'date', 'option'):
+        return pos
+    if kind in ('text', 'options'):
+        return pos + n - 1
+    for _ in range(n - 1):
+        pos = _skip_value(buf, pos, 'text')
+        pos = _skip_value(buf, pos, 'text')
+        pos += 1
+    return pos
+
+
+def _header(buf):
+    if bytes(buf[:2]) != MAGIC:
+        raise FormDataError("Not an intake record")
+    layout = LAYOUTS.get(buf[2])
+    if layout is None:
+        raise FormDataError(f"Unknown intake record version {buf[2]}")
+    if buf[3] != len(layout.answers):
+        raise FormDataError("Corrupt intake record header")
+    return layout
+
+
+def decode_record(data):
+    """Decode a record of any known version into a current form_data dict"""
+    buf = bytes(data)   # indexing bytes is faster than a memoryview; a record is small
+    layout = _header(buf)
+    form_data = {section_id: {} for section_id in layout.sections}
+    codes = buf[HEADER_SIZE:HEADER_SIZE + len(layout.answers)]
+    for (section_id, key, _, options), code in zip(layout.answers, codes):
+        if code:
+            form_data[section_id][key] = options[code - 1]
+    pos = HEADER_SIZE + len(layout.answers)
+    for section_id, key, kind, options in layout.values:
+        n = buf[pos]
+        if n == 0:
+            pos += 1        # unanswered
+        elif kind == 'text' and n < 0x80:
+            form_data[section_id][key] = str(buf[pos + 1:pos + n], 'utf-8')
+            pos += n
+        else:
+            form_data[section_id][key], pos = _get_value(buf, pos, kind, options)
+    for version in range(layout.version, CURRENT_VERSION):
+        form_data = MIGRATIONS[version](form_data)
+    return form_data
+
+
+class RecordReader:
+    """Read single fields of a record in place (fields of the record's own layout version)"""
+
+    __slots__ = ('buf', 'layout')
+
+    def __init__(self, data):
+        self.buf = memoryview(data)
+        self.layout = _header(self.buf)
+
+    @property
+    def version(self):
+        return self.layout.version
+
+    def answer_codes(self, section_id):
+        """The section's answer codes, a zero-copy slice of the record"""
+        first, last = self.layout.answer_slices[section_id]
+        return self.buf[HEADER_SIZE + first:HEADER_SIZE + last]
+
+    def answers(self, section_id):
+        """{key: answer} of the section's answered choice questions"""
+        first, last = self.layout.answer_slices[section_id]
+        return {
+            key: options[code - 1]
+            for (_, key, _, options), code in zip(self.layout.answers[first:last],
+                                                  self.buf[HEADER_SIZE + first:HEADER_SIZE + last])
+            if code
+        }
+
+    def get(self, section_id, key, default=None):
+        """One answer of the record, decoding only that field"""
+        index = self.layout.answer_index.get((section_id, key))
+        if index is not None:
+            code = self.buf[HEADER_SIZE + index]
+            return self.layout.answers[index][3][code - 1] if code else default
+        index = self.layout.value_index.get((section_id, key))
+        if index is None:
+            raise KeyError(f"{section_id}.{key}")
+        pos = HEADER_SIZE + len(self.layout.answers)
+        for _, _, kind, _ in self.layout.values[:index]:
+            pos = _skip_value(self.buf, pos, kind)
+        _, _, kind, options = self.layout.values[index]
+        value, _ = _get_value(self.buf, pos, kind, options)
+        return default if value is None else value
@@ -0,0 +1,148 @@
+"""
+Medication list editor.
+
+Patients in the geriatric clinic often take 15-25 medications. The editor
+shows them a page of ``PAGE_SIZE`` rows at a time, so the number of widgets
+(and the cost of a rerun) does not grow with the list. Rows live in
+``form_data['medications']['medications_list']`` as one dict per
+medication; each widget's ``on_change`` callback writes its own field of its
+own row, and the list is only resized when the medication count changes.
+Names missing from the local formulary get up to ``MAX_SUGGESTIONS``
+corrected spellings to tap. The editor is a fragment, so it autosaves the
+section and writes the shared session at the end of its own reruns.
+"""
+
+import math
+
+import streamlit as st
+
+from autosave import autosave_section
+from form_model import FREQUENCIES
+from formulary import get_formulary, split_ingredients
+from rerun_profiler import profiled
+from session_store import persist_session
+
+MAX_MEDICATIONS = 30
+PAGE_SIZE = 5
+MAX_SUGGESTIONS = 3
+
+
+def _empty_row():
+    return {'name': '', 'dose': '', 'frequency': FREQUENCIES[0]}
+
+
+def _medications():
+    return st.session_state.form_data['medications']
+
+
+def resize_medications(count):
+    """Grow or shrink the medication list to ``count`` rows"""
+    medications = _medications()
+    rows = medications.setdefault('medications_list', [])
+    del rows[count:]
+    rows.extend(_empty_row() for _ in range(count - len(rows)))
+    medications['num_medications'] = count
+
+    page_count = math.ceil(count / PAGE_SIZE)
+    st.session_state.medication_page = min(st.session_state.get('medication_page', 0), page_count - 1)
+
+
+def _on_count_change():
+    resize_medications(st.session_state.num_medications)
+
+
+def _on_row_change(row, field, widget_key):
+    _medications()['medications_list'][row][field] = st.session_state[widget_key]
+
+
+def _use_suggestion(row, name):
+    _medications()['medications_list'][row]['name'] = name
+    # Drop the widget's state so it is recreated with the row's new name
+    del st.session_state[f"med_name_{row}"]
+
+
+def _render_suggestions(row, name):
+    """Offer formulary spellings for a name that is not in the formulary"""
+    formulary = get_formulary()
+    if not name or formulary.lookup(name):
+        return
+    suggestions = formulary.suggest(name, limit=MAX_SUGGESTIONS)
+    if not suggestions:
+        return
+    st.caption("Did you mean:")
+    for j, (suggestion, ingredient) in enumerate(suggestions):
+        ingredients = ' + '.join(split_ingredients(ingredient))
+        label = suggestion if suggestion == ingredient else f"{suggestion} ({ingredients})"
+        st.button(label, key=f"med_suggest_{row}_{j}", use_container_width=True,
+                  on_click=_use_suggestion, args=(row, suggestion))
+
+
+def _turn_page(step):
+    st.session_state.medication_page += step
+
+
+@st.fragment
+@profiled(name='medication_editor')
+def render_medication_editor():
+    """Render the medication count and the current page of medication rows"""
+    medications = _medications()
+    count = st.number_input(
+        "How many different medications do you take?",
+        min_value=1, max_value=MAX_MEDICATIONS,
+        value=medications.get('num_medications', 1),
+        key="num_medications",
+        on_change=_on_count_change
+    )
+    if len(medications.get('medications_list', ())) != count or 'medication_page' not in st.session_state:
+        resize_medications(count)
+
+    rows = medications['medications_list']
+    page = st.session_state.medication_page
+    first = page * PAGE_SIZE
+
+    for i in range(first, min(first + PAGE_SIZE, count)):
+        row = rows[i]
+        st.markdown(f"#### Medication {i + 1}")
+        col1, col2, col3 = st.columns([2, 1, 1])
+
+        with col1:
+            st.text_input(
+                "Medication Name",
+                value=row['name'],
+                key=f"med_name_{i}",
+                on_change=_on_row_change, args=(i, 'name', f"med_name_{i}")
+            )
+            _render_suggestions(i, row['name'])
+
+        with col2:
+            st.text_input(
+                "Dose (if known)",
+                value=row['dose'],
+                key=f"med_dose_{i}",
+                placeholder="e.g., 10mg",
+                on_change=_on_row_change, args=(i, 'dose', f"med_dose_{i}")
+            )
+
+        with col3:
+            st.selectbox(
+                "How often?",
+                options=FREQUENCIES,
+                index=FREQUENCIES.index(row['frequency']) if row['frequency'] in FREQUENCIES else 0,
+                key=f"med_freq_{i}",
+                on_change=_on_row_change, args=(i, 'frequency', f"med_freq_{i}")
+            )
+
+    page_count = math.ceil(count / PAGE_SIZE)
+    if page_count > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("PREVIOUS", key="med_page_prev", use_container_width=True,
+                      disabled=page == 0, on_click=_turn_page, args=(-1,))
+        with col2:
+            st.markdown(f"Medications {first + 1}-{min(first + PAGE_SIZE, count)} of {count}")
+        with col3:
+            st.button("MORE", key="med_page_next", use_container_width=True,
+                      disabled=page == page_count - 1, on_click=_turn_page, args=(1,))
+
+    autosave_section('medications')
+    persist_session()
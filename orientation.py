@@ -0,0 +1,215 @@
+"""
+Orientation scoring for the cognitive section.
+
+The six "About Today" / "About This Place" answers are checked against the
+reference date (the server clock when the report is made, or the submission
+time when re-scoring stored intakes) and the configured clinic facts:
+
+    today_date, day_of_week, season, current_year   vs the reference date
+    hospital_name, city                               vs the clinic's names
+
+Hospital and city answers are matched with regular expressions compiled
+once from the configured names, after folding case and accents, so
+"Hôpital général juif", "hopital general juif", "JGH" and "the Jewish
+General" all count. A season is accepted if it is the season of any day
+within a week of the reference date. An unanswered item (the date and
+year widgets start empty) scores as incorrect.
+
+``score_many`` scores a whole cohort with NumPy; ``orientation_score``
+scores one form through the same code. Stored intakes are re-scored in
+batches against their own submission dates:
+
+    python orientation.py --since 2026-01-01 --output orientation.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+from collections import namedtuple
+from datetime import date, datetime
+from itertools import islice
+
+import numpy as np
+import streamlit as st
+
+from formulary import normalize_name
+from submission_store import DEFAULT_STORE_PATH, SQLiteSubmissionStore
+
+ORIENTATION_ITEMS = ('today_date', 'day_of_week', 'season', 'current_year', 'hospital_name', 'city')
+ORIENTATION_LABELS = {
+    'today_date': "date",
+    'day_of_week': "day of the week",
+    'season': "season",
+    'current_year': "year",
+    'hospital_name': "hospital",
+    'city': "city",
+}
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SEASONS = ["Winter", "Spring", "Summer", "Fall"]
+# First day of year (1-based, non-leap) of spring, summer, fall and winter
+SEASON_STARTS = np.array([79, 172, 265, 355])
+SEASON_TOLERANCE_DAYS = 7
+
+DEFAULT_CLINIC_FACTS = {
+    'hospital_names': [
+        "Jewish General Hospital", "Jewish General", "JGH", "Jewish Hospital",
+        "Sir Mortimer B. Davis Jewish General Hospital", "Mortimer Davis",
+        "Hôpital général juif", "Hôpital juif", "HGJ",
+    ],
+    'city_names': ["Montreal", "Montréal", "MTL", "Ville de Montréal"],
+}
+
+OrientationResult = namedtuple('OrientationResult', ['score', 'correct'])
+
+
+def _name_matcher(names):
+    """Compiled regex matching any of the names as whole words, after normalize_answer"""
+    alternatives = sorted({normalize_answer(name) for name in names}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(re.escape(a) for a in alternatives) + r")\b")
+
+
+def normalize_answer(text):
+    """Case- and accent-folded answer with punctuation replaced by spaces"""
+    return ' '.join(re.sub(r"[^\w\s]", " ", normalize_name(text)).split())
+
+
+def _season_index(day_of_year):
+    """Index into SEASONS for an array of 1-based days of the year"""
+    return np.searchsorted(SEASON_STARTS, day_of_year, side='right') % len(SEASONS)
+
+
+class OrientationScorer:
+    """Scores orientation answers against one clinic's facts"""
+
+    def __init__(self, hospital_names, city_names):
+        self._hospital = _name_matcher(hospital_names)
+        self._city = _name_matcher(city_names)
+        self._match_cache = {}
+
+    def _matches(self, matcher, answer):
+        key = (matcher.pattern, answer)
+        if key not in self._match_cache:
+            if len(self._match_cache) > 10_000:
+                self._match_cache.clear()
+            self._match_cache[key] = bool(answer) and bool(matcher.search(normalize_answer(answer)))
+        return self._match_cache[key]
+
+    def score_many(self, cognitive_datas, reference_dates):
+        """Score many cognitive dicts; returns (scores, correct) NumPy arrays.
+
+        ``correct`` is an (n, 6) boolean array in ORIENTATION_ITEMS order.
+        """
+        cognitive_datas = list(cognitive_datas)
+        n = len(cognitive_datas)
+        reference = np.array([np.datetime64(d, 'D') for d in reference_dates], dtype='datetime64[D]')
+        answered_date = np.array(
+            [c.get('today_date') if isinstance(c.get('today_date'), date) else 'NaT' for c in cognitive_datas],
+            dtype='datetime64[D]',
+        )
+        day_codes = np.array([_DAY_CODES.get(c.get('day_of_week'), -1) for c in cognitive_datas], dtype=np.int8)
+        season_codes = np.array([_SEASON_CODES.get(c.get('season'), -1) for c in cognitive_datas], dtype=np.int8)
+        years = np.array([_int_or(c.get('current_year'), -1) for c in cognitive_datas], dtype=np.int32)
+
+        correct = np.zeros((n, len(ORIENTATION_ITEMS)), dtype=bool)
+        correct[:, 0] = answered_date == reference
+        # 1970-01-01 was a Thursday (index 3)
+        correct[:, 1] = day_codes == (reference.astype(np.int64) + 3) % 7
+        first_of_year = reference.astype('datetime64[Y]').astype('datetime64[D]')
+        for offset in (-SEASON_TOLERANCE_DAYS, 0, SEASON_TOLERANCE_DAYS):
+            shifted = reference + np.timedelta64(offset, 'D')
+            day_of_year = (shifted - shifted.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1
+            correct[:, 2] |= season_codes == _season_index(day_of_year)
+        correct[:, 3] = years == first_of_year.astype('datetime64[Y]').astype(np.int64) + 1970
+        correct[:, 4] = [self._matches(self._hospital, c.get('hospital_name')) for c in cognitive_datas]
+        correct[:, 5] = [self._matches(self._city, c.get('city')) for c in cognitive_datas]
+        return correct.sum(axis=1), correct
+
+    def score(self, cognitive_data, reference_date):
+        """Score one cognitive dict; returns an OrientationResult"""
+        scores, correct = self.score_many([cognitive_data], [reference_date])
+        return OrientationResult(int(scores[0]), dict(zip(ORIENTATION_ITEMS, correct[0].tolist())))
+
+
+_DAY_CODES = {day: i for i, day in enumerate(DAYS)}
+_SEASON_CODES = {season: i for i, season in enumerate(SEASONS)}
+
+
+def _int_or(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@st.cache_resource(show_spinner=False)
+def get_orientation_scorer():
+    """Return the process-wide scorer for the configured clinic.
+
+    ``INTAKE_CLINIC_FACTS_PATH`` may point to a JSON file with
+    ``hospital_names`` and ``city_names`` lists replacing the defaults.
+    """
+    facts = dict(DEFAULT_CLINIC_FACTS)
+    path = os.environ.get('INTAKE_CLINIC_FACTS_PATH')
+    if path:
+        with open(path, encoding='utf-8') as f:
+            facts.update(json.load(f))
+    return OrientationScorer(facts['hospital_names'], facts['city_names'])
+
+
+def orientation_score(cognitive_data, reference_date=None):
+    """Orientation result of one form against today's date (or ``reference_date``)"""
+    return get_orientation_scorer().score(cognitive_data, reference_date or date.today())
+
+
+def describe_orientation(result):
+    """e.g. 'Orientation: 5/6 correct (incorrect: season)'"""
+    text = f"Orientation: {result.score}/{len(ORIENTATION_ITEMS)} correct"
+    missed = [ORIENTATION_LABELS[item] for item in ORIENTATION_ITEMS if not result.correct[item]]
+    return f"{text} (incorrect: {', '.join(missed)})" if missed else text
+
+
+def rescore_submissions(submissions, batch_size=5000, scorer=None):
+    """Yield (id, submitted_at, score, correct row) for stored submissions.
+
+    ``submissions`` is an iterable of (id, submitted_at, form_data), e.g.
+    ``store.iter_submissions(...)``; each intake is scored against the day
+    it was submitted.
+    """
+    scorer = scorer or get_orientation_scorer()
+    submissions = iter(submissions)
+    while batch := list(islice(submissions, batch_size)):
+        scores, correct = scorer.score_many(
+            (form_data.get('cognitive', {}) for _, _, form_data in batch),
+            (datetime.fromisoformat(submitted_at).date() for _, submitted_at, _ in batch),
+        )
+        for (submission_id, submitted_at, _), score, row in zip(batch, scores.tolist(), correct.tolist()):
+            yield submission_id, submitted_at, score, row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score orientation answers of stored intakes")
+    parser.add_argument("--store", default=os.environ.get('INTAKE_STORE_PATH', DEFAULT_STORE_PATH),
+                        help="submission database (default: %(default)s)")
+    parser.add_argument("--since", type=date.fromisoformat, help="first day to include")
+    parser.add_argument("--until", type=date.fromisoformat, help="day after the last day to include")
+    parser.add_argument("--output", required=True, help="CSV file to write")
+    args = parser.parse_args()
+
+    store = SQLiteSubmissionStore(args.store)
+    count = 0
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'submitted_at', 'score', *ORIENTATION_ITEMS])
+        for submission_id, submitted_at, score, row in rescore_submissions(
+                store.iter_submissions(since=args.since, until=args.until)):
+            writer.writerow([submission_id, submitted_at, score, *(int(ok) for ok in row)])
+            count += 1
+    store.close()
+    print(f"{count} intakes re-scored -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
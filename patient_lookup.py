@@ -0,0 +1,111 @@
+"""
+Returning-patient lookup.
+
+A returning patient enters their RAMQ number and date of birth; the
+submission store finds their most recent intake with one probe of its
+(health_card, date_of_birth) index, and the answers that rarely change
+between visits are copied into the new form:
+
+- personal information and emergency contact,
+- medications and drug allergies,
+- medical conditions, surgeries and other conditions.
+
+Symptoms, memory, daily activities and recent hospitalizations describe
+the patient today and are always asked again. The carried-over sections
+show a notice asking the patient to confirm them.
+"""
+
+import copy
+from datetime import date
+
+import streamlit as st
+
+from form_schema import FORM_SCHEMA, iter_items
+from submission_store import SubmissionStoreError, get_submission_store
+
+# Answers copied from the previous intake, by section
+CARRIED_OVER = {
+    'demographics': None,   # every answer
+    'medications': ('taking_medications', 'num_medications', 'medications_list',
+                    'has_allergies', 'allergies_list'),
+    'medical_history': tuple(
+        item.key for item in iter_items(FORM_SCHEMA['medical_history'].items)
+        if item.key and item.key not in ('hospitalized_past_year', 'hospitalization_reason')
+    ),
+}
+
+# Keys of the value-holding widgets showing carried-over answers. They are
+# dropped after a prefill so the widgets are recreated with the new values.
+_DEMOGRAPHICS_WIDGETS = ('first_name', 'last_name', 'dob', 'sex', 'phone', 'health_card',
+                         'emergency_name', 'emergency_relation', 'emergency_phone', 'preferred_language')
+_MEDICATION_WIDGET_PREFIXES = ('med_name_', 'med_dose_', 'med_freq_')
+_MEDICATION_WIDGETS = ('num_medications', 'medication_page', 'allergies_list')
+_MEDICAL_HISTORY_WIDGETS = tuple(
+    item.widget for item in iter_items(FORM_SCHEMA['medical_history'].items)
+    if item.key in CARRIED_OVER['medical_history'] and item.type != 'choice'
+)
+
+
+def carry_over(form_data, previous):
+    """Copy the carried-over answers of a previous intake into form_data"""
+    for section_id, keys in CARRIED_OVER.items():
+        answers = previous.get(section_id, {})
+        if keys is None:
+            form_data[section_id] = copy.deepcopy(answers)
+        else:
+            form_data[section_id].update(copy.deepcopy({key: answers[key] for key in keys if key in answers}))
+    return form_data
+
+
+def _reset_widgets():
+    for key in list(st.session_state.keys()):
+        if key in _DEMOGRAPHICS_WIDGETS or key in _MEDICATION_WIDGETS or key in _MEDICAL_HISTORY_WIDGETS \
+                or key.startswith(_MEDICATION_WIDGET_PREFIXES):
+            del st.session_state[key]
+
+
+def _on_lookup():
+    """FIND MY PREVIOUS FORM callback"""
+    if not (st.session_state.lookup_health_card and st.session_state.lookup_dob):
+        st.session_state.lookup_message = "Please enter your health card number and date of birth."
+        return
+    try:
+        found = get_submission_store().latest_for_patient(
+            st.session_state.lookup_health_card, st.session_state.lookup_dob
+        )
+    except SubmissionStoreError:
+        found = None
+    if found is None:
+        st.session_state.lookup_message = (
+            "We could not find a previous form with this health card number and date of birth."
+        )
+        return
+    _, submitted_at, previous = found
+    carry_over(st.session_state.form_data, previous)
+    _reset_widgets()
+    st.session_state.lookup_message = None
+    st.session_state.prefilled_from = submitted_at[:10]
+
+
+def render_returning_patient_lookup():
+    """Offer to fill the form from the patient's previous intake"""
+    if st.session_state.get('prefilled_from'):
+        return
+    with st.expander("Have you filled in this form before? Find your previous answers"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.text_input("Health Card Number (RAMQ)", key="lookup_health_card")
+        with col2:
+            st.date_input("Date of Birth", value=None, min_value=date(1900, 1, 1), max_value=date.today(),
+                          key="lookup_dob")
+        st.button("FIND MY PREVIOUS FORM", key="lookup_submit", use_container_width=True,
+                  on_click=_on_lookup)
+        if st.session_state.get('lookup_message'):
+            st.warning(st.session_state.lookup_message)
+
+
+def render_carry_over_notice(section_id):
+    """Ask the patient to confirm answers carried over from their previous intake"""
+    if section_id in CARRIED_OVER and st.session_state.get('prefilled_from'):
+        st.info(f"Some answers were filled in from your form of {st.session_state.prefilled_from}. "
+                "Please check them and correct anything that has changed.")
@@ -0,0 +1,236 @@
+"""
+End-of-day clinic packets: render many stored submissions at once.
+
+Two output formats:
+
+- ``zip``: one PDF per intake. Reports are rendered in parallel on a process
+  pool and written into the archive as they complete. At most ``window``
+  reports are in flight, so memory stays bounded however long the day was.
+- ``pdf``: one merged PDF, one intake per page group. Reports are rendered
+  the same way, each as its own small document, and their pages are copied
+  into the output file as they complete, so the merged packet is never held
+  in memory either.
+
+Usage:
+    python pdf_batch.py --date 2026-10-16 --output packet.zip
+    python pdf_batch.py --since 2026-10-01 --until 2026-11-01 --format pdf --output october.pdf
+"""
+
+import argparse
+import os
+import re
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+from pdf_report import build_report_elements, new_report_document
+from submission_store import DEFAULT_STORE_PATH, SQLiteSubmissionStore
+
+
+def render_submission(submission):
+    """Render one stored submission; returns (submission_id, pdf bytes, page count)"""
+    submission_id, submitted_at, form_data = submission
+    buffer = BytesIO()
+    doc = new_report_document(buffer)
+    doc.build(build_report_elements(form_data, datetime.fromisoformat(submitted_at)))
+    return submission_id, buffer.getvalue(), doc.page
+
+
+def report_file_name(submission_id, form_data):
+    demo = form_data.get('demographics', {})
+    name = f"{demo.get('last_name', '')}_{demo.get('first_name', '')}".strip('_') or "patient"
+    safe_name = ''.join(ch if ch.isalnum() else '_' for ch in name)
+    return f"intake_{submission_id:08d}_{safe_name}.pdf"
+
+
+def _render_in_order(submissions, workers=None, window=None):
+    """Render submissions on a process pool; yields (submission, pdf bytes, page count) in input order.
+
+    At most ``window`` reports are in flight, so memory stays bounded.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for submission in submissions:
+            in_flight.append((pool.submit(render_submission, submission), submission))
+            if len(in_flight) >= window:
+                future, oldest = in_flight.popleft()
+                yield (oldest,) + future.result()[1:]
+        while in_flight:
+            future, oldest = in_flight.popleft()
+            yield (oldest,) + future.result()[1:]
+
+
+def render_packet_zip(submissions, output, workers=None, window=None):
+    """Render submissions in parallel into a zip of PDFs.
+
+    ``submissions`` is an iterable of (id, submitted_at, form_data), e.g.
+    ``store.iter_submissions(...)``; it is consumed lazily. Returns the
+    throughput statistics.
+    """
+    documents = pages = 0
+    start = time.perf_counter()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for (submission_id, _, form_data), pdf, page_count in _render_in_order(submissions, workers, window):
+            archive.writestr(report_file_name(submission_id, form_data), pdf)
+            documents += 1
+            pages += page_count
+    return _throughput(documents, pages, time.perf_counter() - start)
+
+
+def render_packet_pdf(submissions, output, workers=None, window=None):
+    """Render submissions in parallel into one merged PDF. Returns throughput statistics.
+
+    Nothing is written when there are no submissions.
+    """
+    documents = pages = 0
+    start = time.perf_counter()
+    merged = None
+    try:
+        for _, pdf, page_count in _render_in_order(submissions, workers, window):
+            if merged is None:
+                merged = _MergedPdfWriter(output)
+            merged.add(pdf)
+            documents += 1
+            pages += page_count
+    finally:
+        if merged is not None:
+            merged.close()
+    return _throughput(documents, pages, time.perf_counter() - start)
+
+
+_STARTXREF = re.compile(rb'startxref\s+(\d+)\s+%%EOF\s*$')
+_XREF_ENTRY = re.compile(rb'(\d{10}) \d{5} ([nf])')
+_OBJECT = re.compile(rb'(\d+) 0 obj\s*(.*?)\s*endobj\s*$', re.S)
+_STREAM = re.compile(rb'>>\s*stream\r?\n')
+_REFERENCE = re.compile(rb'(\d+) 0 R\b')
+
+
+def _trailer_reference(trailer, key):
+    return int(re.search(rb'/' + key + rb' (\d+) 0 R', trailer).group(1))
+
+
+def _pdf_objects(pdf):
+    """{number: (dictionary, stream)} of a PDF with a classic xref table, plus its trailer.
+
+    ``stream`` is the raw ``stream ... endstream`` part (or ``b''``); only the
+    dictionary is ever rewritten, so stream data is copied byte for byte.
+    """
+    xref = int(_STARTXREF.search(pdf[-64:]).group(1))
+    table, _, trailer = pdf[xref:].partition(b'trailer')
+    offsets = sorted(int(offset) for offset, kind in _XREF_ENTRY.findall(table) if kind == b'n')
+    objects = {}
+    for offset, end in zip(offsets, offsets[1:] + [xref]):
+        match = _OBJECT.match(pdf, offset, end)
+        body = match.group(2)
+        stream = _STREAM.search(body)
+        split = stream.start() + 2 if stream else len(body)
+        objects[int(match.group(1))] = (body[:split], body[split:])
+    return objects, trailer
+
+
+class _MergedPdfWriter:
+    """Concatenate ReportLab-generated PDFs into one file, page by page.
+
+    Each added document is copied object by object under new numbers, then
+    dropped; only the page numbers are kept for the page tree written on
+    close. Object 1 is reserved for that page tree and object 2 for the
+    catalog. This reads the plain xref tables ReportLab writes and is not a
+    general-purpose PDF merger.
+    """
+
+    PAGES, CATALOG = 1, 2
+
+    def __init__(self, output):
+        self._file = open(output, 'wb')
+        self._file.write(b'%PDF-1.4\n%\x93\x8c\x8b\x9e\n')
+        self._offsets = {}
+        self._pages = []
+
+    def add(self, pdf):
+        objects, trailer = _pdf_objects(pdf)
+        catalog = objects[_trailer_reference(trailer, b'Root')][0]
+        page_tree = int(re.search(rb'/Pages (\d+) 0 R', catalog).group(1))
+        kids = re.search(rb'/Kids \[([^\]]*)\]', objects[page_tree][0]).group(1)
+        pages = [int(number) for number in _REFERENCE.findall(kids)]
+
+        # Copy what the pages reach (contents, fonts), not the catalog, page tree or info
+        numbers = {page_tree: self.PAGES}
+        pending = list(pages)
+        while pending:
+            number = pending.pop()
+            if number not in numbers:
+                numbers[number] = len(self._offsets) + len(numbers) + 2
+                pending.extend(int(ref) for ref in _REFERENCE.findall(objects[number][0]))
+
+        for number, new_number in sorted(numbers.items(), key=lambda item: item[1]):
+            if new_number == self.PAGES:
+                continue
+            dictionary, stream = objects[number]
+            dictionary = _REFERENCE.sub(lambda ref: b'%d 0 R' % numbers[int(ref.group(1))], dictionary)
+            self._write_object(new_number, dictionary + stream)
+        self._pages.extend(numbers[page] for page in pages)
+
+    def _write_object(self, number, body):
+        self._offsets[number] = self._file.tell()
+        self._file.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+
+    def close(self):
+        kids = b' '.join(b'%d 0 R' % page for page in self._pages)
+        self._write_object(self.PAGES, b'<< /Count %d /Kids [ %s ] /Type /Pages >>' % (len(self._pages), kids))
+        self._write_object(self.CATALOG, b'<< /Pages %d 0 R /Type /Catalog >>' % self.PAGES)
+        xref = self._file.tell()
+        size = max(self._offsets) + 1
+        self._file.write(b'xref\n0 %d\n0000000000 65535 f \n' % size)
+        self._file.write(b''.join(b'%010d 00000 n \n' % self._offsets[number] for number in range(1, size)))
+        self._file.write(b'trailer\n<< /Root %d 0 R /Size %d >>\nstartxref\n%d\n%%%%EOF\n'
+                         % (self.CATALOG, size, xref))
+        self._file.close()
+
+
+def _throughput(documents, pages, seconds):
+    return {
+        'documents': documents,
+        'pages': pages,
+        'seconds': seconds,
+        'pages_per_second': pages / seconds if seconds else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render stored intakes into one clinic packet")
+    parser.add_argument("--store", default=os.environ.get('INTAKE_STORE_PATH', DEFAULT_STORE_PATH),
+                        help="submission database (default: %(default)s)")
+    parser.add_argument("--date", type=date.fromisoformat,
+                        help="render one day's intakes (default: today)")
+    parser.add_argument("--since", type=date.fromisoformat, help="first day to include")
+    parser.add_argument("--until", type=date.fromisoformat, help="day after the last day to include")
+    parser.add_argument("--format", choices=["zip", "pdf"], default="zip")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--workers", type=int, default=None, help="render processes")
+    args = parser.parse_args()
+
+    if args.since or args.until:
+        since, until = args.since, args.until
+    else:
+        since = args.date or date.today()
+        until = since + timedelta(days=1)
+
+    store = SQLiteSubmissionStore(args.store)
+    submissions = store.iter_submissions(since=since, until=until)
+    if args.format == "zip":
+        stats = render_packet_zip(submissions, args.output, workers=args.workers)
+    else:
+        stats = render_packet_pdf(submissions, args.output, workers=args.workers)
+    store.close()
+
+    print(f"{stats['documents']} intakes, {stats['pages']} pages in {stats['seconds']:.2f} s "
+          f"({stats['pages_per_second']:.1f} pages/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
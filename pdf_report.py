@@ -0,0 +1,235 @@
+"""
+PDF export of the intake form.
+
+The review page only hands Streamlit a callable; the report is rendered when
+the patient actually presses DOWNLOAD PDF, and is memoized under a content
+hash of the form data and the day, so an unchanged form is rendered once a
+day (its date stamp and orientation reference date stay current). A
+memoized report is stamped with the day only: a time of day would be the
+first render's and go stale.
+"""
+
+import copy
+import hashlib
+import json
+from datetime import date, datetime
+from io import BytesIO
+
+import streamlit as st
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.enums import TA_CENTER
+
+from allergy_check import find_allergy_conflicts, describe_conflict
+from form_schema import FORM_SCHEMA, pdf_lines
+from functional_scores import functional_scores, describe_katz, describe_lawton
+from orientation import orientation_score, describe_orientation
+from rerun_profiler import profiled
+from risk_flags import evaluate_rules, describe_flag
+
+
+# ---------------------------------------------------------------------------
+# PDF template registry: styles and table styles. Built once per process;
+# each report only creates its patient-specific flowables. Question labels
+# come from the form schema.
+# ---------------------------------------------------------------------------
+
+SAMPLE_STYLES = getSampleStyleSheet()
+BODY_STYLE = SAMPLE_STYLES['Normal']
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=SAMPLE_STYLES['Heading1'],
+    fontSize=24,
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    textColor=colors.HexColor('#1a365d')
+)
+
+SECTION_STYLE = ParagraphStyle(
+    'SectionTitle',
+    parent=SAMPLE_STYLES['Heading2'],
+    fontSize=16,
+    spaceBefore=20,
+    spaceAfter=10,
+    textColor=colors.HexColor('#2c5282')
+)
+
+NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=SAMPLE_STYLES['Normal'],
+    fontSize=11,
+    spaceAfter=6
+)
+
+ALERT_STYLE = ParagraphStyle(
+    'Alert',
+    parent=NORMAL_STYLE,
+    textColor=colors.HexColor('#c53030')
+)
+
+DEMOGRAPHICS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+])
+
+DEMOGRAPHICS_COL_WIDTHS = [2*inch, 4*inch]
+PAGE_MARGINS = {'topMargin': 0.5*inch, 'bottomMargin': 0.5*inch}
+
+def form_data_digest(form_data):
+    """Content hash of the form data; changes whenever any answer changes"""
+    payload = json.dumps(form_data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _stamp(generated_at, time_format):
+    """Format the report date; a plain ``date`` is printed without a time of day"""
+    if isinstance(generated_at, datetime):
+        return generated_at.strftime(f'%Y-%m-%d {time_format}')
+    return generated_at.isoformat()
+
+
+def build_report_elements(form_data, generated_at):
+    """Build the report flowables for one form.
+
+    ``generated_at`` is a datetime, or a date to leave the time of day out.
+    A pure function of its arguments: it never touches session state or the
+    clock, so it can run in worker processes and in batch jobs.
+    """
+    day = generated_at.date() if isinstance(generated_at, datetime) else generated_at
+    elements = []
+
+    # Title
+    elements.append(Paragraph("Geriatric Clinic - Patient Intake Form", TITLE_STYLE))
+    elements.append(Paragraph("Jewish General Hospital", BODY_STYLE))
+    elements.append(Paragraph(f"Date: {_stamp(generated_at, '%H:%M')}", BODY_STYLE))
+    elements.append(Spacer(1, 20))
+
+    # Risk flags, ahead of everything else
+    flags = evaluate_rules(form_data)
+    if flags:
+        elements.append(Paragraph("RISK FLAGS", SECTION_STYLE))
+        for rule in flags:
+            elements.append(Paragraph(f"<b>{describe_flag(rule)}</b>", ALERT_STYLE))
+        elements.append(Spacer(1, 15))
+
+    # Demographics
+    elements.append(Paragraph("PATIENT INFORMATION", SECTION_STYLE))
+    demo = form_data['demographics']
+    demo_data = [
+        ["Name:", f"{demo.get('first_name', '')} {demo.get('last_name', '')}"],
+        ["Date of Birth:", str(demo.get('date_of_birth', ''))],
+        ["Sex:", demo.get('sex', '')],
+        ["Phone:", demo.get('phone', '')],
+        ["Health Card:", demo.get('health_card', '')],
+        ["Emergency Contact:", f"{demo.get('emergency_name', '')} ({demo.get('emergency_relation', '')})"],
+        ["Emergency Phone:", demo.get('emergency_phone', '')],
+        ["Preferred Language:", demo.get('preferred_language', '')],
+    ]
+
+    demo_table = Table(demo_data, colWidths=DEMOGRAPHICS_COL_WIDTHS)
+    demo_table.setStyle(DEMOGRAPHICS_TABLE_STYLE)
+    elements.append(demo_table)
+    elements.append(Spacer(1, 15))
+
+    # Symptoms, cognitive with its orientation score
+    _append_schema_section(elements, FORM_SCHEMA['symptoms'], form_data['symptoms'])
+    elements.append(Spacer(1, 15))
+
+    _append_schema_section(elements, FORM_SCHEMA['cognitive'], form_data['cognitive'])
+    orientation = orientation_score(form_data['cognitive'], day)
+    elements.append(Paragraph(f"<b>{describe_orientation(orientation)}</b>", NORMAL_STYLE))
+    elements.append(Spacer(1, 15))
+
+    # Medications
+    elements.append(Paragraph("MEDICATIONS", SECTION_STYLE))
+    meds = form_data['medications']
+
+    if meds.get('taking_medications') == "Yes":
+        med_list = meds.get('medications_list', [])
+        for m in med_list:
+            if m.get('name'):
+                elements.append(Paragraph(f"- {m.get('name', '')} {m.get('dose', '')} ({m.get('frequency', '')})", NORMAL_STYLE))
+
+        if meds.get('needs_help'):
+            elements.append(Paragraph(f"<b>Needs help with medications:</b> {meds.get('needs_help')}", NORMAL_STYLE))
+        if meds.get('miss_doses'):
+            elements.append(Paragraph(f"<b>Misses doses:</b> {meds.get('miss_doses')}", NORMAL_STYLE))
+    else:
+        elements.append(Paragraph("No medications reported", NORMAL_STYLE))
+
+    if meds.get('has_allergies') == "Yes":
+        elements.append(Paragraph(f"<b>Drug allergies:</b> {meds.get('allergies_list', 'Not specified')}", NORMAL_STYLE))
+    for conflict in find_allergy_conflicts(meds):
+        elements.append(Paragraph(f"<b>Possible allergy conflict:</b> {describe_conflict(conflict)}", ALERT_STYLE))
+
+    elements.append(Spacer(1, 15))
+
+    # ADL, IADL, each with its score
+    scores = functional_scores(form_data)
+    _append_schema_section(elements, FORM_SCHEMA['adl'], form_data['adl'])
+    elements.append(Paragraph(f"<b>{describe_katz(scores.katz, scores.katz_answered)}</b>", NORMAL_STYLE))
+    elements.append(Spacer(1, 15))
+
+    _append_schema_section(elements, FORM_SCHEMA['iadl'], form_data['iadl'])
+    elements.append(Paragraph(f"<b>{describe_lawton(scores.lawton, scores.lawton_answered)}</b>", NORMAL_STYLE))
+    elements.append(Spacer(1, 15))
+
+    # Medical History
+    _append_schema_section(elements, FORM_SCHEMA['medical_history'], form_data['medical_history'])
+
+    # Footer
+    elements.append(Spacer(1, 30))
+    elements.append(Paragraph("_" * 50, NORMAL_STYLE))
+    elements.append(Paragraph(f"Form completed: {_stamp(generated_at, '%H:%M:%S')}", BODY_STYLE))
+    elements.append(Paragraph("This form was completed electronically by the patient.", BODY_STYLE))
+
+    return elements
+
+
+def _append_schema_section(elements, section, section_data):
+    """Append a schema-driven section: its title and answer lines"""
+    elements.append(Paragraph(section.pdf['title'], SECTION_STYLE))
+    for line in pdf_lines(section, section_data):
+        elements.append(Paragraph(line, NORMAL_STYLE))
+
+
+def new_report_document(buffer):
+    """Create a document template with the report's page layout"""
+    return SimpleDocTemplate(buffer, pagesize=letter, **PAGE_MARGINS)
+
+
+@profiled
+def generate_pdf_report(form_data, generated_at=None):
+    """Generate PDF report of the form data"""
+    buffer = BytesIO()
+    doc = new_report_document(buffer)
+    doc.build(build_report_elements(form_data, generated_at or datetime.now()))
+    buffer.seek(0)
+    return buffer
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _render_pdf_report(digest, day, _form_data):
+    """Render the report for one version of the form on one day (memoized on both, dated by day only)"""
+    return generate_pdf_report(_form_data, day).getvalue()
+
+
+def get_pdf_report(form_data):
+    """Return the PDF bytes for the form, rendering only if the form or the day changed"""
+    return _render_pdf_report(form_data_digest(form_data), date.today(), form_data)
+
+
+def deferred_pdf_report(form_data):
+    """Return a zero-argument callable for ``st.download_button(data=...)``.
+
+    Streamlit calls it on a worker thread only when the download is
+    requested, so it works on a snapshot rather than on session state.
+    """
+    snapshot = copy.deepcopy(form_data)
+    return lambda: get_pdf_report(snapshot)
@@ -0,0 +1,168 @@
+"""
+Per-rerun performance instrumentation.
+
+Functions decorated with ``@profiled`` (``main``, the page chrome, every
+section renderer, the question-block and medication-editor fragments and
+``generate_pdf_report``) record their wall time when the profiler is
+enabled. The outermost span of a script run - or of a fragment rerun -
+also counts the widgets and the bytes of the ForwardMsgs the run sends to
+the browser, by wrapping the script run context's enqueue function for the
+duration of the run. Should a Streamlit release drop that private hook,
+only the widgets are counted, from the context's ``widget_ids_this_run``,
+and bytes and messages stay 0. Each finished run (or report rendered
+outside a run) becomes one record in a ring buffer of the last
+``RING_SIZE`` records:
+
+    {'name': 'main', 'started_at': ..., 'ms': 41.2, 'widgets': 16,
+     'messages': 58, 'bytes': 23817,
+     'spans': [{'name': 'render_logo_header', 'ms': 0.4, 'widgets': 0, 'bytes': 91}, ...]}
+
+Disabled (the default), a decorated call costs one attribute check. Set
+``INTAKE_PROFILE=1`` to enable it at startup; staff can also switch it on,
+browse the buffer and download it as JSON from the admin panel, which is
+only rendered when the page URL has ``?admin=<INTAKE_ADMIN_KEY>``.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import streamlit as st
+from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+
+RING_SIZE = 500
+
+WIDGET_TYPES = frozenset({
+    'button', 'download_button', 'checkbox', 'radio', 'selectbox', 'multiselect', 'slider',
+    'text_input', 'text_area', 'number_input', 'date_input', 'time_input', 'file_uploader',
+})
+
+
+class RerunProfiler:
+    """Process-wide span recorder with a ring buffer of finished records"""
+
+    def __init__(self, size=RING_SIZE, enabled=False):
+        self.enabled = enabled
+        self.records = deque(maxlen=size)
+        self._local = threading.local()
+
+    def _counters(self):
+        return getattr(self._local, 'counters', None)
+
+    def _totals(self):
+        """Widgets and bytes sent so far in the current outermost span"""
+        counters = self._counters()
+        if not counters:
+            return 0, 0
+        widget_ids = getattr(self._local, 'widget_ids', None)
+        if widget_ids is not None:
+            return len(widget_ids) - counters['widgets_before'], counters['bytes']
+        return counters['widgets'], counters['bytes']
+
+    def span(self, name, fn, args, kwargs):
+        """Call ``fn`` as a span named ``name``"""
+        spans = getattr(self._local, 'spans', None)
+        if spans is None:
+            return self._record(name, fn, args, kwargs)
+        before = self._totals()
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            after = self._totals()
+            spans.append({'name': name, 'ms': (time.perf_counter() - start) * 1000,
+                          'widgets': after[0] - before[0], 'bytes': after[1] - before[1]})
+
+    def _record(self, name, fn, args, kwargs):
+        """Run an outermost span and append its record to the ring buffer"""
+        counters = {'widgets': 0, 'messages': 0, 'bytes': 0}
+        ctx = get_script_run_ctx(suppress_warning=True)
+        original_enqueue = getattr(ctx, '_enqueue', None)
+        patched = callable(original_enqueue)
+        self._local.widget_ids = None
+
+        if patched:
+            def counting_enqueue(msg):
+                counters['messages'] += 1
+                counters['bytes'] += msg.ByteSize()
+                if msg.WhichOneof('type') == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                    if msg.delta.new_element.WhichOneof('type') in WIDGET_TYPES:
+                        counters['widgets'] += 1
+                original_enqueue(msg)
+            ctx._enqueue = counting_enqueue
+        elif ctx is not None:
+            self._local.widget_ids = getattr(ctx, 'widget_ids_this_run', None)
+            counters['widgets_before'] = len(self._local.widget_ids) if self._local.widget_ids is not None else 0
+
+        self._local.spans = []
+        self._local.counters = counters
+        started_at = datetime.now().isoformat(timespec='milliseconds')
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            if patched and ctx._enqueue is counting_enqueue:
+                ctx._enqueue = original_enqueue
+            widgets, _ = self._totals()
+            self.records.append({'name': name, 'started_at': started_at, 'ms': elapsed, 'widgets': widgets,
+                                 'messages': counters['messages'], 'bytes': counters['bytes'],
+                                 'spans': self._local.spans})
+            self._local.spans = self._local.counters = self._local.widget_ids = None
+
+    def export_json(self):
+        return json.dumps(list(self.records), indent=1)
+
+    def clear(self):
+        self.records.clear()
+
+
+PROFILER = RerunProfiler(enabled=os.environ.get('INTAKE_PROFILE') == '1')
+
+
+def profiled(fn=None, name=None):
+    """Decorator (or wrapper for an existing callable) recording a span when profiling is on"""
+    if fn is None:
+        return functools.partial(profiled, name=name)
+    span_name = name or getattr(fn, '__name__', repr(fn))
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.enabled:
+            return fn(*args, **kwargs)
+        return PROFILER.span(span_name, fn, args, kwargs)
+    return wrapper
+
+
+def _summary_rows(records):
+    rows = []
+    for record in reversed(records):
+        rows.append({
+            'started_at': record['started_at'], 'name': record['name'], 'ms': round(record['ms'], 1),
+            'widgets': record['widgets'], 'KiB': round(record['bytes'] / 1024, 1),
+            'slowest span': max(record['spans'], key=lambda s: s['ms'])['name'] if record['spans'] else '',
+        })
+    return rows
+
+
+def render_admin_panel():
+    """Profiler controls for staff, shown only with ?admin=<INTAKE_ADMIN_KEY>"""
+    admin_key = os.environ.get('INTAKE_ADMIN_KEY')
+    if not admin_key or st.query_params.get('admin') != admin_key:
+        return
+    with st.expander("Performance profiler (staff only)"):
+        PROFILER.enabled = st.toggle("Record reruns", value=PROFILER.enabled, key="admin_profiler_enabled")
+        records = list(PROFILER.records)
+        st.caption(f"{len(records)} of the last {PROFILER.records.maxlen} records")
+        if records:
+            st.dataframe(_summary_rows(records[-50:]), hide_index=True, width='stretch')
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("EXPORT JSON", data=PROFILER.export_json, file_name="rerun_profile.json",
+                               mime="application/json", on_click="ignore", use_container_width=True)
+        with col2:
+            st.button("CLEAR", key="admin_profiler_clear", use_container_width=True, on_click=PROFILER.clear)
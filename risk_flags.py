@@ -0,0 +1,236 @@
+"""
+Geriatric risk flags.
+
+Rules are declared as data in ``RAW_RULES`` and compiled once, at import,
+into plain predicate closures: every field path is split and checked
+against the form schema, every comparison is bound to its operand, so
+evaluating a rule is a handful of dict lookups. Conditions are
+
+    {'field': 'section.key', 'eq': value}     answer equals value
+    {'field': 'section.key', 'in': [values]}  answer is one of values
+    {'field': 'section.key', 'ge': number}    numeric answer >= number
+    {'all': [conditions]}                     every condition holds
+    {'any': [conditions]}                     some condition holds
+    {'at_least': n, 'of': [conditions]}       n or more conditions hold
+
+Each compiled rule records the sections it reads, so a caller can
+re-evaluate only the rules touched by the section just completed: the
+app's NEXT button calls ``update_flags`` for the section it leaves, and
+the review page shows the flags raised so far. Rules only read answers,
+so a flag is never raised by an unanswered question.
+
+``scan_submissions`` runs the rules over the submission store;
+``python risk_flags.py`` lists the at-risk patients.
+"""
+
+import argparse
+import csv
+import os
+import sys
+from dataclasses import dataclass
+from datetime import date
+
+from form_model import SECTION_FIELDS
+from form_schema import FORM_SCHEMA
+from submission_store import DEFAULT_STORE_PATH, SQLiteSubmissionStore
+
+MEMORY_KEYS = ('forget_names', 'forget_appointments', 'lose_items', 'repeat_questions',
+               'difficulty_decisions', 'get_lost')
+
+RAW_RULES = [
+    {
+        'id': 'fall_risk',
+        'label': "Fall risk",
+        'message': "two or more falls, or a fall with balance problems or dizziness",
+        'when': {'any': [
+            {'all': [{'field': 'symptoms.falls', 'eq': "Yes"},
+                     {'field': 'symptoms.falls_count', 'ge': 2}]},
+            {'all': [{'field': 'symptoms.falls', 'eq': "Yes"},
+                     {'any': [{'field': 'symptoms.balance', 'eq': "Yes"},
+                              {'field': 'symptoms.dizziness', 'eq': "Yes"}]}]},
+        ]},
+    },
+    {
+        'id': 'polypharmacy',
+        'label': "Polypharmacy",
+        'message': "five or more medications, or missed doses with three or more",
+        'when': {'all': [
+            {'field': 'medications.taking_medications', 'eq': "Yes"},
+            {'any': [
+                {'field': 'medications.num_medications', 'ge': 5},
+                {'all': [{'field': 'medications.num_medications', 'ge': 3},
+                         {'field': 'medications.miss_doses', 'in': ["Sometimes", "Often"]}]},
+            ]},
+        ]},
+    },
+    {
+        'id': 'cognitive_risk',
+        'label': "Cognitive risk",
+        'message': "three or more memory concerns, or getting lost in familiar places",
+        'when': {'any': [
+            {'at_least': 3, 'of': [{'field': f'cognitive.{key}', 'eq': "Yes"} for key in MEMORY_KEYS]},
+            {'field': 'cognitive.get_lost', 'eq': "Yes"},
+        ]},
+    },
+]
+
+# Data keys of the sections rendered outside the form schema
+_CUSTOM_SECTION_KEYS = {
+    section_id: frozenset(f.name for f in section_fields)
+    for section_id, section_fields in SECTION_FIELDS.items() if section_id not in FORM_SCHEMA
+}
+
+
+class RuleError(ValueError):
+    """Raised when a risk rule is malformed"""
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One compiled risk rule"""
+    id: str
+    label: str
+    message: str
+    sections: frozenset
+    predicate: object   # form_data -> bool
+
+
+def _field_getter(path, rule_id):
+    section_id, _, key = path.partition('.')
+    if section_id in FORM_SCHEMA:
+        known_keys = FORM_SCHEMA[section_id].data_keys
+    else:
+        known_keys = _CUSTOM_SECTION_KEYS.get(section_id)
+    if known_keys is None or key not in known_keys:
+        raise RuleError(f"{rule_id}: unknown field {path!r}")
+
+    def get(form_data):
+        return form_data.get(section_id, {}).get(key)
+    return get, section_id
+
+
+def _compile_condition(raw, rule_id, sections):
+    """Compile one condition into a predicate, collecting the sections it reads"""
+    if 'field' in raw:
+        get, section_id = _field_getter(raw['field'], rule_id)
+        sections.add(section_id)
+        if 'eq' in raw:
+            expected = raw['eq']
+            return lambda form_data: get(form_data) == expected
+        if 'in' in raw:
+            allowed = frozenset(raw['in'])
+            return lambda form_data: get(form_data) in allowed
+        if 'ge' in raw:
+            threshold = raw['ge']
+
+            def at_least(form_data):
+                value = get(form_data)
+                return isinstance(value, (int, float)) and value >= threshold
+            return at_least
+        raise RuleError(f"{rule_id}: {raw['field']} condition without eq, in or ge")
+
+    if 'all' in raw:
+        parts = tuple(_compile_condition(c, rule_id, sections) for c in raw['all'])
+        return lambda form_data: all(p(form_data) for p in parts)
+    if 'any' in raw:
+        parts = tuple(_compile_condition(c, rule_id, sections) for c in raw['any'])
+        return lambda form_data: any(p(form_data) for p in parts)
+    if 'at_least' in raw:
+        needed = raw['at_least']
+        parts = tuple(_compile_condition(c, rule_id, sections) for c in raw.get('of', ()))
+        if not 0 < needed <= len(parts):
+            raise RuleError(f"{rule_id}: at_least {needed} of {len(parts)} conditions")
+        return lambda form_data: sum(p(form_data) for p in parts) >= needed
+    raise RuleError(f"{rule_id}: unknown condition {raw!r}")
+
+
+def compile_rules(raw_rules):
+    """Validate the raw rule definitions and compile them into Rules"""
+    rules = []
+    seen_ids = set()
+    for raw in raw_rules:
+        rule_id = raw.get('id')
+        if not rule_id or rule_id in seen_ids:
+            raise RuleError(f"missing or duplicate rule id {rule_id!r}")
+        seen_ids.add(rule_id)
+        sections = set()
+        predicate = _compile_condition(raw['when'], rule_id, sections)
+        rules.append(Rule(id=rule_id, label=raw['label'], message=raw['message'],
+                          sections=frozenset(sections), predicate=predicate))
+    return tuple(rules)
+
+
+RISK_RULES = compile_rules(RAW_RULES)
+
+
+def evaluate_rules(form_data, sections=None, rules=RISK_RULES):
+    """Return the rules that flag the form.
+
+    With ``sections``, only the rules reading one of those sections are
+    evaluated, e.g. the section the patient just completed.
+    """
+    if sections is not None:
+        sections = frozenset(sections)
+        rules = [rule for rule in rules if rule.sections & sections]
+    return [rule for rule in rules if rule.predicate(form_data)]
+
+
+def update_flags(flag_ids, form_data, section_id, rules=RISK_RULES):
+    """Re-evaluate the rules reading ``section_id``; returns the new set of raised rule ids"""
+    touched = {rule.id for rule in rules if section_id in rule.sections}
+    raised = evaluate_rules(form_data, sections=[section_id], rules=rules)
+    return (set(flag_ids) - touched) | {rule.id for rule in raised}
+
+
+def flagged_rules(flag_ids, rules=RISK_RULES):
+    """The rules of a set of raised ids, in rule order"""
+    return [rule for rule in rules if rule.id in flag_ids]
+
+
+def describe_flag(rule):
+    """e.g. 'Fall risk: two or more falls, or ...'"""
+    return f"{rule.label}: {rule.message}"
+
+
+def scan_submissions(submissions, rules=RISK_RULES):
+    """Yield (id, submitted_at, form_data, flagged rules) for each flagged submission.
+
+    ``submissions`` is an iterable of (id, submitted_at, form_data), e.g.
+    ``store.iter_submissions(...)``.
+    """
+    for submission_id, submitted_at, form_data in submissions:
+        flagged = [rule for rule in rules if rule.predicate(form_data)]
+        if flagged:
+            yield submission_id, submitted_at, form_data, flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List stored intakes with geriatric risk flags")
+    parser.add_argument("--store", default=os.environ.get('INTAKE_STORE_PATH', DEFAULT_STORE_PATH),
+                        help="submission database (default: %(default)s)")
+    parser.add_argument("--since", type=date.fromisoformat, help="first day to include")
+    parser.add_argument("--until", type=date.fromisoformat, help="day after the last day to include")
+    parser.add_argument("--flag", action="append", choices=[rule.id for rule in RISK_RULES],
+                        help="only these flags (repeatable; default: all)")
+    parser.add_argument("--output", help="CSV file to write (default: stdout)")
+    args = parser.parse_args()
+
+    rules = [rule for rule in RISK_RULES if not args.flag or rule.id in args.flag]
+    store = SQLiteSubmissionStore(args.store)
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        writer = csv.writer(output)
+        writer.writerow(['id', 'submitted_at', 'last_name', 'first_name', 'health_card', 'flags'])
+        for submission_id, submitted_at, form_data, flagged in scan_submissions(
+                store.iter_submissions(since=args.since, until=args.until), rules):
+            demo = form_data.get('demographics', {})
+            writer.writerow([submission_id, submitted_at, demo.get('last_name', ''), demo.get('first_name', ''),
+                             demo.get('health_card', ''), ';'.join(rule.id for rule in flagged)])
+    finally:
+        if args.output:
+            output.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Pre-aggregated statistics for the clinician dashboard.
+
+Every stored submission adds to a small table of daily counters,
+
+    rollup_counts(day, metric, value, count)
+
+e.g. ('2026-10-16', 'symptoms.falls', 'Yes', 3) or ('2026-10-16', 'katz',
+'4', 1), in the same transaction that stores the submission. A dashboard
+query sums a date range of counters, so its cost depends on the number of
+days and answer options, not on the number of stored intakes.
+
+Counted: the number of submissions, sex, every labelled choice answer of
+the symptoms, memory, ADL, IADL and medical history sections, and the
+Katz / Lawton scores.
+"""
+
+from collections import Counter
+
+from form_schema import FORM_SCHEMA
+from functional_scores import score_many
+
+SUBMISSIONS_METRIC = 'submissions'
+ROLLUP_SECTIONS = ('symptoms', 'cognitive', 'adl', 'iadl', 'medical_history')
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_counts (
+    day TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, metric, value)
+) WITHOUT ROWID;
+"""
+
+UPSERT_ROLLUP = (
+    "INSERT INTO rollup_counts (day, metric, value, count) VALUES (?, ?, ?, ?)"
+    " ON CONFLICT (day, metric, value) DO UPDATE SET count = count + excluded.count"
+)
+
+# (metric, section id, key) of every counted answer
+ANSWER_METRICS = tuple(
+    (f"{section_id}.{item.key}", section_id, item.key)
+    for section_id in ROLLUP_SECTIONS
+    for item in FORM_SCHEMA[section_id].summary_items
+)
+
+
+def rollup_increments(submissions):
+    """Counter of (day, metric, value) -> count for (submitted_at, form_data) pairs"""
+    submissions = list(submissions)
+    counts = Counter()
+    scores = score_many(form_data for _, form_data in submissions)
+    for (submitted_at, form_data), katz, lawton in zip(submissions, scores.katz.tolist(), scores.lawton.tolist()):
+        day = str(submitted_at)[:10]
+        counts[day, SUBMISSIONS_METRIC, ''] += 1
+        counts[day, 'demographics.sex', form_data.get('demographics', {}).get('sex') or ''] += 1
+        for metric, section_id, key in ANSWER_METRICS:
+            value = form_data.get(section_id, {}).get(key)
+            if value is not None:
+                counts[day, metric, value] += 1
+        counts[day, 'katz', str(katz)] += 1
+        counts[day, 'lawton', str(lawton)] += 1
+    return counts
+
+
+def apply_increments(conn, counts):
+    """Add the counts to rollup_counts (call inside the writing transaction)"""
+    conn.executemany(UPSERT_ROLLUP, [(day, metric, value, n) for (day, metric, value), n in counts.items()])
@@ -0,0 +1,236 @@
+"""
+Session state shared between app processes.
+
+Streamlit keeps ``st.session_state`` in the memory of the process serving
+the websocket, so behind a load balancer a tablet that reconnects to
+another worker would start an empty form. With a shared session store
+configured, the answers (``form_data``), the current page
+(``current_section``) and ``form_completed`` of every session are kept in
+a store all workers open, keyed by the form's resume code (which is also
+in the page URL, see ``autosave``):
+
+- at the start of each script run, ``sync_session`` compares the stored
+  version of the session with the one this process last saw (one
+  primary-key lookup) and adopts the stored state if another worker has
+  written a newer one;
+- at the end of each script run, ``persist_session`` writes the state
+  back if it changed, as a compare-and-set on the version: if two workers
+  race, the first write wins and the other worker adopts it.
+
+Any worker can then serve any request; no sticky routing is needed.
+
+The backend is chosen with ``INTAKE_SESSION_BACKEND`` (a key of
+``SESSION_BACKENDS``; unset keeps sessions in process memory only) and the
+SQLite database location with ``INTAKE_SESSION_STORE_PATH`` (default
+``data/sessions.db`` next to this file). Sessions untouched for as long as
+an autosaved form is kept are purged when a process opens the store.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+from autosave import DEFAULT_TTL, normalize_resume_code, resume_blocked
+from submission_store import restore_dates, serialize_form_data
+
+DEFAULT_SESSION_STORE_PATH = Path(__file__).parent / "data" / "sessions.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    code TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at);
+"""
+
+# Session state keys kept in the shared store
+SHARED_KEYS = ('form_data', 'current_section', 'form_completed')
+
+# Keys surviving the adoption of a session written by another worker
+_KEPT_KEYS = SHARED_KEYS + ('resume_code', 'autosaved', 'shared_session')
+
+
+class SessionStoreError(Exception):
+    """Raised when the shared session store cannot be read or written"""
+
+
+class SessionStore:
+    """Interface for shared session state backends"""
+
+    def version(self, code):
+        """Return the stored version of a session, or None if it is not stored"""
+        raise NotImplementedError
+
+    def load(self, code):
+        """Return (version, state JSON) of a session, or None"""
+        raise NotImplementedError
+
+    def save(self, code, state, expected_version):
+        """Store the state JSON if the stored version is still ``expected_version`` (0: not stored).
+
+        Returns the new version, or None if another worker wrote first.
+        """
+        raise NotImplementedError
+
+    def delete(self, code):
+        """Forget a session"""
+        raise NotImplementedError
+
+    def purge(self, older_than):
+        """Forget sessions not written since the unix time ``older_than``; returns how many"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite backend: a WAL-mode database file opened by every worker process"""
+
+    def __init__(self, path=DEFAULT_SESSION_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(SCHEMA)
+        except sqlite3.Error as exc:
+            raise SessionStoreError(f"Cannot open session store {self.path}: {exc}") from exc
+
+    def _execute(self, sql, params=()):
+        try:
+            with self._lock:
+                cursor = self._conn.execute(sql, params)
+                return cursor.fetchone(), cursor.rowcount
+        except sqlite3.Error as exc:
+            raise SessionStoreError(f"Session store error: {exc}") from exc
+
+    def version(self, code):
+        row, _ = self._execute("SELECT version FROM sessions WHERE code = ?", (code,))
+        return row[0] if row else None
+
+    def load(self, code):
+        row, _ = self._execute("SELECT version, state FROM sessions WHERE code = ?", (code,))
+        return tuple(row) if row else None
+
+    def save(self, code, state, expected_version):
+        if expected_version:
+            _, changed = self._execute(
+                "UPDATE sessions SET version = version + 1, updated_at = ?, state = ?"
+                " WHERE code = ? AND version = ?",
+                (time.time(), state, code, expected_version),
+            )
+        else:
+            _, changed = self._execute(
+                "INSERT INTO sessions (code, version, updated_at, state) VALUES (?, 1, ?, ?)"
+                " ON CONFLICT (code) DO NOTHING",
+                (code, time.time(), state),
+            )
+        return expected_version + 1 if changed else None
+
+    def delete(self, code):
+        self._execute("DELETE FROM sessions WHERE code = ?", (code,))
+
+    def purge(self, older_than):
+        _, deleted = self._execute("DELETE FROM sessions WHERE updated_at < ?", (older_than,))
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+SESSION_BACKENDS = {
+    'sqlite': SQLiteSessionStore,
+}
+
+
+@st.cache_resource(show_spinner=False)
+def get_session_store():
+    """Return the process-wide shared session store, or None if sessions are not shared"""
+    backend = os.environ.get('INTAKE_SESSION_BACKEND')
+    if not backend:
+        return None
+    if backend not in SESSION_BACKENDS:
+        raise SessionStoreError(f"Unknown session store backend: {backend}")
+    store = SESSION_BACKENDS[backend](os.environ.get('INTAKE_SESSION_STORE_PATH', DEFAULT_SESSION_STORE_PATH))
+    store.purge(time.time() - DEFAULT_TTL)
+    return store
+
+
+def encode_session(session_state):
+    """JSON of the shared keys of a session"""
+    return serialize_form_data({key: session_state[key] for key in SHARED_KEYS})
+
+
+def decode_session(state):
+    """Inverse of encode_session"""
+    shared = json.loads(state)
+    restore_dates(shared['form_data'])
+    return shared
+
+
+def sync_session():
+    """Adopt the session's stored state if another worker wrote a newer version"""
+    store = get_session_store()
+    code = st.session_state.get('resume_code')
+    if not code:
+        # A code from the URL is a resume attempt: refused while the client is
+        # blocked; a miss is counted once, by ``start_autosave``
+        code = normalize_resume_code(st.query_params.get('resume'))
+        if code and store is not None and resume_blocked():
+            return
+    if store is None or not code:
+        return
+    seen = st.session_state.get('shared_session')
+    try:
+        version = store.version(code)
+        if version is None or (seen and seen[:2] == (code, version)):
+            return
+        found = store.load(code)
+    except SessionStoreError:
+        return      # keep serving from process memory
+    if found is None:
+        return
+    version, state = found
+    # Drop widget state so every widget is recreated from the adopted form
+    for key in list(st.session_state.keys()):
+        if key not in _KEPT_KEYS:
+            del st.session_state[key]
+    st.session_state.update(decode_session(state))
+    st.session_state.shared_session = (code, version, hash(state))
+    if st.session_state.get('resume_code') != code:
+        st.session_state.resume_code = code
+        st.session_state.autosaved = {}
+
+
+def persist_session():
+    """Write the session's shared state if it changed since it was last written"""
+    store = get_session_store()
+    code = st.session_state.get('resume_code')
+    if store is None or not code:
+        return
+    state = encode_session(st.session_state)
+    fingerprint = hash(state)
+    seen_code, seen_version, seen_fingerprint = st.session_state.get('shared_session') or (code, 0, None)
+    if seen_code != code:
+        seen_version = 0    # the session switched forms (resume code entered)
+    elif seen_fingerprint == fingerprint:
+        return
+    try:
+        version = store.save(code, state, seen_version)
+    except SessionStoreError:
+        return
+    # None: another worker wrote first, its state is adopted on the next run
+    st.session_state.shared_session = (code, version, fingerprint) if version else None
+
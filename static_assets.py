@@ -0,0 +1,101 @@
+"""
+Static page chrome: high-contrast stylesheet, hospital logo and header.
+
+The chrome is identical for every patient and every rerun, so it is built
+once per server process and emitted as a single markdown element. Because
+the element's bytes never change, its ForwardMsg hash is stable and
+Streamlit's message cache replaces it with a short hash reference once the
+browser has received it.
+"""
+
+import base64
+import re
+from io import BytesIO
+from pathlib import Path
+
+import streamlit as st
+from PIL import Image
+
+ASSETS_DIR = Path(__file__).parent / "assets"
+STYLESHEET_PATH = ASSETS_DIR / "styles.css"
+LOGO_PATH = ASSETS_DIR / "logo.png"
+LOGO_WIDTH = 350
+
+LOGO_PLACEHOLDER_HTML = (
+    '<div style="text-align: center; padding: 20px; background-color: #f5f5f5; '
+    'border: 2px dashed #999; border-radius: 10px; margin-bottom: 10px;">'
+    '<p style="color: #666; font-size: 18px; margin: 0;">'
+    '[Hospital Logo]<br><small>Place logo.png in the assets folder</small>'
+    '</p></div>'
+)
+
+HOSPITAL_TITLE_HTML = (
+    '<p class="hospital-title">Hopital general juif / Jewish General Hospital</p>'
+    '<p class="hospital-subtitle">Geriatric Clinic - Patient Intake Form</p>'
+)
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_WHITESPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_WHITESPACE.sub(" ", css)
+    css = _CSS_PUNCTUATION.sub(r"\1", css)
+    css = css.replace(": ", ":").replace(";}", "}")
+    return css.strip()
+
+
+@st.cache_resource(show_spinner=False)
+def load_stylesheet():
+    """Read and minify the high-contrast stylesheet (once per process)"""
+    return minify_css(STYLESHEET_PATH.read_text(encoding="utf-8"))
+
+
+@st.cache_resource(show_spinner=False)
+def load_logo_data_uri(width=LOGO_WIDTH):
+    """Decode and resize the logo (once per process).
+
+    Returns the logo as a base64 PNG data URI, or None if there is no logo.
+    """
+    if not LOGO_PATH.exists():
+        return None
+
+    with Image.open(LOGO_PATH) as source:
+        image = source.convert("RGBA")
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+        # Resampling adds colours; keep palette logos palette-sized
+        if source.mode == "P":
+            image = image.quantize(256)
+
+        buffer = BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+@st.cache_resource(show_spinner=False)
+def build_chrome():
+    """Assemble the stylesheet and header into one HTML block (once per process)"""
+    logo_uri = load_logo_data_uri()
+    if logo_uri:
+        logo_html = (
+            f'<img src="{logo_uri}" width="{LOGO_WIDTH}" alt="Jewish General Hospital" '
+            'style="display: block; margin: 0 auto; max-width: 100%;">'
+        )
+    else:
+        logo_html = LOGO_PLACEHOLDER_HTML
+
+    return (
+        f"<style>{load_stylesheet()}</style>"
+        f'<div class="logo-header">{logo_html}{HOSPITAL_TITLE_HTML}</div>'
+    )
+
+
+def render_chrome():
+    """Emit the cached stylesheet and header"""
+    st.markdown(build_chrome(), unsafe_allow_html=True)
@@ -0,0 +1,335 @@
+"""
+Background submission queue.
+
+SUBMIT FORM only snapshots the form data and puts it on a bounded queue; a
+small pool of worker threads does the slow part. Each worker drains up to
+``batch_size`` queued submissions, stores them in one transaction, renders
+their PDF reports into the archive directory, and retries the batch with
+backoff if the store fails. Progress is reported through the
+``SubmissionTicket`` the session keeps.
+
+Before a submission is queued it is written to the spool directory
+(one fsynced JSON file, locked with ``flock`` while a process holds it),
+and the file is deleted once the submission is stored. A submission that
+FAILED keeps its spool file locked and is queued again by the workers
+after ``failed_retry_delay`` seconds, doubling up to
+``failed_retry_max_delay``, until it is stored; one that was still queued
+or waiting when its process stopped stays in the spool, and ``recover`` -
+run whenever a process starts its queue - queues again every spooled
+submission no live process holds. The autosave and shared session of a
+form are only discarded once it is stored.
+"""
+
+import fcntl
+import heapq
+import itertools
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+import streamlit as st
+
+from autosave import get_autosave_journal
+from form_model import IntakeForm
+from pdf_report import generate_pdf_report
+from session_store import get_session_store, SessionStoreError
+from submission_store import get_submission_store, restore_dates, serialize_form_data, SubmissionStoreError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = Path(__file__).parent / "data" / "reports"
+DEFAULT_SPOOL_DIR = Path(__file__).parent / "data" / "spool"
+
+# Ticket states
+QUEUED = "queued"
+SAVED = "saved"
+ARCHIVED = "archived"
+FAILED = "failed"
+
+
+class SubmissionQueueFull(Exception):
+    """Raised when the queue cannot accept another submission in time"""
+
+
+class SubmissionTicket:
+    """Status of one queued submission, shared between the session and a worker"""
+
+    def __init__(self, form_data, resume_code=None):
+        self.form_data = form_data
+        self.resume_code = resume_code
+        self.status = QUEUED
+        self.submission_id = None
+        self.error = None
+        self.attempts = 0
+        self.failures = 0       # failed rounds of attempts, for the retry backoff
+        self.spool_path = None
+        self._spool_fd = None   # holds the spool file's lock while this process owns the submission
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the submission is archived or has failed"""
+        return self._done.wait(timeout)
+
+    def _finish(self, status, error=None):
+        self.status = status
+        self.error = error
+        if status != FAILED:
+            self.form_data = None  # keep failed submissions, and their spool lock, for a retry
+            self._release_spool(saved=True)
+        self._done.set()
+
+    def _release_spool(self, saved):
+        """Unlock the spool file, deleting it once the submission is stored"""
+        if self._spool_fd is None:
+            return
+        if saved:
+            self.spool_path.unlink(missing_ok=True)
+        os.close(self._spool_fd)
+        self._spool_fd = None
+
+
+class SubmissionQueue:
+    """Bounded queue feeding a pool of batching worker threads"""
+
+    def __init__(self, store, archive_dir=DEFAULT_ARCHIVE_DIR, spool_dir=DEFAULT_SPOOL_DIR, workers=2,
+                 maxsize=256, batch_size=16, max_retries=3, retry_delay=0.5, failed_retry_delay=30.0,
+                 failed_retry_max_delay=600.0, on_saved=None):
+        self.store = store
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.failed_retry_delay = failed_retry_delay
+        self.failed_retry_max_delay = failed_retry_max_delay
+        self.on_saved = on_saved
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._failed = []       # heap of (due time, sequence, ticket) waiting for a retry
+        self._failed_lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"submission-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, form_data, resume_code=None, timeout=2.0):
+        """Spool and queue a validated snapshot of the form data and return its ticket immediately.
+
+        Raises ``FormDataError`` if the form data does not fit the form model.
+        """
+        ticket = SubmissionTicket(IntakeForm.from_form_data(form_data).to_form_data(), resume_code)
+        try:
+            self._spool(ticket)
+        except OSError as exc:
+            raise SubmissionStoreError(f"Cannot spool submission: {exc}") from exc
+        try:
+            self._queue.put(ticket, timeout=timeout)
+        except queue.Full:
+            ticket._release_spool(saved=True)   # refused: the form stays with the patient
+            raise SubmissionQueueFull("Submission queue is full") from None
+        return ticket
+
+    def _spool(self, ticket):
+        """Write the ticket's submission to the spool, locked by this process until it is stored"""
+        path = self.spool_dir / f"{time.time_ns()}-{secrets.token_hex(4)}.json"
+        pending = path.with_suffix('.tmp')
+        fd = os.open(pending, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, serialize_form_data({'resume_code': ticket.resume_code,
+                                              'form_data': ticket.form_data}).encode())
+            os.fsync(fd)
+            os.replace(pending, path)
+        except BaseException:
+            os.close(fd)
+            pending.unlink(missing_ok=True)
+            raise
+        ticket.spool_path, ticket._spool_fd = path, fd
+
+    def recover(self):
+        """Queue again the spooled submissions no live process holds; returns how many"""
+        recovered = 0
+        for path in sorted(self.spool_dir.glob('*.json')):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue    # stored meanwhile
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue    # queued by a live process
+            try:
+                if os.fstat(fd).st_nlink == 0:
+                    raise FileNotFoundError(path)   # stored just before we locked it
+                with open(fd, 'rb', closefd=False) as f:
+                    spooled = json.load(f)
+                ticket = SubmissionTicket(restore_dates(spooled['form_data']), spooled.get('resume_code'))
+            except FileNotFoundError:
+                os.close(fd)
+                continue
+            except (ValueError, KeyError, AttributeError):
+                logger.exception("Cannot read spooled submission %s", path)
+                os.close(fd)
+                continue
+            ticket.spool_path, ticket._spool_fd = path, fd
+            self._queue.put(ticket)
+            recovered += 1
+        if recovered:
+            logger.warning("Recovered %d spooled submissions", recovered)
+        return recovered
+
+    def pending(self):
+        """Approximate number of submissions waiting for a worker or for a retry"""
+        with self._failed_lock:
+            return self._queue.qsize() + len(self._failed)
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the queued submissions are processed.
+
+        Failed submissions waiting for a retry are left in the spool for ``recover``.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+            with self._failed_lock:
+                failed, self._failed = self._failed, []
+            for _, _, ticket in failed:
+                ticket._release_spool(saved=False)
+
+    def _retry_later(self, ticket):
+        """Queue a FAILED ticket again after a backoff that doubles with each failed round"""
+        ticket.failures += 1
+        delay = min(self.failed_retry_delay * 2 ** (ticket.failures - 1), self.failed_retry_max_delay)
+        logger.warning("Submission %s will be retried in %.0f s", ticket.spool_path, delay)
+        with self._failed_lock:
+            heapq.heappush(self._failed, (time.monotonic() + delay, next(self._sequence), ticket))
+
+    def _requeue_due(self):
+        """Queue the failed tickets whose retry is due; returns seconds until the next one (None if none)"""
+        now = time.monotonic()
+        with self._failed_lock:
+            while self._failed and self._failed[0][0] <= now:
+                _, _, ticket = heapq.heappop(self._failed)
+                try:
+                    self._queue.put_nowait(ticket)
+                except queue.Full:
+                    heapq.heappush(self._failed, (now + self.retry_delay, next(self._sequence), ticket))
+                    break
+            return self._failed[0][0] - now if self._failed else None
+
+    def _run(self):
+        while True:
+            try:
+                ticket = self._queue.get(timeout=self._requeue_due())
+            except queue.Empty:
+                continue
+            if ticket is None:
+                return
+
+            batch = [ticket]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    ticket = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if ticket is None:
+                    stop = True
+                    break
+                batch.append(ticket)
+
+            try:
+                self._process(batch)
+            except Exception as exc:    # keep the worker alive; no ticket may stay queued
+                logger.exception("Processing %d submissions failed", len(batch))
+                for ticket in batch:
+                    if ticket.status == SAVED:
+                        ticket._finish(SAVED, error=str(exc))
+                    elif ticket.status != ARCHIVED:
+                        ticket._finish(FAILED, error=str(exc))
+                        self._retry_later(ticket)
+            if stop:
+                return
+
+    def _process(self, batch):
+        if not self._save(batch):
+            return
+        for ticket in batch:
+            ticket._release_spool(saved=True)
+            if self.on_saved is not None:
+                try:
+                    self.on_saved(ticket)
+                except Exception:
+                    logger.exception("on_saved failed for submission %s", ticket.submission_id)
+        for ticket in batch:
+            try:
+                pdf_path = self.archive_dir / f"intake_{ticket.submission_id:08d}.pdf"
+                pdf_path.write_bytes(generate_pdf_report(ticket.form_data).getvalue())
+            except Exception as exc:  # the record is safe; only the archive copy is missing
+                logger.exception("Cannot archive PDF for submission %s", ticket.submission_id)
+                ticket._finish(SAVED, error=str(exc))
+            else:
+                ticket._finish(ARCHIVED)
+
+    def _save(self, batch):
+        for attempt in range(1, self.max_retries + 1):
+            for ticket in batch:
+                ticket.attempts = attempt
+            try:
+                ids = self.store.save_many([ticket.form_data for ticket in batch])
+            except SubmissionStoreError as exc:
+                logger.warning("Saving %d submissions failed (attempt %d/%d): %s",
+                               len(batch), attempt, self.max_retries, exc)
+                if attempt == self.max_retries:
+                    for ticket in batch:
+                        ticket._finish(FAILED, error=str(exc))
+                        self._retry_later(ticket)
+                    return False
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+            else:
+                for ticket, submission_id in zip(batch, ids):
+                    ticket.submission_id = submission_id
+                    ticket.status = SAVED
+                return True
+
+
+def forget_saved_form(journal, session_store, ticket):
+    """Discard the autosave and shared session of a stored form (runs on a worker thread)"""
+    if not ticket.resume_code:
+        return
+    journal.discard(ticket.resume_code)
+    if session_store is not None:
+        try:
+            session_store.delete(ticket.resume_code)
+        except SessionStoreError:
+            pass    # expires with the other idle sessions
+
+
+@st.cache_resource(show_spinner=False)
+def get_submission_queue():
+    """Return the process-wide submission queue, with the spooled submissions queued again"""
+    submission_queue = SubmissionQueue(
+        get_submission_store(),
+        archive_dir=os.environ.get('INTAKE_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR),
+        spool_dir=os.environ.get('INTAKE_SPOOL_DIR', DEFAULT_SPOOL_DIR),
+        on_saved=partial(forget_saved_form, get_autosave_journal(), get_session_store()),
+    )
+    submission_queue.recover()
+    return submission_queue
@@ -0,0 +1,300 @@
+"""
+Durable storage for submitted intake forms.
+
+``SubmissionStore`` is the interface the app talks to; ``SQLiteSubmissionStore``
+is the default backend. It keeps one connection per process (shared by every
+session), runs SQLite in WAL mode so readers never wait on the writer, and
+writes each batch of submissions in a single transaction, together with
+the dashboard's daily rollup counters (see ``rollups``).
+
+The backend is chosen with the ``INTAKE_STORE_BACKEND`` environment variable
+(a key of ``STORE_BACKENDS``, default ``sqlite``) and the database location
+with ``INTAKE_STORE_PATH`` (default ``data/submissions.db`` next to this file).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+
+import streamlit as st
+
+from rollups import ROLLUP_SCHEMA, apply_increments, rollup_increments
+
+DEFAULT_STORE_PATH = Path(__file__).parent / "data" / "submissions.db"
+
+# form_data fields stored as dates (serialized as ISO strings)
+DATE_FIELDS = [
+    ('demographics', 'date_of_birth'),
+    ('cognitive', 'today_date'),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    submitted_at TEXT NOT NULL,
+    first_name TEXT NOT NULL DEFAULT '',
+    last_name TEXT NOT NULL DEFAULT '',
+    health_card TEXT NOT NULL DEFAULT '',
+    date_of_birth TEXT NOT NULL DEFAULT '',
+    form_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_name ON submissions (last_name, first_name);
+CREATE INDEX IF NOT EXISTS idx_submissions_patient ON submissions (health_card, date_of_birth);
+CREATE INDEX IF NOT EXISTS idx_submissions_submitted_at ON submissions (submitted_at);
+""" + ROLLUP_SCHEMA
+
+
+class SubmissionStoreError(Exception):
+    """Raised when a submission cannot be stored or read"""
+
+
+def serialize_form_data(form_data):
+    """Serialize form_data to a JSON string (dates become ISO strings)"""
+    return json.dumps(form_data, default=_json_default, separators=(',', ':'))
+
+
+def deserialize_form_data(payload):
+    """Inverse of serialize_form_data"""
+    return restore_dates(json.loads(payload))
+
+
+def restore_dates(form_data):
+    """Turn the ISO strings of DATE_FIELDS back into dates, in place"""
+    for section, key in DATE_FIELDS:
+        value = form_data.get(section, {}).get(key)
+        if isinstance(value, str) and value:
+            form_data[section][key] = date.fromisoformat(value)
+    return form_data
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__} in form data")
+
+
+def _iso(value):
+    """ISO string for a date/datetime bound; strings pass through"""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='seconds')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def index_columns(form_data):
+    """Extract the indexed columns (name, RAMQ number, DOB) from form_data"""
+    demo = form_data.get('demographics', {})
+    dob = demo.get('date_of_birth', '')
+    return {
+        'first_name': (demo.get('first_name') or '').strip(),
+        'last_name': (demo.get('last_name') or '').strip(),
+        'health_card': normalize_health_card(demo.get('health_card')),
+        'date_of_birth': dob.isoformat() if isinstance(dob, date) else str(dob or ''),
+    }
+
+
+def normalize_health_card(health_card):
+    """Canonical form of a RAMQ number: upper case, no spaces or dashes"""
+    return ''.join(ch for ch in (health_card or '') if ch.isalnum()).upper()
+
+
+class SubmissionStore:
+    """Interface for submission persistence backends"""
+
+    def save(self, form_data, submitted_at=None):
+        """Store one submission and return its id"""
+        return self.save_many([form_data], submitted_at=submitted_at)[0]
+
+    def save_many(self, form_datas, submitted_at=None):
+        """Store several submissions atomically and return their ids"""
+        raise NotImplementedError
+
+    def get(self, submission_id):
+        """Return the form_data of a stored submission, or None"""
+        raise NotImplementedError
+
+    def iter_submissions(self, since=None, until=None, batch_size=500, after_id=0):
+        """Yield (id, submitted_at, form_data) in submission order.
+
+        ``since`` is inclusive and ``until`` exclusive; both may be datetimes
+        or ISO strings. Only submissions with an id above ``after_id`` are
+        returned, so an incremental job can resume where it stopped.
+        """
+        raise NotImplementedError
+
+    def latest_for_patient(self, health_card, date_of_birth):
+        """Return (id, submitted_at, form_data) of the patient's most recent submission, or None"""
+        raise NotImplementedError
+
+    def data_version(self):
+        """A value that changes whenever submissions are added"""
+        raise NotImplementedError
+
+    def rollup_totals(self, since=None, until=None):
+        """Return {(metric, value): count} summed over the days in [since, until)"""
+        raise NotImplementedError
+
+    def rollup_daily(self, metric, value='', since=None, until=None):
+        """Return [(day, count)] of one counter over the days in [since, until)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class SQLiteSubmissionStore(SubmissionStore):
+    """SQLite backend: one WAL-mode connection shared by the whole process"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(SCHEMA)
+            if self._needs_rollup_backfill():
+                self.rebuild_rollups()
+        except sqlite3.Error as exc:
+            raise SubmissionStoreError(f"Cannot open submission store {self.path}: {exc}") from exc
+
+    def _needs_rollup_backfill(self):
+        """True for a store created before the rollup table existed"""
+        return self._conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM submissions) AND NOT EXISTS (SELECT 1 FROM rollup_counts)"
+        ).fetchone()[0]
+
+    def rebuild_rollups(self, batch_size=5000):
+        """Recompute every rollup counter from the stored submissions"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM rollup_counts")
+                last_id = 0
+                while rows := self._conn.execute(
+                    "SELECT id, submitted_at, form_data FROM submissions WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size),
+                ).fetchall():
+                    apply_increments(self._conn, rollup_increments(
+                        (submitted_at, deserialize_form_data(payload)) for _, submitted_at, payload in rows
+                    ))
+                    last_id = rows[-1][0]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def save_many(self, form_datas, submitted_at=None):
+        submitted_at = (submitted_at or datetime.now()).isoformat(timespec='seconds')
+        form_datas = list(form_datas)
+        rows = []
+        for form_data in form_datas:
+            columns = index_columns(form_data)
+            rows.append((
+                submitted_at, columns['first_name'], columns['last_name'],
+                columns['health_card'], columns['date_of_birth'],
+                serialize_form_data(form_data),
+            ))
+        increments = rollup_increments((submitted_at, form_data) for form_data in form_datas)
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                ids = [
+                    self._conn.execute(
+                        "INSERT INTO submissions (submitted_at, first_name, last_name,"
+                        " health_card, date_of_birth, form_data) VALUES (?, ?, ?, ?, ?, ?)",
+                        row,
+                    ).lastrowid
+                    for row in rows
+                ]
+                apply_increments(self._conn, increments)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as exc:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise SubmissionStoreError(f"Cannot store submission: {exc}") from exc
+        return ids
+
+    def get(self, submission_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT form_data FROM submissions WHERE id = ?", (submission_id,)
+            ).fetchone()
+        return deserialize_form_data(row[0]) if row else None
+
+    def iter_submissions(self, since=None, until=None, batch_size=500, after_id=0):
+        last_id = after_id
+        since = _iso(since) or ''
+        until = _iso(until) or '\uffff'
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, submitted_at, form_data FROM submissions"
+                    " WHERE id > ? AND submitted_at >= ? AND submitted_at < ?"
+                    " ORDER BY id LIMIT ?",
+                    (last_id, since, until, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for submission_id, submitted_at, payload in rows:
+                yield submission_id, submitted_at, deserialize_form_data(payload)
+            last_id = rows[-1][0]
+
+    def latest_for_patient(self, health_card, date_of_birth):
+        # Served by idx_submissions_patient: the index entries end with the
+        # rowid, so the newest match is the last entry of its range.
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, submitted_at, form_data FROM submissions"
+                " WHERE health_card = ? AND date_of_birth = ? ORDER BY id DESC LIMIT 1",
+                (normalize_health_card(health_card), _iso(date_of_birth) or ''),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], deserialize_form_data(row[2])
+
+    def data_version(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM submissions").fetchone()[0]
+
+    def rollup_totals(self, since=None, until=None):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT metric, value, SUM(count) FROM rollup_counts"
+                " WHERE day >= ? AND day < ? GROUP BY metric, value",
+                (_iso(since) or '', _iso(until) or '\uffff'),
+            ).fetchall()
+        return {(metric, value): count for metric, value, count in rows}
+
+    def rollup_daily(self, metric, value='', since=None, until=None):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT day, count FROM rollup_counts"
+                " WHERE metric = ? AND value = ? AND day >= ? AND day < ? ORDER BY day",
+                (metric, value, _iso(since) or '', _iso(until) or '\uffff'),
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+STORE_BACKENDS = {
+    'sqlite': SQLiteSubmissionStore,
+}
+
+
+@st.cache_resource(show_spinner=False)
+def get_submission_store():
+    """Return the process-wide submission store"""
+    backend = os.environ.get('INTAKE_STORE_BACKEND', 'sqlite')
+    if backend not in STORE_BACKENDS:
+        raise SubmissionStoreError(f"Unknown submission store backend: {backend}")
+    return STORE_BACKENDS[backend](os.environ.get('INTAKE_STORE_PATH', DEFAULT_STORE_PATH))
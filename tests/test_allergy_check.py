@@ -0,0 +1,42 @@
+from allergy_check import AllergyIndex, DEFAULT_ALLERGY_CLASSES_PATH
+from formulary import DEFAULT_FORMULARY_PATH, Formulary
+
+
+def make_index():
+    return AllergyIndex.from_csv(DEFAULT_ALLERGY_CLASSES_PATH, Formulary.from_csv(DEFAULT_FORMULARY_PATH))
+
+
+def test_codeine_allergy_flags_tylenol_3():
+    conflicts = make_index().conflicts("codeine", [{'name': "Tylenol #3"}])
+    assert [(c.medication, c.ingredient) for c in conflicts] == [("Tylenol #3", "codeine")]
+
+
+def test_tylenol_3_allergy_widens_to_both_ingredients():
+    conflicts = make_index().conflicts("Tylenol #3", [{'name': "Tylenol"}, {'name': "Morphine"}])
+    assert {(c.medication, c.ingredient, c.drug_class) for c in conflicts} == {
+        ("Tylenol", "acetaminophen", None),
+        ("Morphine", "morphine", "Opioids"),
+    }
+
+
+def test_name_with_strength_falls_back_to_leading_words():
+    index = make_index()
+    assert index.ingredients_of("Tylenol #3 30mg") == ["acetaminophen", "codeine"]
+    assert index.ingredients_of("Metformin 500mg") == ["metformin"]
+    assert index.ingredients_of("Unknown pill") == []
+
+
+def test_allergy_to_one_ingredient_of_a_combination_product():
+    index = make_index()
+    conflicts = index.conflicts("trimethoprim", [{'name': "Septra"}, {'name': "Metformin"}])
+    assert [(c.medication, c.ingredient) for c in conflicts] == [("Septra", "trimethoprim")]
+    conflicts = index.conflicts("clavulanate", [{'name': "Clavulin"}])
+    assert [(c.medication, c.ingredient) for c in conflicts] == [("Clavulin", "clavulanate")]
+
+
+def test_class_allergy_reaches_combination_products():
+    conflicts = make_index().conflicts("sulfa", [{'name': "Bactrim"}, {'name': "Tazocin"}])
+    assert [(c.medication, c.ingredient, c.drug_class) for c in conflicts] == [
+        ("Bactrim", "sulfamethoxazole", "Sulfonamide antibiotics")]
+    conflicts = make_index().conflicts("penicillin", [{'name': "Tazocin"}])
+    assert [(c.medication, c.ingredient) for c in conflicts] == [("Tazocin", "piperacillin")]
@@ -0,0 +1,63 @@
+import csv
+import gzip
+from datetime import date, datetime
+
+import pytest
+
+from analytics_export import COLUMNS, export_submissions, flatten_chunk
+from submission_store import SQLiteSubmissionStore
+
+
+def form(**symptoms):
+    return {
+        'demographics': {'first_name': "Rose", 'last_name': "Tremblay", 'date_of_birth': date(1940, 3, 3),
+                         'sex': "Female"},
+        'symptoms': symptoms,
+        'medications': {'taking_medications': "Yes", 'num_medications': 2,
+                        'medications_list': [{'name': "  METFORMIN "}, {'name': ""}]},
+    }
+
+
+def test_rows_are_typed_and_leave_out_identifying_text():
+    data = flatten_chunk([(7, "2026-03-02T09:00:00", form(falls="Yes", falls_count=3, pain="Maybe",
+                                                         other_symptoms="my neighbour Ida"))])
+    assert set(data) == {column.name for column in COLUMNS}
+    assert data['id'] == [7] and data['age'] == [85] and data['sex'] == ["Female"]
+    assert data['symptoms_falls'] == ["Yes"] and data['symptoms_falls_count'] == [3]
+    assert data['symptoms_pain'] == [None]      # not an answer option
+    assert data['medications_names'] == [["Metformin"]]
+    assert data['flag_fall_risk'] == [True]
+    assert not any("Rose" in str(values) or "Ida" in str(values) for values in data.values())
+
+
+def read_part(path):
+    with gzip.open(path, 'rt', newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_each_run_appends_only_new_submissions(tmp_path):
+    store = SQLiteSubmissionStore(tmp_path / "intakes.db")
+    store.save_many([form(falls="Yes"), form(falls="No"), form()], submitted_at=datetime(2026, 3, 2, 9))
+    first = export_submissions(store, tmp_path / "export", chunk_size=2, export_format='csv')
+    assert first['rows'] == 3 and first['path'].name == "part-000000001-000000003.csv.gz"
+    assert [row['symptoms_falls'] for row in read_part(first['path'])] == ["Yes", "No", ""]
+
+    nothing_new = export_submissions(store, tmp_path / "export", export_format='csv')
+    assert (nothing_new['rows'], nothing_new['path']) == (0, None)
+    store.save(form(falls="Yes"))
+    second = export_submissions(store, tmp_path / "export", export_format='csv')
+    assert second['path'].name == "part-000000004-000000004.csv.gz"
+    assert [row['id'] for row in read_part(second['path'])] == ["4"]
+    assert not list((tmp_path / "export").glob(".part-*"))
+    store.close()
+
+
+def test_parquet_parts_keep_the_categories(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    store = SQLiteSubmissionStore(tmp_path / "intakes.db")
+    store.save_many([form(falls="Yes"), form(falls="No")], submitted_at=datetime(2026, 3, 2, 9))
+    path = export_submissions(store, tmp_path / "export", export_format='parquet')['path']
+    table = pq.read_table(path)
+    assert table.num_rows == 2
+    assert table.column('symptoms_falls').to_pylist() == ["Yes", "No"]
+    store.close()
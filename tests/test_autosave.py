@@ -0,0 +1,102 @@
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import autosave
+from autosave import AutosaveJournal, ResumeThrottle
+
+
+def open_journal(path, **kwargs):
+    # Two journals on one path behave like two server processes: separate descriptors and locks
+    return AutosaveJournal(path, fsync_interval=0, **kwargs)
+
+
+def test_processes_see_each_others_writes(tmp_path):
+    a, b = open_journal(tmp_path / "j"), open_journal(tmp_path / "j")
+    a.write("AAAAAA", "symptoms", '{"falls": "Yes"}')
+    b.write("BBBBBB", "adl", '{"bathing": "No"}')
+    assert b.read("AAAAAA") == {"symptoms": '{"falls": "Yes"}'}
+    assert a.read("BBBBBB") == {"adl": '{"bathing": "No"}'}
+    b.discard("AAAAAA")
+    assert "AAAAAA" not in a
+
+
+def test_compaction_keeps_other_processes_records(tmp_path):
+    a = open_journal(tmp_path / "j", compact_min_bytes=512)
+    b = open_journal(tmp_path / "j", compact_min_bytes=512)
+    b.write("BBBBBB", "adl", '{"bathing": "No"}')
+    for i in range(100):
+        a.write("AAAAAA", "symptoms", f'{{"falls_count": {i}}}')
+    assert a.stats()['bytes'] < 100 * 40     # compacted at least once
+    b.write("BBBBBB", "iadl", '{"shopping": "Yes"}')
+    for journal in (a, b):
+        assert journal.read("AAAAAA") == {"symptoms": '{"falls_count": 99}'}
+        assert journal.read("BBBBBB") == {"adl": '{"bathing": "No"}', "iadl": '{"shopping": "Yes"}'}
+
+
+def test_malformed_and_torn_lines_are_skipped(tmp_path):
+    path = tmp_path / "j"
+    open_journal(path).write("AAAAAA", "symptoms", '{"falls": "Yes"}')
+    with open(path, 'ab') as f:
+        f.write(b"not a journal line\n\xff\xfe\t1\t2\t{}\nAAAAAA\tadl\tsoon\t{}\nBBBBBB\tadl\t17")
+    journal = open_journal(path)
+    journal.write("BBBBBB", "iadl", '{"shopping": "Yes"}')
+    assert journal.read("AAAAAA") == {"symptoms": '{"falls": "Yes"}'}
+    assert open_journal(path).read("BBBBBB") == {"iadl": '{"shopping": "Yes"}'}
+
+
+def test_throttle_blocks_a_client_until_its_failures_expire():
+    throttle = ResumeThrottle(max_failures=2, window=0.2)
+    throttle.failed("10.0.0.7")
+    assert not throttle.blocked("10.0.0.7")
+    throttle.failed("10.0.0.7")
+    assert throttle.blocked("10.0.0.7") and not throttle.blocked("10.0.0.8")
+    time.sleep(0.25)
+    assert not throttle.blocked("10.0.0.7")
+
+
+def resume_app():
+    import streamlit as st
+    from autosave import render_resume_form, start_autosave
+
+    if 'form_data' not in st.session_state:
+        st.session_state.form_data = {'demographics': {'first_name': "Ida"}, 'symptoms': {}, 'adl': {}}
+        st.session_state.current_section = 2
+    start_autosave()
+    render_resume_form()
+
+
+@pytest.fixture
+def journal_path(tmp_path, monkeypatch):
+    monkeypatch.setenv('INTAKE_AUTOSAVE_PATH', str(tmp_path / "j"))
+    autosave.get_autosave_journal.clear()
+    autosave.get_resume_throttle.clear()
+    yield tmp_path / "j"
+    autosave.get_autosave_journal.clear()
+
+
+def resume(at, code):
+    at.text_input(key="resume_code_input").set_value(code)
+    return at.button(key="resume_submit").click().run()
+
+
+def test_resume_replaces_the_whole_form(journal_path):
+    open_journal(journal_path).write("K7P3QX", "symptoms", '{"falls": "Yes"}')
+    at = AppTest.from_function(resume_app).run()
+    resume(at, "k7p-3qx")
+    assert at.session_state.resume_code == "K7P3QX"
+    assert at.session_state.form_data == {'demographics': {}, 'symptoms': {'falls': "Yes"}, 'adl': {}}
+    assert at.session_state.current_section == 0
+
+
+def test_resume_is_refused_after_too_many_wrong_codes(journal_path, monkeypatch):
+    open_journal(journal_path).write("K7P3QX", "symptoms", '{"falls": "Yes"}')
+    throttle = ResumeThrottle(max_failures=2)
+    monkeypatch.setattr(autosave, 'get_resume_throttle', lambda: throttle)
+    monkeypatch.setattr(autosave, '_client', lambda: "10.0.0.7")
+    at = AppTest.from_function(resume_app).run()
+    for code in ("AAAAAA", "BBBBBB"):
+        assert "No unfinished form" in resume(at, code).warning[0].value
+    assert "Too many codes" in resume(at, "K7P3QX").warning[0].value
+    assert at.session_state.form_data['demographics'] == {'first_name': "Ida"}
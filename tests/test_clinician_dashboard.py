@@ -0,0 +1,34 @@
+from datetime import date, datetime
+
+from clinician_dashboard import prevalence_table, score_distribution
+from rollups import SUBMISSIONS_METRIC
+from submission_store import SQLiteSubmissionStore
+
+
+def form(**symptoms):
+    return {'demographics': {'first_name': "Rose"}, 'symptoms': symptoms}
+
+
+def test_queries_count_only_the_period(tmp_path):
+    store = SQLiteSubmissionStore(tmp_path / "intakes.db")
+    store.save_many([form(falls="Yes", pain="Yes"), form(falls="No", pain="Yes")], submitted_at=datetime(2026, 3, 2, 9))
+    store.save(form(falls="Yes", pain="No"), submitted_at=datetime(2026, 3, 4, 9))
+    store.save(form(falls="Yes"), submitted_at=datetime(2026, 4, 1, 9))
+
+    totals = store.rollup_totals(date(2026, 3, 1), date(2026, 3, 8))
+    assert totals[(SUBMISSIONS_METRIC, '')] == 3
+    assert store.rollup_daily(SUBMISSIONS_METRIC, '', date(2026, 3, 1), date(2026, 3, 8)) == [
+        ("2026-03-02", 2), ("2026-03-04", 1)]
+
+    rows = {row['Question']: row for row in prevalence_table(totals, 'symptoms')}
+    rates = [row['Rate'] for row in prevalence_table(totals, 'symptoms')]
+    assert rates == sorted(rates, reverse=True)
+    falls = next(row for label, row in rows.items() if "fall" in label.lower())
+    assert (falls['Yes'], falls['Answered']) == (2, 3)
+    assert falls['Rate'] == 2 / 3
+    store.close()
+
+
+def test_score_distribution_is_zero_filled():
+    totals = {('katz', '6'): 4, ('katz', '2'): 1}
+    assert score_distribution(totals, 'katz', 6) == {'Score': [0, 1, 2, 3, 4, 5, 6], 'Intakes': [0, 0, 1, 0, 0, 0, 4]}
@@ -0,0 +1,61 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from form_schema import FORM_SCHEMA, SchemaError, compile_schema, pdf_lines
+
+
+def raw_section(**overrides):
+    section = {
+        'id': 'symptoms', 'title': "Symptoms", 'intro': "",
+        'review': {'flag': ["Yes"]},
+        'items': [{'type': 'choice', 'key': 'pain', 'label': "Pain", 'question': "Pain?", 'options': 'yes_no'}],
+    }
+    section.update(overrides)
+    return section
+
+
+def test_compiled_schema_lists_summary_items_and_data_keys():
+    symptoms = FORM_SCHEMA['symptoms']
+    assert symptoms.summary_items[0].key == 'pain' and symptoms.summary_items[0].values == ("Yes", "No", "Not Sure")
+    assert {'pain_location', 'pain_level', 'falls_count'} <= symptoms.data_keys
+
+
+@pytest.mark.parametrize('overrides, message', [
+    ({'followups': {('pain', "Maybe"): [{'type': 'text', 'key': 'where', 'label': "Where?"}]}}, "not an answer option"),
+    ({'followups': {('fever', "Yes"): []}}, "unknown questions"),
+    ({'review': {'flag': ["Sometimes"]}}, "review flag"),
+    ({'items': [{'type': 'select', 'key': 'season', 'label': "Season"}]}, "without options"),
+])
+def test_inconsistent_schema_is_rejected(overrides, message):
+    with pytest.raises(SchemaError, match=message):
+        compile_schema([raw_section(**overrides)])
+
+
+def test_pdf_prints_follow_ups_only_under_their_trigger():
+    symptoms = FORM_SCHEMA['symptoms']
+    assert list(pdf_lines(symptoms, {'pain': "No", 'pain_location': "knee"})) == ["<b>Pain:</b> No"]
+    assert list(pdf_lines(symptoms, {'pain': "Yes", 'pain_location': "knee", 'pain_level': 7})) == [
+        "<b>Pain:</b> Yes", "  - Location: knee", "  - Severity: 7/10"]
+    history = FORM_SCHEMA['medical_history']
+    assert list(pdf_lines(history, {})) == ["No significant medical conditions reported"]
+    assert list(pdf_lines(history, {'diabetes': "Yes", 'stroke': "No"})) == ["- Diabetes"]
+
+
+def symptoms_page():
+    import streamlit as st
+    from form_renderer import render_section
+
+    if 'form_data' not in st.session_state:
+        st.session_state.form_data = {'symptoms': {}}
+    render_section('symptoms')
+
+
+def test_answering_a_question_shows_its_follow_ups():
+    at = AppTest.from_function(symptoms_page).run()
+    assert "pain_location" not in [widget.key for widget in at.text_area]
+    at.button(key="symptom_pain_yes").click().run()
+    assert at.session_state.form_data['symptoms']['pain'] == "Yes"
+    at.text_area(key='pain_location').input("left knee").run()
+    assert at.session_state.form_data['symptoms']['pain_location'] == "left knee"
+    at.button(key="symptom_pain_no").click().run()
+    assert "pain_location" not in [widget.key for widget in at.text_area]
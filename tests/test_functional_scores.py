@@ -0,0 +1,44 @@
+from functional_scores import (
+    ADL_ITEMS,
+    IADL_ITEMS,
+    describe_katz,
+    describe_lawton,
+    functional_scores,
+    score_many,
+)
+
+
+def form(adl_level=None, iadl_level=None, **answers):
+    adl = {item: adl_level for item in ADL_ITEMS if adl_level}
+    iadl = {item: iadl_level for item in IADL_ITEMS if iadl_level}
+    for item, level in answers.items():
+        (adl if item in ADL_ITEMS else iadl)[item] = level
+    return {'adl': adl, 'iadl': iadl}
+
+
+def test_katz_counts_independent_activities():
+    scores = functional_scores(form("Independent", bathing="Needs Assistance", toileting="Dependent"))
+    assert (scores.katz, scores.katz_answered) == (len(ADL_ITEMS) - 2, len(ADL_ITEMS))
+    assert describe_katz(scores.katz, scores.katz_answered) == "Katz ADL score: 4/6 (moderate impairment)"
+
+
+def test_lawton_gives_the_point_with_help_only_for_some_activities():
+    scores = functional_scores(form(iadl_level="Needs Assistance"))
+    assert scores.lawton == 5     # telephone, housekeeping, laundry, transportation, finances
+    assert functional_scores(form(iadl_level="Unable", telephone="Independent")).lawton == 1
+
+
+def test_unanswered_items_score_nothing_and_are_reported():
+    scores = functional_scores({'adl': {'bathing': "Independent"}})
+    assert scores == (1, 1, 0, 0)
+    assert describe_katz(scores.katz, scores.katz_answered).endswith("- 5 of 6 not answered")
+    assert describe_lawton(8, 8) == "Lawton IADL score: 8/8 (independent)"
+
+
+def test_scoring_many_forms_matches_scoring_each():
+    forms = [form("Independent", "Independent"), form("Dependent", "Unable"), {},
+             form(iadl_level="Needs Assistance", dressing="Needs Assistance")]
+    many = score_many(forms)
+    for i, form_data in enumerate(forms):
+        assert tuple(int(column[i]) for column in many) == functional_scores(form_data)
+    assert list(score_many([]).katz) == []
@@ -0,0 +1,53 @@
+import sqlite3
+from datetime import datetime
+
+from intake_archive import IntakeArchive, archive_submissions
+from submission_store import SQLiteSubmissionStore, serialize_form_data
+
+
+def form(falls, sex="Female"):
+    return {'demographics': {'first_name': "Rose", 'sex': sex}, 'symptoms': {'falls': falls}}
+
+
+def test_skipped_submission_is_retried_once_it_fits(tmp_path):
+    store = SQLiteSubmissionStore(tmp_path / "intakes.db")
+    first, bad, last = store.save_many([form("Yes"), form("No", sex="Unknown"), form("Yes")],
+                                       submitted_at=datetime(2026, 3, 2, 9))
+    archive = IntakeArchive(tmp_path / "archive")
+
+    stats = archive_submissions(store, archive)
+    assert (stats['rows'], stats['skipped']) == (2, 1)
+    assert list(archive.skipped()['id']) == [bad]
+    assert archive.last_id() == last
+
+    # Once the stored form is corrected, the next run archives it
+    with sqlite3.connect(tmp_path / "intakes.db") as conn:
+        conn.execute("UPDATE submissions SET form_data = ? WHERE id = ?", (serialize_form_data(form("No")), bad))
+    stats = archive_submissions(store, archive)
+    assert (stats['rows'], stats['skipped'], stats['retried']) == (1, 0, 1)
+    assert list(archive.index['id']) == [first, last, bad]
+    assert len(archive.skipped()) == 0
+    assert archive.count(archive.bitmap('falls', "No")) == 1
+
+    assert archive_submissions(store, IntakeArchive(tmp_path / "archive"))['rows'] == 0
+    store.close()
+
+
+def test_newest_submission_skipped_is_archived_once(tmp_path):
+    store = SQLiteSubmissionStore(tmp_path / "intakes.db")
+    first, bad = store.save_many([form("Yes"), form("No", sex="Unknown")], submitted_at=datetime(2026, 3, 2, 9))
+    archive = IntakeArchive(tmp_path / "archive")
+
+    assert archive_submissions(store, archive)['skipped'] == 1
+    assert archive_submissions(store, archive)['skipped'] == 1     # retried once, not read again as new
+    assert list(archive.skipped()['id']) == [bad]
+
+    with sqlite3.connect(tmp_path / "intakes.db") as conn:
+        conn.execute("UPDATE submissions SET form_data = ? WHERE id = ?", (serialize_form_data(form("No")), bad))
+    assert archive_submissions(store, archive)['rows'] == 1
+    assert list(archive.index['id']) == [first, bad]
+    assert archive.count(archive.bitmap('falls', "No")) == 1
+    later = store.save(form("Yes"))
+    assert archive_submissions(store, archive)['rows'] == 1
+    assert list(archive.index['id']) == [first, bad, later]
+    store.close()
@@ -0,0 +1,56 @@
+import pytest
+
+import intake_codec
+from form_model import FormDataError
+from intake_codec import CURRENT_VERSION, Layout, RecordReader, decode_record, describe_layout, encode_record
+
+OLD_VERSION = 0
+
+
+def old_fields():
+    """A synthetic older layout: 'falls' was called 'fell', and pain listed "No" first"""
+    fields = []
+    for section_id, key, kind, options in describe_layout():
+        if (section_id, key) == ('symptoms', 'falls'):
+            key = 'fell'
+        elif (section_id, key) == ('symptoms', 'pain'):
+            options = ("No", "Yes", "Not Sure")
+        fields.append((section_id, key, kind, options))
+    return tuple(fields)
+
+
+def rename_fell(form_data):
+    symptoms = form_data['symptoms']
+    if 'fell' in symptoms:
+        symptoms['falls'] = symptoms.pop('fell')
+    return form_data
+
+
+@pytest.fixture
+def old_layout(monkeypatch):
+    layout = Layout(OLD_VERSION, old_fields())
+    monkeypatch.setitem(intake_codec.LAYOUTS, OLD_VERSION, layout)
+    monkeypatch.setitem(intake_codec.MIGRATIONS, OLD_VERSION, rename_fell)
+    return layout
+
+
+def test_old_record_decodes_with_its_layout_and_migrates(old_layout):
+    record = encode_record({'symptoms': {'fell': "Yes", 'pain': "No"}, 'demographics': {'first_name': "Rose"}},
+                           layout=old_layout)
+    assert record[2] == OLD_VERSION
+    assert RecordReader(record).get('symptoms', 'fell') == "Yes"
+
+    form_data = decode_record(record)
+    assert form_data['symptoms'] == {'falls': "Yes", 'pain': "No"}
+    assert form_data['demographics'] == {'first_name': "Rose"}
+
+    current = encode_record(form_data)
+    assert current[2] == CURRENT_VERSION
+    assert decode_record(current) == form_data
+
+
+def test_unknown_version_is_rejected():
+    record = bytearray(encode_record({'symptoms': {'falls': "Yes"}}))
+    record[2] = 99
+    with pytest.raises(FormDataError):
+        decode_record(bytes(record))
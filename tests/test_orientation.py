@@ -0,0 +1,47 @@
+from datetime import date
+
+from orientation import OrientationScorer, DEFAULT_CLINIC_FACTS, describe_orientation, rescore_submissions
+
+SCORER = OrientationScorer(DEFAULT_CLINIC_FACTS['hospital_names'], DEFAULT_CLINIC_FACTS['city_names'])
+MONDAY = date(2026, 3, 2)
+
+
+def answers(**overrides):
+    cognitive = {'today_date': MONDAY, 'day_of_week': "Monday", 'season': "Winter", 'current_year': 2026,
+                 'hospital_name': "Jewish General Hospital", 'city': "Montreal"}
+    cognitive.update(overrides)
+    return cognitive
+
+
+def test_correct_answers_score_six():
+    result = SCORER.score(answers(), MONDAY)
+    assert result.score == 6
+    assert describe_orientation(result) == "Orientation: 6/6 correct"
+
+
+def test_names_match_after_folding_case_accents_and_abbreviations():
+    for hospital in ("hopital general juif", "the JGH", "Hôpital Général Juif"):
+        assert SCORER.score(answers(hospital_name=hospital), MONDAY).correct['hospital_name']
+    assert not SCORER.score(answers(hospital_name="General Hospital"), MONDAY).correct['hospital_name']
+    assert SCORER.score(answers(city="MONTRÉAL"), MONDAY).correct['city']
+
+
+def test_season_is_accepted_within_a_week_of_its_change():
+    march_15 = date(2026, 3, 15)
+    for season in ("Winter", "Spring"):
+        assert SCORER.score(answers(season=season), march_15).correct['season']
+    assert not SCORER.score(answers(season="Spring"), MONDAY).correct['season']
+
+
+def test_wrong_and_unanswered_items_are_listed():
+    result = SCORER.score(answers(today_date=None, day_of_week="Tuesday", current_year=None), MONDAY)
+    assert result.score == 3
+    assert describe_orientation(result) == "Orientation: 3/6 correct (incorrect: date, day of the week, year)"
+
+
+def test_stored_intakes_are_scored_against_their_own_day():
+    submissions = [(1, "2026-03-02T09:00:00", {'cognitive': answers()}),
+                   (2, "2026-03-03T09:00:00", {'cognitive': answers()}),
+                   (3, "2026-03-03T10:00:00", {})]
+    rows = list(rescore_submissions(submissions, batch_size=2, scorer=SCORER))
+    assert [(submission_id, score) for submission_id, _, score, _ in rows] == [(1, 6), (2, 4), (3, 0)]
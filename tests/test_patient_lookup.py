@@ -0,0 +1,43 @@
+from datetime import date, datetime
+
+from patient_lookup import carry_over
+from submission_store import SQLiteSubmissionStore
+
+DOB = date(1940, 3, 3)
+
+
+def form(health_card, date_of_birth=DOB, **medical_history):
+    return {
+        'demographics': {'first_name': "Rose", 'health_card': health_card, 'date_of_birth': date_of_birth},
+        'symptoms': {'falls': "Yes"},
+        'medications': {'taking_medications': "Yes", 'medications_list': [{'name': "Metformin"}],
+                        'miss_doses': "Often"},
+        'medical_history': medical_history,
+    }
+
+
+def test_latest_intake_is_found_by_health_card_and_birth_date(tmp_path):
+    store = SQLiteSubmissionStore(tmp_path / "intakes.db")
+    store.save(form("TREM 4003 0312", diabetes="No"), submitted_at=datetime(2026, 1, 5, 9))
+    latest = store.save(form("trem40030312", diabetes="Yes"), submitted_at=datetime(2026, 3, 2, 9))
+    store.save(form("TREM40030312", date_of_birth=date(1941, 3, 3)))
+
+    submission_id, submitted_at, form_data = store.latest_for_patient("Trem-4003-0312", DOB)
+    assert submission_id == latest and submitted_at.startswith("2026-03-02")
+    assert form_data['medical_history'] == {'diabetes': "Yes"}
+    assert form_data['demographics']['date_of_birth'] == DOB
+    assert store.latest_for_patient("TREM40030312", date(1940, 3, 4)) is None
+    assert store.latest_for_patient("", DOB) is None
+    store.close()
+
+
+def test_carry_over_copies_only_stable_answers():
+    previous = form("TREM40030312", diabetes="Yes", hospitalized_past_year="Yes")
+    form_data = carry_over({'demographics': {}, 'symptoms': {}, 'medications': {}, 'medical_history': {}},
+                           previous)
+    assert form_data['demographics'] == previous['demographics']
+    assert form_data['symptoms'] == {}
+    assert form_data['medications'] == {'taking_medications': "Yes", 'medications_list': [{'name': "Metformin"}]}
+    assert form_data['medical_history'] == {'diabetes': "Yes"}
+    form_data['medications']['medications_list'][0]['name'] = "Aspirin"
+    assert previous['medications']['medications_list'][0]['name'] == "Metformin"
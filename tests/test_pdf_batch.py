@@ -0,0 +1,36 @@
+import re
+from datetime import datetime
+
+from form_model import IntakeForm
+from pdf_batch import _pdf_objects, render_packet_pdf, render_packet_zip
+
+
+def submission(submission_id, first_name):
+    form_data = IntakeForm.from_form_data({
+        'demographics': {'first_name': first_name, 'last_name': "Tremblay"},
+        'symptoms': {'falls': "Yes"},
+    }).to_form_data()
+    return submission_id, datetime(2026, 3, 2, 9).isoformat(), form_data
+
+
+def test_merged_packet_has_every_report_page(tmp_path):
+    submissions = [submission(i, name) for i, name in enumerate(["Rose", "Ida", "Jean"], 1)]
+    zip_stats = render_packet_zip(submissions, tmp_path / "packet.zip", workers=1)
+    stats = render_packet_pdf(submissions, tmp_path / "packet.pdf", workers=1, window=2)
+    assert stats['documents'] == 3 and stats['pages'] == zip_stats['pages']
+
+    pdf = (tmp_path / "packet.pdf").read_bytes()
+    objects, trailer = _pdf_objects(pdf)     # the xref table points at every object
+    assert b'/Root 2 0 R' in trailer
+    page_tree = objects[1][0]
+    assert b'/Count %d' % stats['pages'] in page_tree
+    for page in re.findall(rb'(\d+) 0 R', page_tree):
+        dictionary = objects[int(page)][0]
+        assert b'/Type /Page' in dictionary and b'/Parent 1 0 R' in dictionary
+        for number in re.findall(rb'(\d+) 0 R', dictionary):
+            assert int(number) in objects
+
+
+def test_empty_packet_writes_nothing(tmp_path):
+    assert render_packet_pdf([], tmp_path / "packet.pdf")['documents'] == 0
+    assert not (tmp_path / "packet.pdf").exists()
@@ -0,0 +1,16 @@
+from datetime import date, datetime
+
+from form_model import IntakeForm
+from pdf_report import build_report_elements
+
+FORM_DATA = IntakeForm.from_form_data({'demographics': {'first_name': "Rose"}}).to_form_data()
+
+
+def stamps(generated_at):
+    texts = [getattr(element, 'text', '') for element in build_report_elements(FORM_DATA, generated_at)]
+    return [text for text in texts if text.startswith(("Date:", "Form completed:"))]
+
+
+def test_memoized_report_is_dated_by_day_only():
+    assert stamps(date(2026, 3, 2)) == ["Date: 2026-03-02", "Form completed: 2026-03-02"]
+    assert stamps(datetime(2026, 3, 2, 9, 30, 5)) == ["Date: 2026-03-02 09:30", "Form completed: 2026-03-02 09:30:05"]
@@ -0,0 +1,48 @@
+import pytest
+
+from risk_flags import RuleError, compile_rules, evaluate_rules, flagged_rules, scan_submissions, update_flags
+
+
+def ids(rules):
+    return [rule.id for rule in rules]
+
+
+def test_rules_flag_only_answered_risks():
+    assert ids(evaluate_rules({})) == []
+    assert ids(evaluate_rules({'symptoms': {'falls': "Yes", 'falls_count': 1}})) == []
+    assert ids(evaluate_rules({'symptoms': {'falls': "Yes", 'falls_count': 2}})) == ['fall_risk']
+    assert ids(evaluate_rules({'symptoms': {'falls': "Yes", 'dizziness': "Yes"}})) == ['fall_risk']
+
+
+def test_at_least_counts_memory_concerns():
+    two = {'forget_names': "Yes", 'lose_items': "Yes", 'repeat_questions': "Sometimes"}
+    assert ids(evaluate_rules({'cognitive': two})) == []
+    assert ids(evaluate_rules({'cognitive': dict(two, repeat_questions="Yes")})) == ['cognitive_risk']
+
+
+def test_completing_a_section_only_updates_its_rules():
+    form_data = {'symptoms': {'falls': "Yes", 'falls_count': 3},
+                 'medications': {'taking_medications': "Yes", 'num_medications': 6}}
+    flags = update_flags(set(), form_data, 'symptoms')
+    assert flags == {'fall_risk'}                   # polypharmacy waits for its own section
+    flags = update_flags(flags, form_data, 'medications')
+    assert ids(flagged_rules(flags)) == ['fall_risk', 'polypharmacy']
+    form_data['symptoms']['falls'] = "No"           # the patient goes back and changes an answer
+    assert update_flags(flags, form_data, 'symptoms') == {'polypharmacy'}
+
+
+def test_scan_yields_flagged_submissions_only():
+    submissions = [(1, "2026-03-02T09:00:00", {'symptoms': {'falls': "No"}}),
+                   (2, "2026-03-02T10:00:00", {'cognitive': {'get_lost': "Yes"}})]
+    assert [(submission_id, ids(flagged)) for submission_id, _, _, flagged in scan_submissions(submissions)] == [
+        (2, ['cognitive_risk'])]
+
+
+@pytest.mark.parametrize('when, message', [
+    ({'field': 'symptoms.fever', 'eq': "Yes"}, "unknown field"),
+    ({'field': 'symptoms.falls', 'gt': 1}, "without eq, in or ge"),
+    ({'at_least': 3, 'of': [{'field': 'symptoms.falls', 'eq': "Yes"}]}, "at_least 3 of 1"),
+])
+def test_malformed_rules_are_rejected(when, message):
+    with pytest.raises(RuleError, match=message):
+        compile_rules([{'id': 'r', 'label': "R", 'message': "", 'when': when}])
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import autosave
+import form_renderer
+import session_store
+from session_store import SQLiteSessionStore
+
+APP = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+
+
+def test_save_is_a_compare_and_set_on_the_version(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "sessions.db")
+    assert store.save("K7P3QX", '{"a": 1}', 0) == 1
+    assert store.save("K7P3QX", '{"a": 2}', 0) is None         # another worker created it first
+    assert store.save("K7P3QX", '{"a": 2}', 1) == 2
+    assert store.save("K7P3QX", '{"a": 3}', 1) is None         # stale version
+    assert store.load("K7P3QX") == (2, '{"a": 2}') and store.version("K7P3QX") == 2
+    assert store.purge(older_than=0) == 0
+    store.delete("K7P3QX")
+    assert store.version("K7P3QX") is None and store.load("K7P3QX") is None
+    store.close()
+
+
+@pytest.fixture
+def shared_sessions(tmp_path, monkeypatch):
+    monkeypatch.setenv('INTAKE_SESSION_BACKEND', 'sqlite')
+    monkeypatch.setenv('INTAKE_SESSION_STORE_PATH', str(tmp_path / "sessions.db"))
+    monkeypatch.setenv('INTAKE_AUTOSAVE_PATH', str(tmp_path / "autosave.journal"))
+    caches = (session_store.get_session_store, autosave.get_autosave_journal, autosave.get_resume_throttle)
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+def worker(code=None):
+    """One app session; two of them stand for two server processes sharing the store"""
+    at = AppTest.from_file(APP, default_timeout=30)
+    if code:
+        at.query_params['resume'] = code
+    return at.run()
+
+
+def test_another_worker_continues_the_session(shared_sessions):
+    a = worker()
+    a.text_input(key='first_name').input("Marie").run()
+    a.button(key='nav_next').click().run()
+    a.button(key='symptom_pain_yes').click().run()
+
+    b = worker(a.session_state.resume_code)
+    assert b.session_state.current_section == 1
+    assert b.session_state.form_data['demographics']['first_name'] == "Marie"
+    assert b.session_state.form_data['symptoms']['pain'] == "Yes"
+
+    b.button(key='symptom_pain_no').click().run()
+    a.run()
+    assert a.session_state.form_data['symptoms']['pain'] == "No"
+    assert not a.exception and not b.exception
+
+
+def test_first_write_wins_a_race(shared_sessions, monkeypatch):
+    a = worker()
+    a.button(key='nav_next').click().run()
+    b = worker(a.session_state.resume_code)
+    store = session_store.get_session_store()
+    code = a.session_state.resume_code
+
+    # Another worker writes its answer while b's script run is between sync and persist
+    persist, raced = session_store.persist_session, []
+
+    def persist_after_a_rival_write():
+        if not raced:
+            raced.append(code)
+            version, state = store.load(code)
+            shared = session_store.decode_session(state)
+            shared['form_data']['symptoms'] = {'falls': "Yes"}
+            store.save(code, session_store.encode_session(shared), version)
+        persist()
+
+    monkeypatch.setattr(form_renderer, 'persist_session', persist_after_a_rival_write)
+    b.button(key='symptom_dizziness_yes').click().run()
+    assert b.session_state.shared_session is None         # b's write was refused
+    assert session_store.decode_session(store.load(code)[1])['form_data']['symptoms'] == {'falls': "Yes"}
+
+    b.run()    # the next run adopts the winning write
+    symptoms = b.session_state.form_data['symptoms']
+    assert symptoms['falls'] == "Yes" and 'dizziness' not in symptoms
+    assert b.session_state.shared_session[:2] == (code, store.version(code))
@@ -0,0 +1,70 @@
+import time
+
+from submission_queue import ARCHIVED, FAILED, SubmissionQueue
+from submission_store import SubmissionStoreError
+
+
+class FlakyStore:
+    """Submission store failing its first ``failures`` saves"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.saved = []
+
+    def save_many(self, form_datas):
+        if self.failures:
+            self.failures -= 1
+            raise SubmissionStoreError("database is locked")
+        self.saved.extend(form_datas)
+        return list(range(len(self.saved) - len(form_datas) + 1, len(self.saved) + 1))
+
+
+def make_queue(tmp_path, store, **kwargs):
+    return SubmissionQueue(store, archive_dir=tmp_path / "reports", spool_dir=tmp_path / "spool", workers=1,
+                           max_retries=1, retry_delay=0, failed_retry_delay=0.05, **kwargs)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def form(first_name):
+    return {'demographics': {'first_name': first_name}, 'symptoms': {'falls': "Yes"}}
+
+
+def test_failed_submission_is_retried_until_saved(tmp_path):
+    store = FlakyStore(failures=2)
+    saved = []
+    submission_queue = make_queue(tmp_path, store, on_saved=saved.append)
+    ticket = submission_queue.submit(form("Rose"), resume_code="K7P3QX")
+
+    wait_for(lambda: ticket.status == FAILED)
+    assert list((tmp_path / "spool").glob("*.json")) == [ticket.spool_path]
+    wait_for(lambda: ticket.status == ARCHIVED)
+
+    assert ticket.failures == 2 and ticket.submission_id == 1
+    assert [f['demographics']['first_name'] for f in store.saved] == ["Rose"]
+    assert saved == [ticket]
+    assert list((tmp_path / "spool").glob("*.json")) == []
+    assert (tmp_path / "reports" / "intake_00000001.pdf").exists()
+    submission_queue.shutdown()
+
+
+def test_spooled_submission_is_recovered_by_the_next_queue(tmp_path):
+    failing = make_queue(tmp_path, FlakyStore(failures=10**6))
+    ticket = failing.submit(form("Rose"))
+    wait_for(lambda: ticket.status == FAILED)
+    failing.shutdown()      # the process stops with the submission unsaved
+    assert len(list((tmp_path / "spool").glob("*.json"))) == 1
+
+    store = FlakyStore()
+    submission_queue = make_queue(tmp_path, store)
+    assert submission_queue.recover() == 1
+    wait_for(lambda: store.saved)
+    assert store.saved[0]['demographics']['first_name'] == "Rose"
+    wait_for(lambda: not list((tmp_path / "spool").glob("*.json")))
+    assert submission_queue.recover() == 0
+    submission_queue.shutdown()